@@ -1,43 +1,109 @@
-import copy
-from datetime import datetime
-from datetime import timedelta
-from typing import List
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
 
 import pandas as pd
-import plotly.graph_objects as go
 import streamlit as st
-from plotly.subplots import make_subplots
-
-from lib.logger import logger
-from scripts.energy_bank import EnergyBank
-from scripts.pv import Pv
-from systems.bare_system import BareSystem
-from systems.pv_system import PvSystem
-from systems.raw_full_system import RawFullSystem
-from systems.smart_save_system import SmartSaveSystem
-from systems.smart_system import SmartSystem
-
-
-@st.cache_data
-def interactive_plot(df: pd.DataFrame):
-    x_value = df.pop("Date")
-    fig = make_subplots(rows=len(df.columns), cols=1)
-    for idx, y_col in enumerate(df.columns):
-        fig.add_trace(go.Scatter(x=x_value, y=df[y_col], name=y_col), row=idx + 1, col=1)
+
+from lib.logger import setup_logging
+from scripts.downsampling import ChartDownsampler
+from scripts.hourly_dataset import DatasetRegistry, HourlyDataset, RUN_LOOKAHEAD
+from scripts.simulation_job import SimulationJob
+from scripts.simulation_runner import SystemSpec
+
+DATE_EARLIEST = datetime.strptime("01.01.2020 00:00:00", "%d.%m.%Y %H:%M:%S")
+DATE_OLDEST = datetime.strptime("30.12.2020 23:00:00", "%d.%m.%Y %H:%M:%S")
+MAX_JOBS = 32
+JOB_STEP = pd.Timedelta(days=3)
+POLL_INTERVAL = 0.5
+MAX_TRACE_POINTS = 800
+MAX_CHART_POINTS = 2000
+COST_COLUMN = "Total price [zl]"
+RESOLUTIONS = {"Auto (LTTB)": "lttb", "Min/max": "min_max", "Day": "day", "Week": "week", "Month": "month"}
+
+
+@st.cache_resource
+def init_logging() -> None:
+    setup_logging()
+
+
+def load_dataset(date_start: pd.Timestamp, date_end: pd.Timestamp) -> HourlyDataset:
+    return DatasetRegistry.get_dataset(date_start, date_end + RUN_LOOKAHEAD, offline=True)
+
+
+@st.cache_resource
+def get_jobs() -> Tuple[threading.Lock, "OrderedDict[tuple, SimulationJob]"]:
+    return threading.Lock(), OrderedDict()
+
+
+def get_specs(energy_bank_params: Dict[str, float], pv_size: float, load_multiplier: float) -> List[SystemSpec]:
+    return [SystemSpec("BareSystem", load_multiplier=load_multiplier),
+            SystemSpec("PvSystem", pv_size=pv_size, load_multiplier=load_multiplier),
+            SystemSpec("RawFullSystem", pv_size=pv_size, energy_bank_params=energy_bank_params),
+            SystemSpec("SmartSystem", pv_size=pv_size, energy_bank_params=energy_bank_params),
+            SystemSpec("SmartSaveSystem", pv_size=pv_size, energy_bank_params=energy_bank_params)]
+
+
+def get_job(run_params: dict, restart: bool) -> SimulationJob:
+    energy_bank_params = run_params["energy_bank_params"]
+    key = (run_params["date_start"], run_params["date_end"], tuple(sorted(energy_bank_params.items())),
+           run_params["pv_size"], run_params["load_multiplier"])
+    lock, jobs = get_jobs()
+    with lock:
+        job = jobs.get(key)
+        if job is None or (restart and (job.is_cancelled or job.is_failed)):
+            specs = get_specs(energy_bank_params, run_params["pv_size"], run_params["load_multiplier"])
+            job = SimulationJob(specs, run_params["date_start"], run_params["date_end"], step=JOB_STEP)
+            jobs[key] = job.start()
+            finished_keys = [job_key for job_key, stored_job in jobs.items() if not stored_job.is_running]
+            while len(jobs) > MAX_JOBS and finished_keys:
+                del jobs[finished_keys.pop(0)]
+        jobs.move_to_end(key)
+        return job
+
+
+def show_progress(job: SimulationJob) -> None:
+    progress_bars = {label: st.progress(0.0, text=label) for label in job.progress}
+    costs_chart = st.empty()
+    while job.poll():
+        for label, progress_bar in progress_bars.items():
+            progress_bar.progress(job.progress[label], text=f"{label}: {job.progress[label]:.0%}")
+        partial_costs_df = job.get_partial_costs()
+        if not partial_costs_df.empty:
+            partial_costs_df = partial_costs_df.rename_axis("Date").reset_index()
+            partial_costs_df = ChartDownsampler(MAX_CHART_POINTS).downsample(partial_costs_df)
+            costs_chart.line_chart(partial_costs_df, x="Date", y=list(partial_costs_df.columns[1:]))
+        time.sleep(POLL_INTERVAL)
+
+
+@st.cache_data(max_entries=64)
+def interactive_plot(df: pd.DataFrame, method: str, zoom_start: pd.Timestamp, zoom_end: pd.Timestamp):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    downsampler = ChartDownsampler(MAX_TRACE_POINTS, method, aggregations={COST_COLUMN: "last"})
+    y_columns = df.columns[1:]
+    fig = make_subplots(rows=len(y_columns), cols=1)
+    for idx, y_col in enumerate(y_columns):
+        trace_df = downsampler.downsample(df[["Date", y_col]], date_start=zoom_start, date_end=zoom_end)
+        fig.add_trace(go.Scatter(x=trace_df["Date"], y=trace_df[y_col], name=y_col), row=idx + 1, col=1)
     fig.update_layout(autosize=False, width=2000, height=1350)
     st.plotly_chart(fig, use_container_width=True)
 
 
-@st.cache_data
-def plot_total(df_list: List[pd.DataFrame]):
-    x_value = list(df_list[0]["Date"])
-    y_values = [list(val["Total price [zl]"]) for val in df_list]
+@st.cache_data(max_entries=64)
+def plot_total(df_list: List[pd.DataFrame], method: str, zoom_start: pd.Timestamp, zoom_end: pd.Timestamp):
     columns = ["Date", "Bare", "Pv", "Raw", "Smart", "SaveSmart"]
-    chart_data = pd.DataFrame({k: v for k, v in zip(columns, [x_value] + y_values)})
+    chart_data = pd.DataFrame(dict(zip(columns, [df_list[0]["Date"]] + [df[COST_COLUMN] for df in df_list])))
+    downsampler = ChartDownsampler(MAX_CHART_POINTS, method, aggregations={column: "last" for column in columns[1:]})
+    chart_data = downsampler.downsample(chart_data, date_start=zoom_start, date_end=zoom_end)
     st.line_chart(chart_data, x="Date", y=columns[1:])
 
 
 st.set_page_config(page_title="RES", page_icon=":bar_chart:")
+init_logging()
 st.title("Energy Management System")
 
 col1, col2, col3, col4, col5 = st.columns(5)
@@ -61,9 +127,7 @@ with col2:
 with st.form("my_form"):
     date_start = datetime.strptime("01.01.2020 00:00:00", "%d.%m.%Y %H:%M:%S")
     date_end = datetime.strptime("01.03.2020 23:00:00", "%d.%m.%Y %H:%M:%S")
-    date_earliest = datetime.strptime("01.01.2020 00:00:00", "%d.%m.%Y %H:%M:%S")
-    date_oldest = datetime.strptime("30.12.2020 23:00:00", "%d.%m.%Y %H:%M:%S")
-    date_start, date_end = st.slider("Date range", min_value=date_earliest, max_value=date_oldest, value=[date_start, date_end])
+    date_start, date_end = st.slider("Date range", min_value=DATE_EARLIEST, max_value=DATE_OLDEST, value=[date_start, date_end])
     with st.expander("Info about smart systems"):
         st.markdown("""##### *SmartSystem* \n\n _The operation of this system is divided into two phases: day and night.
                     At the beginning of the nighttime period, the system optimally allocates the projected energy demand
@@ -80,39 +144,50 @@ with st.form("my_form"):
 
     submitted = st.form_submit_button("Run!")
     if submitted:
-        energy_bank = EnergyBank(capacity=eb_capacity, min_lvl=eb_min_lvl, lvl=eb_start_lvl, purchase_cost=eb_cost, cycles_num=eb_cycles)
-        pv_producer = Pv(size=pv_size)
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Bare", "pv", "full_raw", "smart", "save_smart", "summary"])
-
-        bare_system = BareSystem(load_multiplier=load_multiplier)
-        pv_system = PvSystem(pv_size=pv_size, load_multiplier=load_multiplier)
-        raw_full_system = RawFullSystem(copy.deepcopy(energy_bank), copy.deepcopy(pv_producer))
-        smart_system = SmartSystem(copy.deepcopy(energy_bank), copy.deepcopy(pv_producer))
-        smart_save_system = SmartSaveSystem(copy.deepcopy(energy_bank), copy.deepcopy(pv_producer))
-
-        for current_date in pd.date_range(start=date_start, end=date_end, freq=timedelta(hours=1)):
-            logger.warning(f"CURRENT DATE: {current_date}")
-            bare_system.feed_consumption(current_date)
-            pv_system.feed_consumption(current_date)
-            raw_full_system.feed_consumption(current_date)
-            smart_system.feed_consumption(current_date)
-            smart_save_system.feed_consumption(current_date)
+        energy_bank_params = {"capacity": eb_capacity, "min_lvl": eb_min_lvl, "lvl": eb_start_lvl,
+                              "purchase_cost": eb_cost, "cycles_num": eb_cycles}
+        st.session_state["run_params"] = {"date_start": pd.Timestamp(date_start), "date_end": pd.Timestamp(date_end),
+                                          "energy_bank_params": energy_bank_params, "pv_size": pv_size,
+                                          "load_multiplier": load_multiplier}
+
+if "run_params" not in st.session_state:
+    st.info('Click "Run!" button to run the system!')
+    st.stop()
+
+run_params = st.session_state["run_params"]
+job = get_job(run_params, restart=submitted)
+if job.is_cancelled:
+    st.info('Simulation was cancelled, click "Run!" button to run the system again!')
+    st.stop()
+if job.is_running:
+    if st.button("Cancel"):
+        job.cancel()
+        st.rerun()
+    show_progress(job)
+    st.rerun()
 
+results = job.get_results()
 with st.container():
-    try:
-        systems = [bare_system, pv_system, raw_full_system, smart_system, smart_save_system]
-        tabs = [tab1, tab2, tab3, tab4, tab5]
-        for system, tab in zip(systems, tabs):
-            with tab:
-                st.write(f"Energy cost: {round(system.summed_cost, 2)}")
-                if system in [raw_full_system, smart_system, smart_save_system]:
-                    st.write(f"Bank value: {system.energy_bank.lvl * system.energy_pricer.get_rce_by_date(date_end)/1000:.2}")
-                df_to_plot = copy.deepcopy(system.plotter.df)
-                interactive_plot(df_to_plot)
-        with tab6:
-            st.write(f"Summary of total costs")
-            dfs_to_plot = [s.plotter.df for s in systems]
-            plot_total(dfs_to_plot)
-    except:
-        st.info('Click "Run!" button to run the system!')
-        st.stop()
+    col1, col2 = st.columns(2)
+    with col1:
+        method = RESOLUTIONS[st.selectbox("Chart resolution:", list(RESOLUTIONS))]
+    zoom_start, zoom_end = run_params["date_start"], run_params["date_end"]
+    if zoom_start < zoom_end:
+        with col2:
+            zoom_start, zoom_end = st.slider("Zoom", min_value=zoom_start.to_pydatetime(),
+                                             max_value=zoom_end.to_pydatetime(),
+                                             value=(zoom_start.to_pydatetime(), zoom_end.to_pydatetime()),
+                                             step=timedelta(hours=1))
+    zoom_start, zoom_end = pd.Timestamp(zoom_start), pd.Timestamp(zoom_end)
+    tabs = st.tabs(["Bare", "pv", "full_raw", "smart", "save_smart", "summary"])
+    dataset = load_dataset(run_params["date_start"], run_params["date_end"])
+    rce_price_end, _, _ = dataset.get_record(run_params["date_end"])
+    for result, tab in zip(results, tabs):
+        with tab:
+            st.write(f"Energy cost: {round(result.summed_cost, 2)}")
+            if result.bank_lvl is not None:
+                st.write(f"Bank value: {result.bank_lvl * rce_price_end / 1000:.2}")
+            interactive_plot(result.df, method, zoom_start, zoom_end)
+    with tabs[-1]:
+        st.write(f"Summary of total costs")
+        plot_total([result.df for result in results], method, zoom_start, zoom_end)
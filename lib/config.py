@@ -11,6 +11,7 @@ class Config(CustomEnum):
     # The data to fill in
     LATITUDE = 50.07
     LONGITUDE = 19.92
+    TIMEZONE = "Europe/Warsaw"
 
     # local paths
     LOG_FILE_PATH = "lib/program_log.log"
@@ -0,0 +1,25 @@
+POOL_SIZE = 16
+RETRIES_TOTAL = 3
+RETRIES_BACKOFF = 0.5
+RETRIES_STATUSES = [429, 500, 502, 503, 504]
+
+_session = None
+
+
+def get_http_session() -> 'requests.Session':
+    """
+    Returns a process-wide session keeping connections alive between downloads. requests is imported on the first
+    call, so runs working on local data never load it.
+    """
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retries = Retry(total=RETRIES_TOTAL, backoff_factor=RETRIES_BACKOFF, status_forcelist=RETRIES_STATUSES)
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retries)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
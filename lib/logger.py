@@ -1,23 +1,122 @@
-from datetime import datetime
-
+import atexit
+import gzip
 import logging
-from colorlog import ColoredFormatter
+import multiprocessing
+import os
+import shutil
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Union
+
+HOURLY = 5
+logging.addLevelName(HOURLY, "HOURLY")
 
-current_time = datetime.now().strftime("%H_%M_%S %d-%m-%Y")
 LOG_LEVEL = logging.INFO
+# Every run writes its own log file, a rotating file handler must be the only writer of its file.
+LOG_PATH = "logs/simulation_{run_id}.log"
 LOG_FORMAT = " %(log_color)s%(asctime)s %(levelname)s %(filename)s[%(lineno)d]: %(message)s%(reset)s"
-formatter_stream = ColoredFormatter(LOG_FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
-formatter_file = logging.Formatter(fmt="%(asctime)s %(levelname)s %(filename)s[%(lineno)d]: %(message)s",
-                                   datefmt="%Y-%m-%d %H:%M:%S")
+FILE_LOG_FORMAT = "%(asctime)s %(levelname)s %(filename)s[%(lineno)d]: %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+logger = logging.getLogger(__name__)
 
-stream_handler = logging.StreamHandler()
-stream_handler.setLevel(LOG_LEVEL)
-stream_handler.setFormatter(formatter_stream)
+_listener = None
 
-file_handler = logging.FileHandler(filename=f"logs/{current_time}.log", mode='w', encoding="utf-8")
-file_handler.setLevel(LOG_LEVEL)
-file_handler.setFormatter(formatter_file)
 
-logging.basicConfig(level=LOG_LEVEL, handlers=[file_handler, stream_handler])
+def gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as source_file, gzip.open(dest, "wb") as dest_file:
+        shutil.copyfileobj(source_file, dest_file)
+    os.remove(source)
 
-logger = logging.getLogger(__name__)
+
+def gzip_namer(name: str) -> str:
+    return f"{name}.gz"
+
+
+def get_run_id() -> str:
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+
+def setup_logging(level: int = LOG_LEVEL, log_path: Union[str, None] = LOG_PATH, async_logging: bool = True,
+                  max_bytes: int = 5 * 1024 ** 2, backup_count: int = 5) -> Union[str, None]:
+    """
+    Configures the root logger for a run, it is called by entry points only, importing modules has no logging side
+    effects. Records below the level are never created, so hourly messages of systems cost nothing unless the level
+    is HOURLY. With async logging the records are put on a queue and written to the stream and to the log file by
+    a background thread. The queue is a multiprocessing one, so forked worker processes put their records on it as
+    well and only the listener of the parent writes the log file, spawned workers join it by setup_worker_logging.
+    Without async logging forked workers log to the stream only. The log file is rotated and rotated files are
+    compressed. A {run_id} in the log path is replaced by the start time and the pid of the run, so concurrent runs
+    never rotate the same file. Returns the path of the log file.
+    """
+    from colorlog import ColoredFormatter
+
+    global _listener
+    stop_logging()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(ColoredFormatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+    handlers = [stream_handler]
+    if log_path is not None:
+        log_path = log_path.replace("{run_id}", get_run_id())
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        file_handler.rotator = gzip_rotator
+        file_handler.namer = gzip_namer
+        file_handler.setFormatter(logging.Formatter(fmt=FILE_LOG_FORMAT, datefmt=DATE_FORMAT))
+        handlers.append(file_handler)
+    for handler in handlers:
+        handler.setLevel(level)
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        handler.close()
+    root_logger.setLevel(level)
+    if async_logging:
+        log_queue = multiprocessing.get_context("spawn").Queue()
+        root_logger.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
+    return log_path
+
+
+def stop_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_log_queue() -> Union[multiprocessing.Queue, None]:
+    return None if _listener is None else _listener.queue
+
+
+def setup_worker_logging(log_queue: Union[multiprocessing.Queue, None], level: int = LOG_LEVEL) -> None:
+    """
+    Configures the root logger of a spawned worker process, its records are put on the queue of the parent listener.
+    Without a queue the worker keeps the default logging of python.
+    """
+    if log_queue is None:
+        return
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.setLevel(level)
+    root_logger.addHandler(QueueHandler(log_queue))
+
+
+def _forget_listener_in_child() -> None:
+    global _listener
+    if _listener is not None:
+        _listener = None
+        return
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, RotatingFileHandler):
+            root_logger.removeHandler(handler)
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_forget_listener_in_child)
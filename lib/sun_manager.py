@@ -1,23 +1,123 @@
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
 import pandas as pd
-from suntime import Sun
 
 from lib.config import Config
 
 
 class SunManager:
-    def __init__(self, latitude: float = Config.LATITUDE, longitude: float = Config.LONGITUDE):
+    """
+    Class giving sunrise and sunset hours of a location. Hours of a whole span of days are computed in one vectorized
+    pass with the same approximation as suntime.Sun.get_sunrise_time and get_sunset_time, and served from arrays.
+    The local hours use the offset of the time zone of the location at every computed day, so they do not depend on
+    the time zone of the machine or on the date of the run. Tables are shared by all managers of the same location in
+    the process, so systems built later reuse them, and are updated under a lock as threads of the process share
+    them. Days outside of the precomputed span are kept in an LRU cache.
+
+    Attributes:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        timezone (str): IANA name of the time zone of the location.
+        cache_size (int): The maximum number of days kept in the LRU cache.
+        table_start (pd.Timestamp): The first day of the precomputed table.
+        sunrise_hours (np.ndarray): Sunrise hours of the days of the table.
+        sunset_hours (np.ndarray): Sunset hours of the days of the table.
+    """
+    ZENITH = 90.8
+    SHARED_TABLES = {}
+    _shared_tables_lock = threading.Lock()
+
+    def __init__(self, latitude: float = Config.LATITUDE, longitude: float = Config.LONGITUDE, cache_size: int = 366,
+                 timezone: str = Config.TIMEZONE):
         self.latitude = latitude
         self.longitude = longitude
+        self.timezone = timezone
+        self.cache_size = cache_size
+        self.table_start = None
+        self.sunrise_hours = np.empty(0, dtype=np.int8)
+        self.sunset_hours = np.empty(0, dtype=np.int8)
+        self._cache = OrderedDict()
+
+    def compute_sun_hours(self, days: pd.DatetimeIndex, is_rise_time: bool) -> np.ndarray:
+        to_rad = np.pi / 180.0
+        lng_hour = self.longitude / 15
+        t = days.dayofyear.to_numpy(dtype=float) + ((6 if is_rise_time else 18) - lng_hour) / 24
+        m = (0.9856 * t) - 3.289
+        lon = m + (1.916 * np.sin(to_rad * m)) + (0.020 * np.sin(to_rad * 2 * m)) + 282.634
+        lon = self._force_range(lon, 360)
+        sin_dec = 0.39782 * np.sin(to_rad * lon)
+        cos_dec = np.cos(np.arcsin(sin_dec))
+        cos_h = (np.cos(to_rad * self.ZENITH) - (sin_dec * np.sin(to_rad * self.latitude))) / (cos_dec * np.cos(to_rad * self.latitude))
+        if np.any(np.abs(cos_h) > 1):
+            raise Exception(f"The sun does not rise or set on some days of {days[0]} - {days[-1]} at this location")
+        h = (1 / to_rad) * np.arccos(cos_h)
+        h = (360 - h if is_rise_time else h) / 15
+        ra = self._force_range((1 / to_rad) * np.arctan(0.91764 * np.tan(to_rad * lon)), 360)
+        ra = (ra + (np.floor(lon / 90) * 90 - np.floor(ra / 90) * 90)) / 15
+        ut = self._force_range(np.round(h + ra - (0.06571 * t) - 6.622 - lng_hour, 2), 24)
+        utc_day_offset = -np.floor((ut + lng_hour) / 24)
+        utc_times = (days + pd.to_timedelta(utc_day_offset, unit="D") +
+                     pd.to_timedelta(np.round(ut * 3600 * 10 ** 6), unit="us")).tz_localize("UTC")
+        timezone_offset = ((utc_times.tz_convert(self.timezone).tz_localize(None) - utc_times.tz_localize(None)) /
+                           pd.Timedelta(hours=1)).to_numpy()
+        local_microseconds = np.round((ut + timezone_offset) * 3600 * 10 ** 6) + utc_day_offset * 86400 * 10 ** 6
+        return (np.floor(local_microseconds / (3600 * 10 ** 6)) % 24).astype(np.int8)
+
+    @staticmethod
+    def _force_range(values: np.ndarray, max_value: float) -> np.ndarray:
+        return np.where(values < 0, values + max_value, np.where(values >= max_value, values - max_value, values))
+
+    def precompute(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> None:
+        with self._shared_tables_lock:
+            shared_table = self.SHARED_TABLES.get((self.latitude, self.longitude, self.timezone))
+            if shared_table is not None:
+                self.table_start, self.sunrise_hours, self.sunset_hours = shared_table
+            if self._get_table_idx(date_start.normalize()) >= 0 and self._get_table_idx(date_end.normalize()) >= 0:
+                return
+            if self.table_start is not None:
+                table_end = self.table_start + pd.Timedelta(days=len(self.sunrise_hours) - 1)
+                date_start = min(date_start.normalize(), self.table_start)
+                date_end = max(date_end.normalize(), table_end)
+            days = pd.date_range(start=date_start.normalize(), end=date_end.normalize(), freq="1D")
+            sunrise_hours = self.compute_sun_hours(days, is_rise_time=True)
+            sunset_hours = self.compute_sun_hours(days, is_rise_time=False)
+            self.table_start, self.sunrise_hours, self.sunset_hours = days[0], sunrise_hours, sunset_hours
+            self.SHARED_TABLES[(self.latitude, self.longitude, self.timezone)] = (days[0], sunrise_hours, sunset_hours)
+
+    def _get_table_idx(self, day: pd.Timestamp) -> int:
+        if self.table_start is None:
+            return -1
+        idx = (day - self.table_start).days
+        return idx if idx < len(self.sunrise_hours) else -1
 
     def get_sun_data(self, date_in: pd.Timestamp) -> (int, int):
-        sun = Sun(lat=self.latitude, lon=self.longitude)
-        sunrise = sun.get_local_sunrise_time(date_in.date())
-        sunset = sun.get_local_sunset_time(date_in.date())
-        sunrise_hour, sunset_hour = int(sunrise.strftime('%H')), int(sunset.strftime('%H'))
-        return sunrise_hour, sunset_hour
+        day = date_in.normalize()
+        idx = self._get_table_idx(day)
+        if idx >= 0:
+            return int(self.sunrise_hours[idx]), int(self.sunset_hours[idx])
+        if day in self._cache:
+            self._cache.move_to_end(day)
+            return self._cache[day]
+        days = pd.DatetimeIndex([day])
+        sun_data = int(self.compute_sun_hours(days, True)[0]), int(self.compute_sun_hours(days, False)[0])
+        self._cache[day] = sun_data
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return sun_data
+
+    def get_sun_data_range(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> Tuple[np.ndarray, np.ndarray]:
+        day_start, day_end = date_start.normalize(), date_end.normalize()
+        if self._get_table_idx(day_start) < 0 or self._get_table_idx(day_end) < 0:
+            self.precompute(day_start, day_end)
+        idx_start, idx_end = self._get_table_idx(day_start), self._get_table_idx(day_end) + 1
+        return self.sunrise_hours[idx_start:idx_end], self.sunset_hours[idx_start:idx_end]
 
 
 if __name__ == "__main__":
     sun_manager = SunManager()
     time_s = pd.to_datetime("01.01.2023 05:00:00", format="%d.%m.%Y %H:%M:%S")
     print(sun_manager.get_sun_data(time_s))
+    print(sun_manager.get_sun_data_range(time_s, time_s + pd.Timedelta(days=6)))
@@ -1,49 +1,88 @@
-import copy
-from datetime import timedelta
+import argparse
+import json
+import logging
+import os
+from typing import List, Union
 
 import pandas as pd
 
-from lib.logger import logger
-from scripts.energy_bank import EnergyBank
-from scripts.pv import Pv
-from systems.bare_system import BareSystem
-from systems.pv_system import PvSystem
-from systems.raw_full_system import RawFullSystem
-from systems.smart_save_system import SmartSaveSystem
-from systems.smart_system import SmartSystem
-
-
-def main():
-    date_start = pd.to_datetime("19.08.2020 06:00:00", format="%d.%m.%Y %H:%M:%S")
-    date_stop = pd.to_datetime("22.08.2020 14:00:00", format="%d.%m.%Y %H:%M:%S")
-    energy_bank = EnergyBank(capacity=3.0, min_lvl=0.0, lvl=1.0, purchase_cost=10000.0, cycles_num=5000)
-    pv_producer = Pv(size=5)
-
-    bare_system = BareSystem()
-    pv_system = PvSystem()
-    raw_full_system = RawFullSystem(copy.deepcopy(energy_bank), copy.deepcopy(pv_producer))
-    smart_system = SmartSystem(copy.deepcopy(energy_bank), copy.deepcopy(pv_producer))
-    smart_save_system = SmartSaveSystem(copy.deepcopy(energy_bank), copy.deepcopy(pv_producer))
-
-    for current_date in pd.date_range(start=date_start, end=date_stop, freq=timedelta(hours=1)):
-        logger.warning(f"CURRENT DATE: {current_date}")
-        bare_system.feed_consumption(current_date)
-        pv_system.feed_consumption(current_date)
-        raw_full_system.feed_consumption(current_date)
-        smart_system.feed_consumption(current_date)
-        smart_save_system.feed_consumption(current_date)
-
-    bare_system.plot_charts()
-    pv_system.plot_charts()
-    raw_full_system.plot_charts()
-    smart_system.plot_charts()
-    smart_save_system.plot_charts()
-
-    logger.info(f"BareSystem cost: {bare_system.summed_cost}")
-    logger.info(f"PvSystem cost: {pv_system.summed_cost}")
-    logger.info(f"RawFullSystem cost: {raw_full_system.summed_cost}")
-    logger.info(f"SmartSystem cost: {smart_system.summed_cost}")
-    logger.info(f"SmartSaveSystem cost: {smart_save_system.summed_cost}")
+from lib.logger import HOURLY, LOG_PATH, logger, setup_logging
+from scripts.simulation_runner import SimulationResult, SimulationRunner, SystemSpec
+
+LOG_LEVELS = {"HOURLY": HOURLY, "DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING}
+
+
+def parse_args(argv: Union[List[str], None] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulate energy management systems without any GUI.")
+    parser.add_argument("--start", type=pd.Timestamp, default=pd.Timestamp("2020-08-19 06:00:00"),
+                        help="First simulated hour, e.g. 2020-08-19T06:00")
+    parser.add_argument("--end", type=pd.Timestamp, default=pd.Timestamp("2020-08-22 14:00:00"),
+                        help="Last simulated hour, e.g. 2020-08-22T14:00")
+    parser.add_argument("--systems", nargs="+", default=list(SystemSpec.SYSTEMS), choices=list(SystemSpec.SYSTEMS))
+    parser.add_argument("--capacity", type=float, default=3.0, help="Energy bank capacity [kWh]")
+    parser.add_argument("--min-lvl", type=float, default=0.0, help="Energy bank min lvl [kWh]")
+    parser.add_argument("--lvl", type=float, default=1.0, help="Energy bank start lvl [kWh]")
+    parser.add_argument("--purchase-cost", type=float, default=10000.0, help="Energy bank purchase cost [zl]")
+    parser.add_argument("--cycles-num", type=int, default=5000, help="Energy bank cycles number")
+    parser.add_argument("--pv-size", type=float, default=5, help="Photovoltaic installation size [kW]")
+    parser.add_argument("--load-multiplier", type=float, default=None, help="Load multiplier of the consumption")
+    parser.add_argument("--summary", default=None, help="JSON file with the summary of every system")
+    parser.add_argument("--series", default=None, help="Parquet or CSV file with the hourly series of every system")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of worker processes, the number of cpus by default")
+    parser.add_argument("--no-prefetch", action="store_true", help="Use local data only, do not download missing data")
+    parser.add_argument("--log-level", default="INFO", choices=list(LOG_LEVELS))
+    parser.add_argument("--log-file", default=LOG_PATH,
+                        help="Rotated log file, {run_id} is replaced by the start time and pid of the run")
+    parser.add_argument("--plot", action="store_true", help="Show the charts of every system after the run")
+    return parser.parse_args(argv)
+
+
+def get_specs(args: argparse.Namespace) -> List[SystemSpec]:
+    energy_bank_params = {"capacity": args.capacity, "min_lvl": args.min_lvl, "lvl": args.lvl,
+                          "purchase_cost": args.purchase_cost, "cycles_num": args.cycles_num}
+    return [SystemSpec(system_name, load_multiplier=args.load_multiplier, pv_size=args.pv_size,
+                       energy_bank_params=energy_bank_params) for system_name in args.systems]
+
+
+def get_summary(args: argparse.Namespace, results: List[SimulationResult]) -> dict:
+    return {"start": str(args.start), "end": str(args.end),
+            "parameters": {"capacity": args.capacity, "min_lvl": args.min_lvl, "lvl": args.lvl,
+                           "purchase_cost": args.purchase_cost, "cycles_num": args.cycles_num,
+                           "pv_size": args.pv_size, "load_multiplier": args.load_multiplier},
+            "systems": {result.label: {"summed_cost": float(result.summed_cost),
+                                       "bank_lvl": None if result.bank_lvl is None else float(result.bank_lvl),
+                                       "hours": len(result.df)} for result in results}}
+
+
+def save_series(path: str, results: List[SimulationResult]) -> None:
+    series_df = pd.concat([result.df.assign(System=result.label) for result in results], ignore_index=True)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".csv"):
+        series_df.to_csv(path, index=False)
+    else:
+        series_df.to_parquet(path, index=False)
+
+
+def main(argv: Union[List[str], None] = None) -> dict:
+    args = parse_args(argv)
+    setup_logging(level=LOG_LEVELS[args.log_level], log_path=args.log_file)
+    results = SimulationRunner(get_specs(args), max_workers=args.jobs).run(args.start, args.end,
+                                                                           prefetch=not args.no_prefetch)
+    for result in results:
+        logger.info("%s cost: %s", result.label, result.summed_cost)
+    summary = get_summary(args, results)
+    if args.summary is None:
+        print(json.dumps(summary))
+    else:
+        os.makedirs(os.path.dirname(args.summary) or ".", exist_ok=True)
+        with open(args.summary, "w") as summary_file:
+            json.dump(summary, summary_file, indent=4)
+    if args.series is not None:
+        save_series(args.series, results)
+    if args.plot:
+        for result in results:
+            result.plot_charts()
+    return summary
 
 
 if __name__ == "__main__":
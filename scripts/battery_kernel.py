@@ -0,0 +1,81 @@
+from typing import Tuple
+
+import numpy as np
+
+from scripts.energy_bank import EnergyBank
+
+
+class BatteryKernel:
+    """
+    Class running the energy bank recurrence of a whole horizon in one loop over plain floats. It reproduces
+    EnergyBank.manage_energy and EnergyBank.operation_cost step by step, including the unrounded bank level and
+    rounding to cents done the same way as numpy does it for the values of the hourly path.
+
+    Attributes:
+        capacity (float): Energy bank capacity expressed in kWh.
+        min_lvl (float): The min value that the energy bank can reach.
+        single_cycle_cost (float): Cost of a single full cycle of the energy bank.
+    """
+
+    def __init__(self, capacity: float, min_lvl: float, single_cycle_cost: float):
+        self.capacity = capacity
+        self.min_lvl = min_lvl
+        self.single_cycle_cost = single_cycle_cost
+
+    @classmethod
+    def from_energy_bank(cls, energy_bank: EnergyBank) -> 'BatteryKernel':
+        return cls(energy_bank.capacity, energy_bank.min_lvl, energy_bank.single_cycle_cost)
+
+    @staticmethod
+    def round_cents(value: float) -> float:
+        return round(value * 100) / 100
+
+    def manage_energy(self, lvl: float, input_energy: float) -> Tuple[float, float]:
+        if input_energy < 0:
+            if -input_energy <= lvl - self.min_lvl:
+                return lvl + input_energy, 0.0
+            return self.min_lvl, self.round_cents(input_energy + (lvl - self.min_lvl))
+        empty_space = self.capacity - lvl
+        if empty_space >= input_energy:
+            return lvl + input_energy, 0.0
+        return lvl + empty_space, self.round_cents(input_energy - empty_space)
+
+    def operation_cost(self, input_balance: float) -> float:
+        return self.round_cents(abs(input_balance) / (2 * self.capacity) * self.single_cycle_cost)
+
+    def run_raw_full(self, prices: np.ndarray, balances: np.ndarray, lvl: float) -> Tuple[np.ndarray, np.ndarray]:
+        manage_energy, operation_cost = self.manage_energy, self.operation_cost
+        lvls, costs = [], []
+        for price, balance in zip(prices.tolist(), balances.tolist()):
+            bank_lvl = lvl
+            lvl, rest_energy = manage_energy(lvl, balance)
+            if balance >= 0.0:
+                cost = -rest_energy * price + operation_cost(balance - rest_energy)
+            else:
+                cost = -rest_energy * price + operation_cost(min(bank_lvl, abs(balance)))
+            lvls.append(lvl)
+            costs.append(cost)
+        return np.array(lvls), np.array(costs)
+
+    def run_smart_save(self, prices: np.ndarray, balances: np.ndarray, average_costs: np.ndarray,
+                       lvl: float) -> Tuple[np.ndarray, np.ndarray]:
+        manage_energy, operation_cost, capacity = self.manage_energy, self.operation_cost, self.capacity
+        lvls, costs = [], []
+        for price, balance, average_cost in zip(prices.tolist(), balances.tolist(), average_costs.tolist()):
+            if price >= 0.0:
+                is_expensive_hour = price >= average_cost + operation_cost(balance)
+                if (balance >= 0.0) == is_expensive_hour:
+                    cost = -balance * price
+                else:
+                    lvl, rest_energy = manage_energy(lvl, balance)
+                    cost = -rest_energy * price + operation_cost(balance - rest_energy)
+            elif balance >= 0.0:
+                lvl, rest_energy = manage_energy(lvl, balance)
+                cost = -rest_energy * price + operation_cost(balance - rest_energy)
+            else:
+                charged_energy = capacity - lvl
+                lvl, _ = manage_energy(lvl, charged_energy)
+                cost = -price * charged_energy + operation_cost(charged_energy)
+            lvls.append(lvl)
+            costs.append(cost)
+        return np.array(lvls), np.array(costs)
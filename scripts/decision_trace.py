@@ -0,0 +1,115 @@
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from scripts.energy_bank import EnergyBank
+
+
+class DecisionTrace:
+    """
+    Class recording why a smart system charged, discharged or traded energy in every simulated hour. Records are
+    kept in a NumPy record array of typed columns, which is saved with np.save and memory-mapped when loaded.
+    Besides the booked cost every record holds the value of the energy exchanged with the grid at the hour price and
+    the operation cost of the energy bank level change.
+
+    Attributes:
+        size (int): Number of recorded hours.
+        _records (np.ndarray): Buffer of the records, it grows geometrically.
+    """
+    STRATEGIES = ["day", "night", "optimal", "grid", "bank", "grid_charge"]
+    DTYPE = np.dtype([("date", "datetime64[ns]"), ("strategy", "i1"), ("price", "f8"), ("predicted_balance", "f8"),
+                      ("real_balance", "f8"), ("lvl_before", "f8"), ("lvl_after", "f8"), ("average_cost", "f8"),
+                      ("grid_cost", "f8"), ("operation_cost", "f8"), ("cost", "f8")])
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.size = 0
+        self._records = np.zeros(initial_capacity, dtype=self.DTYPE)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def records(self) -> np.ndarray:
+        return self._records[:self.size]
+
+    @classmethod
+    def get_strategy_code(cls, strategy: str) -> int:
+        if strategy not in cls.STRATEGIES:
+            raise Exception(f"Strategy: {strategy} is not traced, choose one of {cls.STRATEGIES}")
+        return cls.STRATEGIES.index(strategy)
+
+    def reserve(self, rows_num: int) -> None:
+        if self.size + rows_num > len(self._records):
+            records = np.zeros(max(2 * len(self._records), self.size + rows_num), dtype=self.DTYPE)
+            records[:self.size] = self._records[:self.size]
+            self._records = records
+
+    def add(self, date_in: pd.Timestamp, strategy: str, price: float, predicted_balance: float, real_balance: float,
+            lvl_before: float, lvl_after: float, average_cost: float, grid_cost: float, operation_cost: float,
+            cost: float) -> None:
+        self.reserve(1)
+        self._records[self.size] = (pd.Timestamp(date_in).to_datetime64(), self.get_strategy_code(strategy), price,
+                                    predicted_balance, real_balance, lvl_before, lvl_after, average_cost, grid_cost,
+                                    operation_cost, cost)
+        self.size += 1
+
+    def add_decision(self, energy_bank: EnergyBank, date_in: pd.Timestamp, strategy: str, price: float,
+                     predicted_balance: float, real_balance: float, lvl_before: float, average_cost: float,
+                     cost: float) -> None:
+        stored_energy = energy_bank.lvl - lvl_before
+        grid_cost = round(-(real_balance - stored_energy) * price, 2)
+        self.add(date_in, strategy, price, predicted_balance, real_balance, lvl_before, energy_bank.lvl, average_cost,
+                 grid_cost, energy_bank.operation_cost(stored_energy), round(cost, 2))
+
+    def add_block(self, dates: pd.DatetimeIndex, strategy_codes: np.ndarray, prices: np.ndarray,
+                  predicted_balances: np.ndarray, real_balances: np.ndarray, lvls_before: np.ndarray,
+                  lvls_after: np.ndarray, average_costs: np.ndarray, grid_costs: np.ndarray,
+                  operation_costs: np.ndarray, costs: np.ndarray) -> None:
+        rows_num = len(dates)
+        self.reserve(rows_num)
+        block = self._records[self.size:self.size + rows_num]
+        block["date"] = pd.DatetimeIndex(dates).to_numpy(dtype="datetime64[ns]")
+        for name, column in zip(self.DTYPE.names[1:], [strategy_codes, prices, predicted_balances, real_balances,
+                                                       lvls_before, lvls_after, average_costs, grid_costs,
+                                                       operation_costs, costs]):
+            block[name] = column
+        self.size += rows_num
+
+    def save(self, path: str) -> None:
+        # Written through a file, as np.save would append .npy to a path without it and load could not find it.
+        with open(path, "wb") as trace_file:
+            np.save(trace_file, self.records)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'DecisionTrace':
+        records = np.load(path, mmap_mode="r" if mmap else None)
+        if records.dtype != cls.DTYPE:
+            raise Exception(f"File: {path} does not hold a decision trace, its dtype is {records.dtype}")
+        trace = cls(initial_capacity=0)
+        trace._records = records
+        trace.size = len(records)
+        return trace
+
+    def to_df(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.records)
+        df["strategy"] = pd.Categorical.from_codes(df["strategy"], categories=self.STRATEGIES)
+        return df
+
+    def replay(self, start_cost: float = 0.0) -> np.ndarray:
+        return np.cumsum(np.concatenate(([start_cost], self.records["cost"])))[1:]
+
+    def aggregate(self, freq: Union[str, None] = "D") -> pd.DataFrame:
+        df = self.to_df()
+        keys = ["strategy"] if freq is None else [pd.Grouper(key="date", freq=freq), "strategy"]
+        aggregated_df = df.groupby(keys, observed=True).agg(
+            hours=("cost", "size"), real_balance=("real_balance", "sum"), grid_cost=("grid_cost", "sum"),
+            operation_cost=("operation_cost", "sum"), cost=("cost", "sum"))
+        return aggregated_df.reset_index()
+
+
+if __name__ == "__main__":
+    trace = DecisionTrace()
+    for date in pd.date_range(start="2020-01-01", periods=48, freq="1h"):
+        trace.add(date, "day" if 6 <= date.hour < 18 else "night", 0.5, 1.0, 0.8, 1.0, 1.8, 0.4, 0.0, 0.01, 0.01)
+    print(trace.aggregate())
@@ -0,0 +1,100 @@
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+
+
+class ChartDownsampler:
+    """
+    Class reducing hourly series to a point budget before they are sent to a chart. Series are downsampled with the
+    Largest-Triangle-Three-Buckets or the min/max method, which keep the shape and the extremes of the curves, or they
+    are aggregated by day, week or month. A zoomed range which fits in the budget is returned in full resolution.
+
+    Attributes:
+        max_points (int): The maximum number of rows of a downsampled dataframe.
+        method (str): "lttb", "min_max" or one of the aggregation periods: "day", "week", "month".
+        aggregations (Dict[str, str]): Aggregation functions of the columns, "mean" for columns not listed.
+    """
+    METHODS = ["lttb", "min_max"]
+    FREQUENCIES = {"day": "D", "week": "W", "month": "MS"}
+
+    def __init__(self, max_points: int = 2000, method: str = "lttb", aggregations: Union[Dict[str, str], None] = None):
+        if method not in self.METHODS and method not in self.FREQUENCIES:
+            raise Exception(f"Method: {method} is not supported, choose one of {self.METHODS + list(self.FREQUENCIES)}")
+        if max_points < 3:
+            raise Exception(f"Max points: {max_points} must be at least 3")
+        self.max_points = max_points
+        self.method = method
+        self.aggregations = {} if aggregations is None else aggregations
+
+    @staticmethod
+    def get_lttb_idxes(x: np.ndarray, y: np.ndarray, points_num: int) -> np.ndarray:
+        rows_num = len(y)
+        if points_num >= rows_num:
+            return np.arange(rows_num)
+        edges = np.linspace(1, rows_num - 1, points_num - 1).astype(int)
+        idxes = np.empty(points_num, dtype=int)
+        idxes[0], idxes[-1] = 0, rows_num - 1
+        selected_idx = 0
+        for bucket_idx in range(points_num - 2):
+            bucket_start, bucket_end = edges[bucket_idx], edges[bucket_idx + 1]
+            if bucket_idx == points_num - 3:
+                next_x, next_y = x[-1], y[-1]
+            else:
+                next_x = x[bucket_end:edges[bucket_idx + 2]].mean()
+                next_y = y[bucket_end:edges[bucket_idx + 2]].mean()
+            areas = np.abs((x[selected_idx] - next_x) * (y[bucket_start:bucket_end] - y[selected_idx]) -
+                           (x[selected_idx] - x[bucket_start:bucket_end]) * (next_y - y[selected_idx]))
+            selected_idx = bucket_start + int(np.argmax(areas))
+            idxes[bucket_idx + 1] = selected_idx
+        return idxes
+
+    @staticmethod
+    def get_min_max_idxes(y: np.ndarray, points_num: int) -> np.ndarray:
+        rows_num = len(y)
+        if points_num >= rows_num:
+            return np.arange(rows_num)
+        edges = np.linspace(0, rows_num, (points_num - 2) // 2 + 1).astype(int)
+        idxes = [0, rows_num - 1]
+        for bucket_start, bucket_end in zip(edges[:-1], edges[1:]):
+            bucket = y[bucket_start:bucket_end]
+            idxes += [bucket_start + int(np.argmin(bucket)), bucket_start + int(np.argmax(bucket))]
+        return np.unique(idxes)
+
+    def get_idxes(self, x: np.ndarray, y: np.ndarray, points_num: int) -> np.ndarray:
+        valid_idxes = np.flatnonzero(~np.isnan(y))
+        if self.method == "lttb":
+            return valid_idxes[self.get_lttb_idxes(x[valid_idxes], y[valid_idxes], points_num)]
+        return valid_idxes[self.get_min_max_idxes(y[valid_idxes], points_num)]
+
+    def aggregate(self, df: pd.DataFrame, x_column: str = "Date") -> pd.DataFrame:
+        rules = {column: self.aggregations.get(column, "mean") for column in df.columns if column != x_column}
+        aggregated_df = df.resample(self.FREQUENCIES[self.method], on=x_column).agg(rules)
+        return aggregated_df.dropna(how="all").reset_index()
+
+    def downsample(self, df: pd.DataFrame, x_column: str = "Date", date_start: Union[pd.Timestamp, None] = None,
+                   date_end: Union[pd.Timestamp, None] = None) -> pd.DataFrame:
+        if date_start is not None or date_end is not None:
+            dates = df[x_column]
+            in_range = np.ones(len(df), dtype=bool)
+            if date_start is not None:
+                in_range &= (dates >= date_start).to_numpy()
+            if date_end is not None:
+                in_range &= (dates <= date_end).to_numpy()
+            df = df[in_range]
+        if self.method in self.FREQUENCIES:
+            return self.aggregate(df, x_column)
+        if len(df) <= self.max_points:
+            return df
+        y_columns = [column for column in df.columns if column != x_column]
+        points_num = max(3, self.max_points // max(1, len(y_columns)))
+        x = (df[x_column] - df[x_column].iloc[0]).to_numpy() / np.timedelta64(1, "h")
+        idxes = [self.get_idxes(x, df[column].to_numpy(dtype=float), points_num) for column in y_columns]
+        return df.iloc[np.unique(np.concatenate([[0, len(df) - 1]] + idxes))]
+
+
+if __name__ == "__main__":
+    hours = pd.date_range(start="2020-01-01", end="2020-12-31 23:00", freq="1h")
+    series_df = pd.DataFrame({"Date": hours, "price": np.sin(np.arange(len(hours)) / 24) + np.random.rand(len(hours))})
+    for method_name in ChartDownsampler.METHODS + list(ChartDownsampler.FREQUENCIES):
+        print(method_name, len(ChartDownsampler(max_points=1000, method=method_name).downsample(series_df)))
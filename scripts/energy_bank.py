@@ -1,3 +1,8 @@
+from typing import List, Tuple, Union
+
+import numpy as np
+
+
 class EnergyBank:
     """
     Class simulating the behavior of an energy bank
@@ -28,11 +33,19 @@ class EnergyBank:
 
     @lvl.setter
     def lvl(self, new_lvl: float):
+        self._lvl = self.validate_lvl(new_lvl)
+
+    def validate_lvl(self, new_lvl: float) -> float:
         rounded_lvl = round(new_lvl, 2)
         if self.min_lvl <= rounded_lvl <= self.capacity:
-            self._lvl = rounded_lvl
+            return rounded_lvl
+        raise Exception(f"Lvl: {new_lvl} must be between {self.min_lvl} and {self.capacity}")
+
+    def restore_lvl(self, lvl: float) -> None:
+        if self.min_lvl <= round(lvl, 2) <= self.capacity:
+            self._lvl = lvl
         else:
-            raise Exception(f"Lvl: {new_lvl} must be between {self.min_lvl} and {self.capacity}")
+            raise Exception(f"Lvl: {lvl} must be between {self.min_lvl} and {self.capacity}")
 
     def manage_energy(self, input_energy: float) -> float:
         if input_energy < 0:
@@ -40,31 +53,47 @@ class EnergyBank:
         else:
             return round(self._store_energy(input_energy), 2)
 
+    def _get_next_lvl(self, lvl: float, input_energy: float) -> Tuple[float, float]:
+        if input_energy < 0:
+            if abs(input_energy) <= lvl - self.min_lvl:
+                return lvl + input_energy, 0.0
+            return self.min_lvl, input_energy + (lvl - self.min_lvl)
+        empty_space = self.capacity - lvl
+        if empty_space >= input_energy:
+            return lvl + input_energy, 0.0
+        return lvl + empty_space, input_energy - empty_space
+
     def _store_energy(self, given_energy: float) -> float:
         if given_energy < 0:
             raise Exception(f"Energy: {given_energy} < 0")
-        empty_space = self.capacity - self._lvl
-        if empty_space >= given_energy:
-            self._lvl += given_energy
-            return 0.0
-        else:
-            self._lvl += empty_space
-            return given_energy - empty_space
+        self._lvl, rest_energy = self._get_next_lvl(self._lvl, given_energy)
+        return rest_energy
 
     def _release_energy(self, request_energy: float) -> float:
         if request_energy > 0:
             raise Exception(f"Energy: {request_energy} > 0")
-        if abs(request_energy) <= self._lvl - self.min_lvl:
-            self._lvl += request_energy
-            return 0.0
-        else:
-            rest_energy = request_energy + (self._lvl - self.min_lvl)
-            self._lvl = self.min_lvl
-            return rest_energy
+        self._lvl, rest_energy = self._get_next_lvl(self._lvl, request_energy)
+        return rest_energy
 
-    def operation_cost(self, input_balance: float) -> float:
+    def simulate_trajectory(self, balances: Union[List[float], np.ndarray],
+                            start_lvl: Union[float, None] = None) -> Tuple[np.ndarray, np.ndarray]:
+        lvl = self._lvl if start_lvl is None else start_lvl
+        lvls, rest_energies = [lvl], []
+        for balance in balances:
+            lvl, rest_energy = self._get_next_lvl(lvl, balance)
+            lvls.append(lvl)
+            rest_energies.append(round(rest_energy, 2))
+        return np.array(lvls, dtype=float), np.array(rest_energies, dtype=float)
+
+    @property
+    def single_cycle_cost(self) -> float:
         if self.purchase_cost < 0.0 or self.cycles_num < 0:
             raise Exception(f"Purchase cost: {self.purchase_cost} and start cycles number: {self.cycles_num} must be greater than 0")
-        single_cycle_cost = self.purchase_cost / self.cycles_num
+        return self.purchase_cost / self.cycles_num
+
+    def operation_cost(self, input_balance: float) -> float:
         cycle_part = abs(input_balance) / (2 * self.capacity)
-        return round(cycle_part * single_cycle_cost, 2)
+        return round(cycle_part * self.single_cycle_cost, 2)
+
+    def operation_costs(self, input_balances: np.ndarray) -> np.ndarray:
+        return np.round(np.abs(input_balances) / (2 * self.capacity) * self.single_cycle_cost, 2)
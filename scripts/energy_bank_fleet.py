@@ -0,0 +1,113 @@
+from typing import List, Union
+
+import numpy as np
+
+from scripts.energy_bank import EnergyBank
+
+
+class EnergyBankFleet:
+    """
+    Class simulating many energy banks at once. Every parameter is kept in a NumPy array with one entry per unit,
+    so a unit costs 40 bytes and a single hour of the whole fleet is handled with a few array operations.
+    Levels, rest energies and costs are computed the same way as by EnergyBank and RawFullSystem.
+
+    Attributes:
+        capacity (np.ndarray): Energy bank capacities expressed in kWh.
+        min_lvl (np.ndarray): The min values that the energy banks can reach.
+        _lvl (np.ndarray): Current energy bank levels expressed in kWh.
+        purchase_cost (np.ndarray): The costs of purchase.
+        cycles_num (np.ndarray): Numbers of cycles for which the energy banks will operate correctly.
+    """
+
+    def __init__(self,
+                 capacity: Union[float, np.ndarray] = 6.75,
+                 min_lvl: Union[float, np.ndarray] = 0.0,
+                 lvl: Union[float, np.ndarray] = 1.0,
+                 purchase_cost: Union[float, np.ndarray] = 500.0,
+                 cycles_num: Union[int, np.ndarray] = 8000,
+                 units_num: Union[int, None] = None):
+        params = [np.asarray(capacity, dtype=float), np.asarray(min_lvl, dtype=float), np.asarray(lvl, dtype=float),
+                  np.asarray(purchase_cost, dtype=float), np.asarray(cycles_num, dtype=np.int64)]
+        shape = np.broadcast_shapes((1,), *[param.shape for param in params]) if units_num is None else (units_num,)
+        if len(shape) != 1:
+            raise Exception(f"Parameters of the fleet must be scalars or 1-D arrays of the same length, got shape: {shape}")
+        capacity, min_lvl, lvl, purchase_cost, cycles_num = [np.broadcast_to(param, shape).copy() for param in params]
+        if np.any(purchase_cost < 0.0) or np.any(cycles_num <= 0):
+            raise Exception("Purchase costs and start cycles numbers must be greater than 0")
+        self.capacity = capacity
+        self.min_lvl = min_lvl
+        self._lvl = lvl
+        self.purchase_cost = purchase_cost
+        self.cycles_num = cycles_num
+
+    @classmethod
+    def from_energy_banks(cls, energy_banks: List[EnergyBank]) -> 'EnergyBankFleet':
+        return cls(capacity=[eb.capacity for eb in energy_banks], min_lvl=[eb.min_lvl for eb in energy_banks],
+                   lvl=[eb.lvl for eb in energy_banks], purchase_cost=[eb.purchase_cost for eb in energy_banks],
+                   cycles_num=[eb.cycles_num for eb in energy_banks])
+
+    def __len__(self) -> int:
+        return len(self._lvl)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in [self.capacity, self.min_lvl, self._lvl, self.purchase_cost, self.cycles_num])
+
+    @property
+    def lvl(self) -> np.ndarray:
+        return self._lvl
+
+    @lvl.setter
+    def lvl(self, new_lvl: Union[float, np.ndarray]):
+        rounded_lvl = np.round(np.broadcast_to(np.asarray(new_lvl, dtype=float), self._lvl.shape), 2)
+        invalid_units = np.flatnonzero((rounded_lvl < self.min_lvl) | (rounded_lvl > self.capacity))
+        if len(invalid_units):
+            raise Exception(f"Lvl of units: {invalid_units[:10].tolist()} must be between their min lvl and capacity")
+        self._lvl = rounded_lvl
+
+    def manage_energy(self, input_energy: Union[float, np.ndarray]) -> np.ndarray:
+        input_energy = np.broadcast_to(np.asarray(input_energy, dtype=float), self._lvl.shape)
+        available_energy = self._lvl - self.min_lvl
+        empty_space = self.capacity - self._lvl
+        is_released = input_energy < 0
+        is_clamped = np.where(is_released, -input_energy > available_energy, empty_space < input_energy)
+        rest_energy = np.where(is_released, input_energy + available_energy, input_energy - empty_space)
+        rest_energy = np.where(is_clamped, np.round(rest_energy, 2), 0.0)
+        self._lvl = np.where(is_clamped, np.where(is_released, self.min_lvl, self._lvl + empty_space),
+                             self._lvl + input_energy)
+        return rest_energy
+
+    def operation_cost(self, input_balance: Union[float, np.ndarray]) -> np.ndarray:
+        single_cycle_cost = self.purchase_cost / self.cycles_num
+        cycle_part = np.abs(input_balance) / (2 * self.capacity)
+        return np.round(cycle_part * single_cycle_cost, 2)
+
+    def calculate_cost(self, price: float, balance: Union[float, np.ndarray]) -> np.ndarray:
+        balance = np.broadcast_to(np.asarray(balance, dtype=float), self._lvl.shape)
+        bank_lvl = self._lvl
+        balance_after_bank = self.manage_energy(balance)
+        used_energy = np.where(balance >= 0.0, balance - balance_after_bank, np.minimum(bank_lvl, np.abs(balance)))
+        return -balance_after_bank * price + self.operation_cost(used_energy)
+
+    def run_raw_full(self, prices: np.ndarray, balances: np.ndarray) -> np.ndarray:
+        """
+        Feeds the hourly balances to every unit the way RawFullSystem does and returns the summed cost of every unit.
+        Balances are a 1-D array shared by the whole fleet or a 2-D array with a column per unit.
+        """
+        balances = np.asarray(balances, dtype=float)
+        if len(balances) != len(prices):
+            raise Exception(f"Number of balances: {len(balances)} differs from the number of prices: {len(prices)}")
+        summed_costs = np.zeros(len(self))
+        for price, balance in zip(np.asarray(prices, dtype=float), balances):
+            summed_costs += np.round(self.calculate_cost(price, balance), 2)
+        return summed_costs
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    fleet = EnergyBankFleet(capacity=rng.choice([3.0, 5.0, 6.75, 10.0], 10000), lvl=1.0, purchase_cost=10000.0,
+                            cycles_num=5000)
+    hourly_prices = np.round(rng.uniform(-0.2, 1.0, 24 * 7), 2)
+    hourly_balances = np.round(rng.uniform(-2.0, 3.0, 24 * 7), 2)
+    fleet_costs = fleet.run_raw_full(hourly_prices, hourly_balances)
+    print(f"Units: {len(fleet)}, bytes per unit: {fleet.nbytes / len(fleet)}, mean cost: {fleet_costs.mean():.2f}")
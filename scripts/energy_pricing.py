@@ -1,35 +1,45 @@
-import os
-from datetime import timedelta
 from io import StringIO
 from typing import Union, List
 
+import numpy as np
 import pandas as pd
-import requests
 
 from lib.config import Config
-from scripts.file_management import DfManager
+from lib.http_session import get_http_session
+from scripts.price_store import PriceStore
 
 
 class EnergyWebScraper:
     """
-    Class fetching Polish market prices of electricity from www.pse.pl. Hereafter referred to as RCE
+    Class fetching Polish market prices of electricity from www.pse.pl. Hereafter referred to as RCE. Fetched prices
+    are kept in a local price store, so only market days missing from the store are downloaded.
     """
 
-    def __init__(self, prices_path: str = Config.DATA_PRICES, date_column: Union[str, None] = None):
-        self.df_manager = DfManager(prices_path, date_column)
+    def __init__(self, prices_path: str = Config.DATA_PRICES, date_column: Union[str, None] = None,
+                 download_link: str = Config.CSV_DOWNLOAD_LINK, offline: bool = False):
+        self.price_store = PriceStore(prices_path, date_column)
+        self.df_manager = self.price_store.df_manager
         self.date_column = date_column
+        self.download_link = download_link
+        self.offline = offline
 
-    @staticmethod
-    def download_prices_by_date(date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None) -> pd.DataFrame:
+    def download_prices_csv(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None) -> str:
         if date_end is None or date_start.strftime('%Y%m%d') == date_end.strftime('%Y%m%d'):
-            url = Config.CSV_DOWNLOAD_LINK + "data/" + date_start.strftime('%Y%m%d')
+            url = self.download_link + "data/" + date_start.strftime('%Y%m%d')
         else:
-            url = Config.CSV_DOWNLOAD_LINK + "data_od/" + date_start.strftime("%Y%m%d") + "/data_do/" + date_end.strftime("%Y%m%d")
-        response = requests.get(url)
-        df = pd.read_csv(StringIO(response.content.decode('utf-8')), sep=';', decimal=',')
+            url = self.download_link + "data_od/" + date_start.strftime("%Y%m%d") + "/data_do/" + date_end.strftime("%Y%m%d")
+        response = get_http_session().get(url)
+        return response.content.decode('utf-8')
+
+    @staticmethod
+    def parse_prices_csv(content: str) -> pd.DataFrame:
+        df = pd.read_csv(StringIO(content), sep=';', decimal=',')
         df["RCE"] = (df["RCE"] / 1000).round(2)
         return df
 
+    def download_prices_by_date(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None) -> pd.DataFrame:
+        return self.parse_prices_csv(self.download_prices_csv(date_start, date_end))
+
     @staticmethod
     def simulate_negative_prices(prices: List[float], start_idx: int = 10, negative_amount: int = 2) -> List[float]:
         prices_len = len(prices)
@@ -41,28 +51,34 @@ class EnergyWebScraper:
             prices[start_idx:start_idx + negative_amount] = [-x for x in prices[start_idx:start_idx + negative_amount]]
         return prices
 
-    def get_prices_file_by_date(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None, simulate_negative: bool = False) -> None:
-        df = self.download_prices_by_date(date_start, date_end)
+    def to_store_format(self, df: pd.DataFrame) -> pd.DataFrame:
         df[self.date_column] = df["Data"].astype(str) + df["Godzina"].apply(lambda x: x - 1).astype(str) + "00"
         df[self.date_column] = pd.to_datetime(df[self.date_column], format="%Y%m%d%H%M%S")
-        df[self.date_column] = df[self.date_column].dt.strftime('%d.%m.%Y %H:%M:%S')
-        df.drop(["Data", "Godzina"], axis=1, inplace=True)
+        return df.drop(["Data", "Godzina"], axis=1)
+
+    def get_prices_file_by_date(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None, simulate_negative: bool = False) -> None:
+        df = self.to_store_format(self.download_prices_by_date(date_start, date_end))
         if simulate_negative:
             df.update({"RCE": self.simulate_negative_prices(df["RCE"].tolist())})
-        self.df_manager.save_to_file(df)
+        self.price_store.add_prices(df)
+
+    def fetch_missing_prices(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None) -> None:
+        missing_ranges = self.price_store.get_missing_ranges(date_start, date_end)
+        if missing_ranges and self.offline:
+            raise Exception(f"Prices for days {missing_ranges} are not in the price store and downloads are disabled")
+        for range_start, range_end in missing_ranges:
+            self.get_prices_file_by_date(range_start, range_end)
 
     def get_rce_by_date(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None) -> Union[List[float], float]:
-        if not os.path.isfile(self.df_manager.path):
-            self.get_prices_file_by_date(date_start)
         if date_end is None:
-            if not self.df_manager.is_date_in_file(self.date_column, date_start):
-                self.get_prices_file_by_date(date_start)
+            self.fetch_missing_prices(date_start)
             return self.df_manager.get_cell_by_date(self.date_column, date_start, "RCE")
         else:
-            if not (self.df_manager.is_date_in_file(self.date_column, date_start) and self.df_manager.is_date_in_file(self.date_column, date_end)):
-                self.get_prices_file_by_date(date_start, date_end)
-            dates = pd.date_range(start=date_start, end=date_end, freq=timedelta(hours=1))
-            return [self.df_manager.get_cell_by_date(self.date_column, x, "RCE") for x in dates]
+            return self.get_rce_array_by_date(date_start, date_end).tolist()
+
+    def get_rce_array_by_date(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> np.ndarray:
+        self.fetch_missing_prices(date_start, date_end)
+        return self.df_manager.get_values_by_date_range(self.date_column, date_start, date_end, "RCE")
 
     def check_next_day_availability(self, date_in: pd.Timestamp) -> bool:
         try:
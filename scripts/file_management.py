@@ -1,10 +1,42 @@
-from typing import Dict, List
+import fcntl
+import importlib.util
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from lib.config import DataTypes
 
 
+def get_tmp_path(path: str) -> str:
+    """
+    Creates a unique temporary file next to path, so concurrent writers of the same file, in one or in several
+    processes, never replace each other's temporary file.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", prefix=f"{os.path.basename(path)}.",
+                                    dir=os.path.dirname(path) or ".")
+    os.close(fd)
+    os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+    return tmp_path
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Holds an exclusive lock of path for a read-modify-write of the file. The lock is taken on a .lock file next to
+    path, as the file itself is replaced by every write.
+    """
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 class CSVManager:
     @staticmethod
     def get_content(path: str) -> pd.DataFrame:
@@ -12,28 +44,145 @@ class CSVManager:
 
     @staticmethod
     def save_content(path: str, df: pd.DataFrame, date_format: str, sep: str = ',') -> None:
-        df.to_csv(path, index=False, date_format=date_format, sep=sep)
+        tmp_path = get_tmp_path(path)
+        try:
+            df.to_csv(tmp_path, index=False, date_format=date_format, sep=sep)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class FeatherManager:
+    """
+    Class reading and writing uncompressed Feather (Arrow IPC) files. Files are memory-mapped on reading, so no text
+    parsing is done and processes loading the same file share the page cache.
+    """
+
+    @staticmethod
+    def is_available() -> bool:
+        return importlib.util.find_spec("pyarrow") is not None
+
+    @staticmethod
+    def get_content(path: str) -> pd.DataFrame:
+        from pyarrow import feather
+        return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+    @staticmethod
+    def save_content(path: str, df: pd.DataFrame) -> None:
+        from pyarrow import feather
+        tmp_path = get_tmp_path(path)
+        try:
+            feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
 
 class DfManager:
     """
-    Class responsible for handling the reading, writing, and editing of a pd.DataFrame from a .csv files.
+    Class responsible for handling the reading, writing, and editing of a pd.DataFrame from a .csv or .feather files.
+
+    The file is parsed once and kept in memory together with a copy indexed by the date column. The cache is
+    invalidated when the file is written through this manager or when its modification time changes.
+
+    A .csv file is converted once to a .feather file next to it, which is memory-mapped on later loads. The .csv
+    file stays the exported format and the .feather file is rebuilt whenever the .csv file is newer.
     """
 
-    def __init__(self, path: str, date_col: str = "Date"):
+    def __init__(self, path: str, date_col: str = "Date", binary_cache: bool = True):
         self.path = path
         self.date_col = date_col
         self.csv_manager = CSVManager()
+        self.feather_manager = FeatherManager()
         self.date_format = "%d.%m.%Y %H:%M:%S"
+        self.is_binary = path.endswith(".feather")
+        if not self.is_binary and binary_cache and path.endswith(".csv") and self.feather_manager.is_available():
+            self.binary_path = path[:-len(".csv")] + ".feather"
+        else:
+            self.binary_path = None
+        self._cached_df = None
+        self._cached_mtime = None
+        self._indexed_dfs = {}
+        self._value_arrays = {}
 
-    def get_from_file(self) -> pd.DataFrame:
-        df = self.csv_manager.get_content(self.path)
-        if self.date_col is not None and self.date_col in df.columns:
+    def _get_file_mtime(self) -> Union[Tuple[int, int], None]:
+        try:
+            file_stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    def invalidate_cache(self) -> None:
+        self._cached_df = None
+        self._cached_mtime = None
+        self._indexed_dfs = {}
+        self._value_arrays = {}
+
+    def _get_cached(self) -> pd.DataFrame:
+        mtime = self._get_file_mtime()
+        if self._cached_df is None or mtime is None or mtime != self._cached_mtime:
+            self.invalidate_cache()
+            self._cached_df = self._read_content().fillna('')
+            self._cached_mtime = mtime
+        return self._cached_df
+
+    def _is_binary_up_to_date(self) -> bool:
+        if self.binary_path is None or not os.path.exists(self.binary_path):
+            return False
+        return os.stat(self.binary_path).st_mtime_ns >= os.stat(self.path).st_mtime_ns
+
+    def _parse_dates(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.date_col is not None and self.date_col in df.columns and df[self.date_col].dtype != "datetime64[ns]":
+            df = df.copy()
             df[self.date_col] = pd.to_datetime(df[self.date_col], format=self.date_format)
-        return df.fillna('')
+        return df
+
+    def _read_content(self) -> pd.DataFrame:
+        if self.is_binary:
+            return self._parse_dates(self.feather_manager.get_content(self.path))
+        if self._is_binary_up_to_date():
+            return self._parse_dates(self.feather_manager.get_content(self.binary_path))
+        df = self._parse_dates(self.csv_manager.get_content(self.path))
+        self._save_binary_cache(df)
+        return df
+
+    def _save_binary_cache(self, df: pd.DataFrame) -> None:
+        if self.binary_path is None:
+            return
+        try:
+            self.feather_manager.save_content(self.binary_path, self._parse_dates(df))
+        except (TypeError, ValueError):
+            # Columns of mixed types can not be stored in the Arrow format, such files are read from the .csv file.
+            if os.path.exists(self.binary_path):
+                os.remove(self.binary_path)
+
+    def _get_indexed(self, date_col: str) -> pd.DataFrame:
+        df = self._get_cached()
+        if date_col not in self._indexed_dfs:
+            if date_col not in df.columns or df[date_col].dtype != "datetime64[ns]":
+                raise Exception(f"Column {date_col} is not valid")
+            indexed_df = df.set_index(date_col, drop=False)
+            indexed_df = indexed_df[~indexed_df.index.duplicated(keep='first')]
+            if not indexed_df.index.is_monotonic_increasing:
+                indexed_df = indexed_df.sort_index()
+            self._indexed_dfs[date_col] = indexed_df
+        return self._indexed_dfs[date_col]
+
+    def get_from_file(self) -> pd.DataFrame:
+        return self._get_cached().copy()
 
     def save_to_file(self, df: pd.DataFrame, sep: str = ',') -> None:
-        self.csv_manager.save_content(self.path, df, self.date_format, sep)
+        if self.is_binary:
+            self.feather_manager.save_content(self.path, self._parse_dates(df))
+        else:
+            self.csv_manager.save_content(self.path, df, self.date_format, sep)
+            self._save_binary_cache(df)
+        self.invalidate_cache()
+
+    def export_to_csv(self, path: str, sep: str = ',') -> None:
+        self.csv_manager.save_content(path, self.get_from_file(), self.date_format, sep)
 
     def update_columns_names(self, cols_names: Dict[str, str]) -> None:
         df = self.get_from_file()
@@ -51,19 +200,43 @@ class DfManager:
             raise Exception(f"Column {val_col} is not valid")
 
     def get_cell_by_date(self, date_col: str, date_in: pd.Timestamp, val_col: str) -> DataTypes.DF_VAL:
-        df = self.get_from_file()
-        if date_col in df.columns and df[date_col].dtype == "datetime64[ns]":
-            return df.loc[df[date_col] == date_in, val_col].values[0]
-        else:
+        indexed_df = self._get_indexed(date_col)
+        if val_col not in indexed_df.columns:
             raise Exception(f"Column {val_col} is not valid")
+        return indexed_df.at[date_in, val_col]
+
+    def get_values_by_date_range(self, date_col: str, date_start: pd.Timestamp, date_end: pd.Timestamp, val_col: str) -> np.ndarray:
+        """
+        Returns hourly values of val_col from date_start to date_end (both inclusive) as a read-only slice of the
+        cached column, without a per-hour lookup.
+        """
+        indexed_df = self._get_indexed(date_col)
+        if val_col not in indexed_df.columns:
+            raise Exception(f"Column {val_col} is not valid")
+        if (date_col, val_col) not in self._value_arrays:
+            values = indexed_df[val_col].to_numpy(dtype=float, copy=True)
+            values.flags.writeable = False
+            self._value_arrays[(date_col, val_col)] = values
+        values = self._value_arrays[(date_col, val_col)]
+        expected_len = int((date_end - date_start) // pd.Timedelta(hours=1)) + 1
+        if expected_len <= 0:
+            return values[:0]
+        idx_start = indexed_df.index.searchsorted(date_start, side="left")
+        idx_end = indexed_df.index.searchsorted(date_end, side="right")
+        dates = indexed_df.index[idx_start:idx_end]
+        if len(dates) == expected_len and dates[0] == date_start and (np.diff(dates.asi8) == pd.Timedelta(hours=1).value).all():
+            return values[idx_start:idx_end]
+        hourly_values = indexed_df[val_col].reindex(pd.date_range(date_start, date_end, freq="1h"))
+        if hourly_values.isna().any():
+            raise Exception(f"Hourly values of {val_col} between {date_start} and {date_end} are missing")
+        return hourly_values.to_numpy(dtype=float)
 
     def get_subset_by_date(self, date_col: str, date_start: pd.Timestamp, date_end: pd.Timestamp) -> pd.DataFrame:
-        df = self.get_from_file()
-        return df[(df[date_col] >= date_start) & (df[date_col] <= date_end)]
+        return self._get_indexed(date_col).loc[date_start:date_end].reset_index(drop=True)
 
     def is_date_in_file(self, date_col: str, date_in: pd.Timestamp) -> bool:
-        first_date, last_date = self.get_from_file()[date_col].iloc[[0, -1]]
-        if not (first_date <= date_in <= last_date):
+        dates = self._get_indexed(date_col).index
+        if dates.empty or not (dates[0] <= date_in <= dates[-1]):
             return False
         return True
 
@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from typing import Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from lib.config import Config
+from scripts.energy_pricing import EnergyWebScraper
+from scripts.load import Load
+from scripts.pv import Pv
+
+# Smart systems plan until the next sunrise, so a run needs data up to one day past its last hour.
+RUN_LOOKAHEAD = pd.Timedelta(days=1)
+
+
+class HourlyDataset:
+    """
+    Class joining energy prices, load consumption and pv production on one hourly time axis. The data is stored in
+    a single read-only array, so every system fed from the dataset works on views of the same memory.
+
+    Attributes:
+        dates (pd.DatetimeIndex): Hourly time axis of the dataset.
+        prices (np.ndarray): RCE prices for every hour.
+        consumptions (np.ndarray): Load consumption for every hour, without any load multiplier.
+        productions (np.ndarray): Pv production for every hour, of an installation of Pv.FILE_SIZE kW.
+    """
+
+    def __init__(self, dates: pd.DatetimeIndex, prices: np.ndarray, consumptions: np.ndarray, productions: np.ndarray):
+        if not (len(dates) == len(prices) == len(consumptions) == len(productions)):
+            raise Exception(f"Dates, prices, consumptions and productions lengths must be equals: "
+                            f"{len(dates)}, {len(prices)}, {len(consumptions)}, {len(productions)}")
+        if len(dates) == 0 or (len(dates) > 1 and not (np.diff(dates.asi8) == pd.Timedelta(hours=1).value).all()):
+            raise Exception("Dates must form a non-empty hourly time axis")
+        self.dates = dates
+        self._data = np.array([prices, consumptions, productions], dtype=float)
+        self._data.flags.writeable = False
+        self.prices, self.consumptions, self.productions = self._data
+
+    def __reduce__(self) -> tuple:
+        return self.__class__, (self.dates, *self._data)
+
+    @classmethod
+    def from_sources(cls, date_start: pd.Timestamp, date_end: pd.Timestamp, energy_pricer: EnergyWebScraper,
+                     consumer: Load, producer: Pv) -> 'HourlyDataset':
+        return cls(pd.date_range(start=date_start, end=date_end, freq="1h"),
+                   energy_pricer.get_rce_array_by_date(date_start, date_end),
+                   consumer.get_consumption_array_by_date(date_start, date_end),
+                   producer.get_production_array_by_date(date_start, date_end))
+
+    @property
+    def date_start(self) -> pd.Timestamp:
+        return self.dates[0]
+
+    @property
+    def date_end(self) -> pd.Timestamp:
+        return self.dates[-1]
+
+    def covers(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None) -> bool:
+        date_end = date_start if date_end is None else date_end
+        return self.date_start <= date_start and date_end <= self.date_end
+
+    def get_idx(self, date_in: pd.Timestamp) -> int:
+        if not self.covers(date_in):
+            raise Exception(f"Date: {date_in} is not in the dataset")
+        return (date_in - self.date_start) // pd.Timedelta(hours=1)
+
+    def get_record(self, date_in: pd.Timestamp) -> Tuple[float, float, float]:
+        price, consumption, production = self._data[:, self.get_idx(date_in)]
+        return price, consumption, production
+
+    def get_range(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if date_end < date_start:
+            idx_start = idx_end = self.get_idx(date_start)
+        else:
+            idx_start, idx_end = self.get_idx(date_start), self.get_idx(date_end) + 1
+        prices, consumptions, productions = self._data[:, idx_start:idx_end]
+        return prices, consumptions, productions
+
+
+class DatasetRegistry:
+    """
+    Process-wide registry of hourly datasets. Systems created within one run share a single dataset instead of
+    loading and querying the same files separately. A request is served by any kept dataset which covers it,
+    otherwise exactly the requested span is loaded. Only the most recently used datasets are kept. The registry is
+    shared by the threads of a process and every access to it holds a lock, a missing span is loaded without it.
+    """
+    MAX_DATASETS = 4
+    _datasets: "OrderedDict[Tuple[str, pd.Timestamp, pd.Timestamp], HourlyDataset]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_dataset(cls, date_start: pd.Timestamp, date_end: pd.Timestamp, prices_path: str = Config.DATA_PRICES,
+                    offline: bool = False) -> HourlyDataset:
+        with cls._lock:
+            for key, dataset in reversed(cls._datasets.items()):
+                if key[0] == prices_path and dataset.covers(date_start, date_end):
+                    cls._datasets.move_to_end(key)
+                    return dataset
+        dataset = HourlyDataset.from_sources(date_start, date_end,
+                                             EnergyWebScraper(prices_path=prices_path, date_column="Date", offline=offline),
+                                             Load(date_column="Date"),
+                                             Pv(date_column="Date", offline=offline))
+        cls.register(dataset, prices_path)
+        return dataset
+
+    @classmethod
+    def register(cls, dataset: HourlyDataset, prices_path: str = Config.DATA_PRICES) -> None:
+        key = (prices_path, dataset.date_start, dataset.date_end)
+        with cls._lock:
+            cls._datasets[key] = dataset
+            cls._datasets.move_to_end(key)
+            while len(cls._datasets) > cls.MAX_DATASETS:
+                cls._datasets.popitem(last=False)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._datasets.clear()
+
+
+if __name__ == "__main__":
+    hourly_dataset = DatasetRegistry.get_dataset(pd.Timestamp("2020-08-19 06:00:00"), pd.Timestamp("2020-08-22 14:00:00"))
+    print(hourly_dataset.get_record(pd.Timestamp("2020-08-20 12:00:00")))
@@ -1,6 +1,6 @@
-from datetime import timedelta
 from typing import Union, List
 
+import numpy as np
 import pandas as pd
 
 from lib.config import Config
@@ -21,12 +21,12 @@ class Load:
     def multiplier_val(self):
         return self._multiplier
 
-    def simulate_load_multiplier(self, load: Union[float, List[float]]) -> Union[float, List[float]]:
+    def simulate_load_multiplier(self, load: Union[float, List[float], np.ndarray]) -> Union[float, List[float], np.ndarray]:
         if self._multiplier is None:
             return load
         if isinstance(load, list):
             return [self._multiplier * i for i in load]
-        elif isinstance(load, float):
+        elif isinstance(load, (float, np.ndarray)):
             return self._multiplier * load
         else:
             raise Exception("The load must be a floating-point number or a list of floating-point numbers")
@@ -36,13 +36,15 @@ class Load:
             if not self.df_manager.is_date_in_file(self.date_column, date_start):
                 raise Exception(f"Date: {date_start} is not valid")
             load_value = self.df_manager.get_cell_by_date(self.date_column, date_start, "Load (kW)")
-        else:
-            if not (self.df_manager.is_date_in_file(self.date_column, date_start) or
-                    self.df_manager.is_date_in_file(self.date_column, date_end)):
-                raise Exception(f"Date column {date_start} or {date_end} is not valid")
-            dates = pd.date_range(start=date_start, end=date_end, freq=timedelta(hours=1))
-            load_value = [self.df_manager.get_cell_by_date(self.date_column, x, "Load (kW)") for x in dates]
-        return self.simulate_load_multiplier(load_value)
+            return self.simulate_load_multiplier(load_value)
+        return self.get_consumption_array_by_date(date_start, date_end).tolist()
+
+    def get_consumption_array_by_date(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> np.ndarray:
+        if not (self.df_manager.is_date_in_file(self.date_column, date_start) or
+                self.df_manager.is_date_in_file(self.date_column, date_end)):
+            raise Exception(f"Date column {date_start} or {date_end} is not valid")
+        load_values = self.df_manager.get_values_by_date_range(self.date_column, date_start, date_end, "Load (kW)")
+        return self.simulate_load_multiplier(load_values)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+from lib.logger import setup_logging
+from scripts.hourly_dataset import DatasetRegistry, RUN_LOOKAHEAD
+from scripts.prefetch import PrefetchPlanner
+from scripts.pv import Pv
+from scripts.simulation_runner import SystemSpec
+
+
+class ParameterSweep:
+    """
+    Class running every system for every scenario of a parameter grid. Scenarios are spread across worker processes,
+    each worker loads the hourly dataset once and reuses it for all of its scenarios.
+
+    Attributes:
+        grid (Dict[str, list]): Values of the swept parameters: energy bank parameters, pv_size and load_multiplier.
+        system_names (List[str]): Names of the simulated systems.
+        max_workers (int): The maximum number of worker processes, the number of cpus by default.
+    """
+    BANK_PARAMS = ["capacity", "min_lvl", "lvl", "purchase_cost", "cycles_num"]
+    DEFAULT_GRID = {"capacity": [3.0], "min_lvl": [0.0], "lvl": [1.0], "purchase_cost": [10000.0], "cycles_num": [5000],
+                    "pv_size": [5], "load_multiplier": [None]}
+
+    def __init__(self, grid: Dict[str, list], system_names: Union[List[str], None] = None,
+                 max_workers: Union[int, None] = None):
+        unknown_params = set(grid) - set(self.DEFAULT_GRID)
+        if unknown_params:
+            raise Exception(f"Parameters: {sorted(unknown_params)} can not be swept, choose from {list(self.DEFAULT_GRID)}")
+        self.grid = {**self.DEFAULT_GRID, **grid}
+        self.system_names = list(SystemSpec.SYSTEMS) if system_names is None else system_names
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+
+    def get_scenarios(self) -> List[Dict[str, Union[float, int, None]]]:
+        return [dict(zip(self.grid, values)) for values in itertools.product(*self.grid.values())]
+
+    @staticmethod
+    def init_worker(date_start: pd.Timestamp, date_end: pd.Timestamp) -> None:
+        DatasetRegistry.get_dataset(date_start, date_end + RUN_LOOKAHEAD, offline=True)
+
+    @staticmethod
+    def run_scenario(scenario_id: int, scenario: Dict[str, Union[float, int, None]], system_names: List[str],
+                     date_start: pd.Timestamp, date_end: pd.Timestamp) -> List[Dict[str, Union[str, float, int, None]]]:
+        dataset = DatasetRegistry.get_dataset(date_start, date_end + RUN_LOOKAHEAD, offline=True)
+        energy_bank_params = {param: scenario[param] for param in ParameterSweep.BANK_PARAMS}
+        rows = []
+        for system_name in system_names:
+            spec = SystemSpec(system_name, load_multiplier=scenario["load_multiplier"], pv_size=scenario["pv_size"],
+                              energy_bank_params=energy_bank_params)
+            system = spec.build(dataset)
+            system.run(date_start, date_end)
+            final_lvl, cycles = np.nan, 0.0
+            if system_name in SystemSpec.BANK_SYSTEMS:
+                bank_lvls = np.concatenate(([scenario["lvl"]], system.plotter.df["energy_bank [kWh]"].to_numpy(dtype=float)))
+                final_lvl = system.energy_bank.lvl
+                cycles = np.abs(np.diff(bank_lvls)).sum() / (2 * scenario["capacity"])
+            rows.append({"scenario": scenario_id, **scenario, "system": system_name,
+                         "summed_cost": float(system.summed_cost), "final_lvl": float(final_lvl), "cycles": float(cycles)})
+        return rows
+
+    def run(self, date_start: pd.Timestamp, date_end: pd.Timestamp, prefetch: bool = True) -> pd.DataFrame:
+        if prefetch:
+            PrefetchPlanner(producer=Pv()).prefetch(date_start, date_end)
+        scenarios = self.get_scenarios()
+        args = [range(len(scenarios)), scenarios, itertools.repeat(self.system_names),
+                itertools.repeat(date_start), itertools.repeat(date_end)]
+        workers_num = min(len(scenarios), self.max_workers)
+        if workers_num <= 1:
+            self.init_worker(date_start, date_end)
+            results = map(self.run_scenario, *args)
+            return pd.DataFrame([row for rows in results for row in rows])
+        with ProcessPoolExecutor(max_workers=workers_num, initializer=self.init_worker,
+                                 initargs=(date_start, date_end)) as executor:
+            chunksize = max(1, len(scenarios) // (4 * workers_num))
+            results = executor.map(self.run_scenario, *args, chunksize=chunksize)
+            return pd.DataFrame([row for rows in results for row in rows])
+
+
+def parse_args(argv: Union[List[str], None] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep energy bank, pv and load parameters of the simulated systems.")
+    parser.add_argument("--start", required=True, type=pd.Timestamp, help="First simulated hour, e.g. 2020-01-01")
+    parser.add_argument("--end", required=True, type=pd.Timestamp, help="Last simulated hour, e.g. 2020-12-30 23:00")
+    parser.add_argument("--capacity", nargs="+", type=float, default=ParameterSweep.DEFAULT_GRID["capacity"])
+    parser.add_argument("--min-lvl", nargs="+", type=float, default=ParameterSweep.DEFAULT_GRID["min_lvl"])
+    parser.add_argument("--lvl", nargs="+", type=float, default=ParameterSweep.DEFAULT_GRID["lvl"])
+    parser.add_argument("--purchase-cost", nargs="+", type=float, default=ParameterSweep.DEFAULT_GRID["purchase_cost"])
+    parser.add_argument("--cycles-num", nargs="+", type=int, default=ParameterSweep.DEFAULT_GRID["cycles_num"])
+    parser.add_argument("--pv-size", nargs="+", type=float, default=ParameterSweep.DEFAULT_GRID["pv_size"])
+    parser.add_argument("--load-multiplier", nargs="+", type=float, default=ParameterSweep.DEFAULT_GRID["load_multiplier"])
+    parser.add_argument("--systems", nargs="+", default=list(SystemSpec.SYSTEMS), choices=list(SystemSpec.SYSTEMS),
+                        help="Names of the simulated systems")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of worker processes, the number of cpus by default")
+    parser.add_argument("--output", default="sweep_results.csv", help="File with the results table")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    args = parse_args()
+    sweep_grid = {"capacity": args.capacity, "min_lvl": args.min_lvl, "lvl": args.lvl, "purchase_cost": args.purchase_cost,
+                  "cycles_num": args.cycles_num, "pv_size": args.pv_size, "load_multiplier": args.load_multiplier}
+    sweep = ParameterSweep(sweep_grid, system_names=args.systems, max_workers=args.jobs)
+    results_df = sweep.run(args.start, args.end)
+    results_df.to_csv(args.output, index=False)
+    print(results_df.groupby("system")["summed_cost"].describe())
@@ -1,27 +1,119 @@
 from datetime import timedelta
-from typing import List
+from typing import List, Union
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
 from lib.config import DataTypes
+from scripts.results_sink import ResultsSink
 
 
 class Plotter:
     """
-    A class created for plotting data from pandas dataframe.
+    A class created for recording and plotting the data of a system. Rows are recorded into preallocated NumPy column
+    buffers which grow geometrically, the pandas dataframe is built only when it is needed. With a results sink the
+    buffered rows are flushed to disk in chunks, so memory stays bounded regardless of the simulated horizon.
 
     Attributes:
-        df (pandas.DataFrame): A dataframe that stores data for plotting.
+        columns (List[str]): Names of the recorded columns, the first one is "Date".
+        sink (ResultsSink): Sink the buffered rows are flushed to, None to keep all rows in memory.
+        size (int): Number of buffered rows.
+        _dates (np.ndarray): Buffer of the recorded dates.
+        _data (List[np.ndarray]): Buffers of the recorded data columns.
+        _df (pandas.DataFrame): The dataframe built from the buffers, None if rows were added after it was built.
     """
 
-    def __init__(self, columns_names: List[str]):
-        self.df = pd.DataFrame({k: [] for k in ["Date"] + columns_names})
+    def __init__(self, columns_names: List[str], initial_capacity: int = 1024, sink: Union[ResultsSink, None] = None):
+        self.columns = ["Date"] + columns_names
+        self.sink = sink
+        self.size = 0
+        self._dates = np.empty(initial_capacity, dtype="datetime64[ns]")
+        self._data = [np.empty(initial_capacity, dtype=float) for _ in columns_names]
+        self._df = None
+
+    def __len__(self) -> int:
+        return self.size if self.sink is None else self.sink.rows_written + self.size
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_dates"] = self._dates[:self.size].copy()
+        state["_data"] = [column[:self.size].copy() for column in self._data]
+        state["_df"] = None
+        return state
+
+    @property
+    def capacity(self) -> int:
+        return len(self._dates)
+
+    @property
+    def nbytes(self) -> int:
+        return self._dates.nbytes + sum(column.nbytes for column in self._data)
+
+    def get_buffered_df(self, row_start: int = 0) -> pd.DataFrame:
+        columns = [self._dates[row_start:self.size].copy()] + [column[row_start:self.size].copy() for column in self._data]
+        return pd.DataFrame(dict(zip(self.columns, columns)))
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            self._df = self.get_buffered_df()
+            if self.sink is not None and self.sink.rows_written:
+                self._df = pd.concat([self.sink.read(), self._df], ignore_index=True)
+        return self._df
+
+    def flush(self) -> None:
+        if self.sink is None or self.size == 0:
+            return
+        self.sink.write_chunk(self.get_buffered_df())
+        self.size = 0
+        self._df = None
+
+    def reserve(self, rows_num: int) -> None:
+        required_capacity = self.size + rows_num
+        if required_capacity <= self.capacity:
+            return
+        new_capacity = max(2 * self.capacity, required_capacity)
+        dates = np.empty(new_capacity, dtype="datetime64[ns]")
+        dates[:self.size] = self._dates[:self.size]
+        self._dates = dates
+        for idx, column in enumerate(self._data):
+            self._data[idx] = np.empty(new_capacity, dtype=float)
+            self._data[idx][:self.size] = column[:self.size]
 
     def add_data_row(self, data_row: List[DataTypes.DF_VAL]) -> None:
-        self.df.loc[len(self.df)] = data_row
+        if len(data_row) != len(self.columns):
+            raise Exception(f"Expected {len(self.columns)} values in a row, got {len(data_row)}")
+        self.reserve(1)
+        self._dates[self.size] = pd.Timestamp(data_row[0]).to_datetime64()
+        for column, value in zip(self._data, data_row[1:]):
+            column[self.size] = value
+        self.size += 1
+        self._df = None
+        if self.sink is not None and self.size >= self.sink.chunk_rows:
+            self.flush()
+
+    def add_data_block(self, dates: pd.DatetimeIndex, data_columns: List[np.ndarray]) -> None:
+        if len(data_columns) != len(self._data):
+            raise Exception(f"Expected {len(self._data)} data columns, got {len(data_columns)}")
+        dates = pd.DatetimeIndex(dates).to_numpy(dtype="datetime64[ns]")
+        block_start = 0
+        while block_start < len(dates):
+            rows_num = len(dates) - block_start
+            if self.sink is not None:
+                rows_num = min(rows_num, self.sink.chunk_rows - self.size)
+            self.reserve(rows_num)
+            self._dates[self.size:self.size + rows_num] = dates[block_start:block_start + rows_num]
+            for column, data_column in zip(self._data, data_columns):
+                column[self.size:self.size + rows_num] = data_column[block_start:block_start + rows_num]
+            self.size += rows_num
+            block_start += rows_num
+            self._df = None
+            if self.sink is not None and self.size >= self.sink.chunk_rows:
+                self.flush()
 
     def plot_charts(self, title: str = "System Data") -> pd.DataFrame:
+        import matplotlib.pyplot as plt
+
         axes = self.df.plot(kind='line', x='Date', subplots=True, figsize=(10, 10), sharex=True, title=title)
         for idx, column_name in enumerate(self.df.columns[1:]):
             axes[idx].set_ylabel(column_name)
@@ -1,4 +1,3 @@
-import copy
 import random
 from abc import ABC, abstractmethod
 from typing import List, Union
@@ -13,15 +12,39 @@ def sort_list_idxes_ascending(list_in: List[float]) -> List[int]:
 
 
 def simulate_eb_operation(eb: EnergyBank, balance_in: Union[float, List[float]], start_lvl: Union[None, float] = None) -> float:
-    fake_eb = copy.deepcopy(eb)
-    if start_lvl is not None:
-        fake_eb.lvl = start_lvl
+    start_lvl = eb.lvl if start_lvl is None else eb.validate_lvl(start_lvl)
     if isinstance(balance_in, float):
-        fake_eb.manage_energy(balance_in)
-    elif isinstance(balance_in, list):
-        for balance_value in balance_in:
-            fake_eb.manage_energy(balance_value)
-    return fake_eb.lvl
+        balance_in = [balance_in]
+    elif not isinstance(balance_in, list):
+        return start_lvl
+    lvls, _ = eb.simulate_trajectory(balance_in, start_lvl)
+    return lvls[-1].item()
+
+
+class PrefixLvls:
+    """
+    Class giving the energy bank level after the first k hourly balances in O(1). Levels are simulated once and
+    extended lazily, a change of a balance only drops the levels that depend on it.
+
+    Attributes:
+        eb (EnergyBank): Energy bank used for the simulation, it is not modified.
+        balances (List[float]): Hourly balances, changed in place by the planning strategies.
+    """
+
+    def __init__(self, eb: EnergyBank, balances: List[float], start_lvl: float):
+        self.eb = eb
+        self.balances = balances
+        self._lvls = [eb.validate_lvl(start_lvl)]
+
+    def get_lvl(self, hours_num: int) -> float:
+        known_hours_num = len(self._lvls) - 1
+        if hours_num > known_hours_num:
+            lvls, _ = self.eb.simulate_trajectory(self.balances[known_hours_num:hours_num], self._lvls[-1])
+            self._lvls.extend(lvls[1:].tolist())
+        return self._lvls[hours_num]
+
+    def invalidate(self, idx: int) -> None:
+        del self._lvls[idx + 1:]
 
 
 def separate_negative_prices(prices: List[float], balances: List[float]) -> List[List[float]]:
@@ -81,8 +104,10 @@ class DayPredictionStrategy(PredictionStrategy):
         prices_order = sort_list_idxes_ascending(prices)
         if prices_order[-1] == len(balances) - 1:
             return balances
+        prefix_lvls = PrefixLvls(eb, balances, start_energy)
+        prefix_lvls.get_lvl(len(balances) - 1)
         for idx in range(len(balances)-1, 0, -1):
-            eb.lvl = simulate_eb_operation(eb, balances[:idx], start_energy)
+            eb.lvl = prefix_lvls.get_lvl(idx)
             if eb.lvl + balances[idx] > self.max_energy and prices[idx] > prices[idx-1]:
                 i_need = balances[idx] + eb.lvl - self.max_energy
                 new_balance = max(0.0, balances[idx] - i_need)
@@ -119,13 +144,15 @@ class DayPredictionStrategy(PredictionStrategy):
             eb.lvl = eb.capacity
         else:
             hourly_balances = [b if b >= 0.0 else 0.0 for b in hourly_balances]
+            prefix_lvls = PrefixLvls(eb, hourly_balances, start_energy)
             for idx in range(1, balances_length):
-                eb.lvl = simulate_eb_operation(eb, hourly_balances[:idx], start_energy)
+                eb.lvl = prefix_lvls.get_lvl(idx)
                 is_full_eb_possible = eb.lvl + hourly_balances[idx] > self.max_energy
                 if is_full_eb_possible:
                     balances_to_optimize = hourly_balances[:idx]
                     prices_to_optimize = prices[:idx]
                     hourly_balances[:idx] = self.optimize_positive_balances(eb, start_energy, balances_to_optimize, prices_to_optimize)
+                    prefix_lvls.invalidate(0)
                 elif hourly_balances[idx] < 0.0:
                     hourly_balances[idx] = 0.0
                 else:
@@ -147,10 +174,12 @@ class DayPredictionStrategy(PredictionStrategy):
         is_full_eb_possible = eb.lvl + sum(positive_balances) > self.max_energy
         if is_full_eb_possible:
             idx_order = sort_list_idxes_ascending(prices)
+            prefix_lvls = PrefixLvls(eb, hourly_balances, start_energy)
             for idx in idx_order:
                 if idx in negative_index_list:
-                    eb.lvl = simulate_eb_operation(eb, hourly_balances[:idx], start_energy)
+                    eb.lvl = prefix_lvls.get_lvl(idx)
                     hourly_balances[idx:], need = self.optimize_mixed_balances(eb, need, hourly_balances[idx:])
+                    prefix_lvls.invalidate(idx)
                     if need <= 0.0:
                         break
         else:
@@ -246,6 +275,110 @@ class NightPredictionStrategy(PredictionStrategy):
         return [round(x, 2) for x in hourly_balances]
 
 
+class OptimalPredictionStrategy(PredictionStrategy):
+    """
+    Class computing the cost-optimal energy bank plan with a backward dynamic programming over energy bank levels
+    discretized with the step the energy bank level is rounded to. In every hour the bank can store the pv surplus
+    and cover the consumption deficit, at negative prices it can also be charged from the grid. The cost of an hour
+    is the cost of energy exchanged with the grid plus the wear of the bank, energy left in the bank at the end of
+    the window is valued at the terminal price. Minima over reachable levels are sliding window minima, so the plan
+    is computed in O(T*L) for T hours and L levels.
+
+    Attributes:
+        min_energy (float): The min value that the energy bank can reach.
+        max_energy (float): Energy bank capacity expressed in kWh.
+        single_cycle_cost (float): Cost of a single full cycle of the energy bank, the wear cost.
+        terminal_price (float): Value of 1 kWh left in the bank at the end of the window, the window average price
+            if not given.
+        grid_charging (bool): If set, the bank can be charged from the grid at negative prices.
+        lvl_step (float): Step of the energy bank levels grid expressed in kWh.
+    """
+
+    def __init__(self, min_energy: float, max_energy: float, single_cycle_cost: float = 0.0,
+                 terminal_price: Union[float, None] = None, grid_charging: bool = True, lvl_step: float = 0.01):
+        self.min_energy = min_energy
+        self.max_energy = max_energy
+        self.single_cycle_cost = single_cycle_cost
+        self.terminal_price = terminal_price
+        self.grid_charging = grid_charging
+        self.lvl_step = lvl_step
+
+    @property
+    def wear_cost(self) -> float:
+        return self.single_cycle_cost / (2 * self.max_energy)
+
+    @staticmethod
+    def sliding_window_min(values: np.ndarray, width: int) -> np.ndarray:
+        # Minimum of values[i:i + width] for every i, computed with block-wise running minima (van Herk/Gil-Werman)
+        values_length = len(values)
+        if width >= values_length:
+            return np.minimum.accumulate(values[::-1])[::-1]
+        blocks_num = -(-(values_length + width - 1) // width)
+        padded_values = np.full(blocks_num * width, np.inf)
+        padded_values[:values_length] = values
+        blocks = padded_values.reshape(blocks_num, width)
+        block_prefix_min = np.minimum.accumulate(blocks, axis=1).ravel()
+        block_suffix_min = np.minimum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+        return np.minimum(block_suffix_min[:values_length], block_prefix_min[width - 1:width - 1 + values_length])
+
+    def get_lvl_idx(self, energy: float) -> int:
+        max_idx = int(round((self.max_energy - self.min_energy) / self.lvl_step))
+        return min(max(int(round((energy - self.min_energy) / self.lvl_step)), 0), max_idx)
+
+    def get_step_limits(self, price: float, balance: float, lvls_num: int) -> (int, int):
+        discharge_steps = int(round(max(-balance, 0.0) / self.lvl_step))
+        if price < 0.0 and self.grid_charging:
+            return discharge_steps, lvls_num - 1
+        return discharge_steps, int(round(max(balance, 0.0) / self.lvl_step))
+
+    def get_terminal_price(self, prices: List[float]) -> float:
+        if self.terminal_price is not None:
+            return self.terminal_price
+        # An empty window at the end of the data plans nothing, so the energy left in the bank is not valued.
+        return sum(prices) / len(prices) if len(prices) > 0 else 0.0
+
+    def get_plan_cost(self, start_energy: float, prices: List[float], hourly_balances: List[float], plan: List[float]) -> float:
+        lvl, cost = start_energy, 0.0
+        for price, balance, bank_energy in zip(prices, hourly_balances, plan):
+            lvl += bank_energy
+            if not self.min_energy - 1e-9 <= lvl <= self.max_energy + 1e-9:
+                raise Exception(f"Lvl: {lvl} must be between {self.min_energy} and {self.max_energy}")
+            if bank_energy < min(balance, 0.0) - 1e-9:
+                raise Exception(f"Energy: {bank_energy} released from the energy bank exceeds the deficit: {balance}")
+            if (price >= 0.0 or not self.grid_charging) and bank_energy > max(balance, 0.0) + 1e-9:
+                raise Exception(f"Energy: {bank_energy} can not be bought for the energy bank at price: {price}")
+            cost += -(balance - bank_energy) * price + abs(bank_energy) * self.wear_cost
+        return cost - self.get_terminal_price(prices) * lvl
+
+    def get_plan(self, start_energy: float, prices: List[float], hourly_balances: List[float]) -> List[float]:
+        prices_length, balances_length = len(prices), len(hourly_balances)
+        if prices_length != balances_length:
+            raise Exception(f"prices and balances lengths must be equals: {prices_length} != {balances_length}")
+        lvls_num = self.get_lvl_idx(self.max_energy) + 1
+        lvl_idxes = np.arange(lvls_num)
+        lvls = self.min_energy + lvl_idxes * self.lvl_step
+        values = [np.zeros(lvls_num)] * balances_length + [-self.get_terminal_price(prices) * lvls]
+        for hour in range(balances_length - 1, -1, -1):
+            charge_slope = (prices[hour] + self.wear_cost) * self.lvl_step
+            discharge_slope = (prices[hour] - self.wear_cost) * self.lvl_step
+            discharge_steps, charge_steps = self.get_step_limits(prices[hour], hourly_balances[hour], lvls_num)
+            charge_values = self.sliding_window_min(values[hour + 1] + charge_slope * lvl_idxes, charge_steps + 1)
+            discharge_values = self.sliding_window_min((values[hour + 1] + discharge_slope * lvl_idxes)[::-1], discharge_steps + 1)[::-1]
+            values[hour] = np.minimum(charge_values - charge_slope * lvl_idxes, discharge_values - discharge_slope * lvl_idxes)
+
+        plan, lvl_idx = [], self.get_lvl_idx(start_energy)
+        for hour in range(balances_length):
+            discharge_steps, charge_steps = self.get_step_limits(prices[hour], hourly_balances[hour], lvls_num)
+            next_idxes = lvl_idxes[max(lvl_idx - discharge_steps, 0):min(lvl_idx + charge_steps, lvls_num - 1) + 1]
+            steps = next_idxes - lvl_idx
+            step_costs = values[hour + 1][next_idxes] + (prices[hour] * steps + self.wear_cost * np.abs(steps)) * self.lvl_step
+            best_idxes = next_idxes[step_costs <= step_costs.min() + 1e-12]
+            next_idx = best_idxes[np.argmin(np.abs(best_idxes - lvl_idx))]
+            plan.append(round((next_idx - lvl_idx) * self.lvl_step, 2))
+            lvl_idx = next_idx
+        return plan
+
+
 if __name__ == "__main__":
     my_min_energy = 0.0
     my_start_energy = round(random.uniform(1.0, 2.5), 2)
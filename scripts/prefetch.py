@@ -0,0 +1,51 @@
+from typing import List, Tuple, Union
+
+import pandas as pd
+
+from scripts.energy_pricing import EnergyWebScraper
+from scripts.hourly_dataset import RUN_LOOKAHEAD
+from scripts.pv import Pv
+
+
+class PrefetchPlanner:
+    """
+    Class computing every date range a simulation needs and fetching the missing data before the simulation loop
+    starts. After the prefetch the sources can be switched to offline mode, so a gap fails fast instead of
+    triggering a download in the middle of the loop.
+
+    Attributes:
+        energy_pricer (EnergyWebScraper): Source of RCE prices.
+        producer (Pv): Source of pv production, if the simulated systems use one.
+        max_days_per_request (int): The longest range of days downloaded with a single request.
+    """
+
+    def __init__(self, energy_pricer: Union[EnergyWebScraper, None] = None, producer: Union[Pv, None] = None,
+                 max_days_per_request: int = 31):
+        self.energy_pricer = EnergyWebScraper(date_column="Date") if energy_pricer is None else energy_pricer
+        self.producer = producer
+        self.max_days_per_request = max_days_per_request
+
+    @staticmethod
+    def get_required_range(date_start: pd.Timestamp, date_end: pd.Timestamp) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        return date_start, date_end + RUN_LOOKAHEAD
+
+    def plan(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        required_start, required_end = self.get_required_range(date_start, date_end)
+        return self.energy_pricer.price_store.get_missing_ranges(required_start, required_end, self.max_days_per_request)
+
+    def prefetch(self, date_start: pd.Timestamp, date_end: pd.Timestamp, go_offline: bool = True) -> int:
+        requests_ranges = self.plan(date_start, date_end)
+        for range_start, range_end in requests_ranges:
+            self.energy_pricer.get_prices_file_by_date(range_start, range_end)
+        if self.producer is not None:
+            self.producer.ensure_pv_file()
+        if go_offline:
+            self.energy_pricer.offline = True
+            if self.producer is not None:
+                self.producer.offline = True
+        return len(requests_ranges)
+
+
+if __name__ == "__main__":
+    planner = PrefetchPlanner(producer=Pv())
+    print(planner.plan(pd.Timestamp("2020-08-19 06:00:00"), pd.Timestamp("2020-08-22 14:00:00")))
@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Union
+
+import pandas as pd
+import requests
+
+from lib.config import Config
+from lib.logger import setup_logging
+from scripts.energy_pricing import EnergyWebScraper
+
+
+class PriceBackfill:
+    """
+    Class backfilling a long span of RCE price history. The span is split into chunks of days missing from the
+    price store, the chunks are downloaded and parsed concurrently, and the downloaded ones are merged into the store
+    at once. Chunks which failed after all retries are reported together after the merge, so they can be run again.
+
+    Attributes:
+        energy_pricer (EnergyWebScraper): Scraper used to download prices and holding the price store.
+        chunk_days (int): The longest range of days downloaded with a single request.
+        max_concurrency (int): The maximum number of chunks downloaded at the same time.
+        retries (int): Number of additional attempts for a chunk whose download or parsing failed.
+        backoff (float): Delay in seconds before the first retry, doubled with every next retry.
+    """
+
+    def __init__(self, energy_pricer: Union[EnergyWebScraper, None] = None, chunk_days: int = 7,
+                 max_concurrency: int = 8, retries: int = 3, backoff: float = 1.0):
+        if chunk_days < 1 or max_concurrency < 1:
+            raise Exception(f"Chunk days: {chunk_days} and max concurrency: {max_concurrency} must be positive")
+        self.energy_pricer = EnergyWebScraper(date_column="Date") if energy_pricer is None else energy_pricer
+        self.chunk_days = chunk_days
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+
+    def get_chunks(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        return self.energy_pricer.price_store.get_missing_ranges(date_start, date_end, self.chunk_days)
+
+    async def fetch_chunk(self, chunk: Tuple[pd.Timestamp, pd.Timestamp], semaphore: asyncio.Semaphore,
+                          executor: ThreadPoolExecutor) -> pd.DataFrame:
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    content = await loop.run_in_executor(executor, self.energy_pricer.download_prices_csv, *chunk)
+                    df = await loop.run_in_executor(executor, self.energy_pricer.parse_prices_csv, content)
+                    return self.energy_pricer.to_store_format(df)
+                except (requests.RequestException, pd.errors.ParserError, KeyError, ValueError) as e:
+                    if attempt == self.retries:
+                        raise Exception(f"Prices for days {chunk[0]} - {chunk[1]} could not be downloaded: {e}") from e
+                    await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def backfill(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> int:
+        chunks = self.get_chunks(date_start, date_end)
+        if not chunks:
+            return 0
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = await asyncio.gather(*[self.fetch_chunk(chunk, semaphore, executor) for chunk in chunks],
+                                           return_exceptions=True)
+        dfs = [result for result in results if not isinstance(result, BaseException)]
+        if dfs:
+            self.energy_pricer.price_store.add_prices(pd.concat(dfs, ignore_index=True))
+        errors = [(chunk, result) for chunk, result in zip(chunks, results) if isinstance(result, BaseException)]
+        if errors:
+            failed_ranges = [f"{chunk[0].date()} - {chunk[1].date()}" for chunk, _ in errors]
+            raise Exception(f"Prices for {len(errors)} of {len(chunks)} chunks could not be downloaded: "
+                            f"{failed_ranges}") from errors[0][1]
+        return len(chunks)
+
+    def run(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> int:
+        return asyncio.run(self.backfill(date_start, date_end))
+
+
+if __name__ == "__main__":
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Backfill RCE price history into the local price store.")
+    parser.add_argument("--start", required=True, type=pd.Timestamp, help="First day to backfill, e.g. 2023-01-01")
+    parser.add_argument("--end", required=True, type=pd.Timestamp, help="Last day to backfill, e.g. 2023-12-31")
+    parser.add_argument("--chunk-days", default=7, type=int, help="Days downloaded with a single request")
+    parser.add_argument("--concurrency", default=8, type=int, help="Chunks downloaded at the same time")
+    parser.add_argument("--prices-path", default=Config.DATA_PRICES, help="File of the price store")
+    args = parser.parse_args()
+    price_backfill = PriceBackfill(EnergyWebScraper(prices_path=args.prices_path, date_column="Date"),
+                                   chunk_days=args.chunk_days, max_concurrency=args.concurrency)
+    print(f"Downloaded {price_backfill.run(args.start, args.end)} chunks of prices")
@@ -0,0 +1,83 @@
+import os
+from typing import List, Set, Tuple, Union
+
+import pandas as pd
+
+from lib.config import Config
+from scripts.file_management import DfManager, file_lock
+
+
+class PriceStore:
+    """
+    Class keeping every downloaded RCE price in one local file. Downloaded market days are merged into the file
+    instead of replacing it, and a coverage index of the stored days tells which days still have to be downloaded.
+    The merge holds a lock of the file, so concurrent writers never drop each other's days.
+
+    Attributes:
+        df_manager (DfManager): Manager of the file with stored prices.
+        date_column (str): Name of the column with the date and hour of a price.
+    """
+
+    def __init__(self, path: str = Config.DATA_PRICES, date_column: str = "Date"):
+        self.df_manager = DfManager(path, date_column)
+        self.date_column = date_column
+        self._days = set()
+        self._days_file_state = None
+
+    @property
+    def path(self) -> str:
+        return self.df_manager.path
+
+    def _get_file_state(self) -> Union[Tuple[int, int], None]:
+        try:
+            file_stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    def get_days(self) -> Set[pd.Timestamp]:
+        file_state = self._get_file_state()
+        if file_state is None:
+            return set()
+        if file_state != self._days_file_state:
+            dates = self.df_manager.get_from_file()[self.date_column]
+            self._days = set(dates.dt.normalize().unique())
+            self._days_file_state = file_state
+        return self._days
+
+    def get_missing_days(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None) -> List[pd.Timestamp]:
+        date_start = pd.Timestamp(date_start)
+        date_end = date_start if date_end is None else pd.Timestamp(date_end)
+        stored_days = self.get_days()
+        return [day for day in pd.date_range(date_start.normalize(), date_end.normalize(), freq="D") if day not in stored_days]
+
+    def get_missing_ranges(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None,
+                           max_days: Union[int, None] = None) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        missing_ranges = []
+        for day in self.get_missing_days(date_start, date_end):
+            is_continued = missing_ranges and missing_ranges[-1][1] + pd.Timedelta(days=1) == day
+            is_range_full = is_continued and max_days is not None and (day - missing_ranges[-1][0]).days >= max_days
+            if is_continued and not is_range_full:
+                missing_ranges[-1] = (missing_ranges[-1][0], day)
+            else:
+                missing_ranges.append((day, day))
+        return missing_ranges
+
+    def is_covered(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None) -> bool:
+        return not self.get_missing_days(date_start, date_end)
+
+    def add_prices(self, df: pd.DataFrame) -> None:
+        df = df.copy()
+        df[self.date_column] = pd.to_datetime(df[self.date_column], format=self.df_manager.date_format)
+        with file_lock(self.path):
+            if self._get_file_state() is not None:
+                stored_df = self.df_manager.get_from_file()
+                new_days = df[self.date_column].dt.normalize().unique()
+                stored_df = stored_df[~stored_df[self.date_column].dt.normalize().isin(new_days)]
+                df = pd.concat([stored_df, df[stored_df.columns]], ignore_index=True)
+            self.df_manager.save_to_file(df.sort_values(self.date_column, ignore_index=True))
+
+
+if __name__ == "__main__":
+    price_store = PriceStore()
+    print(price_store.get_missing_ranges(pd.Timestamp("2023-01-01 00:00:00"), pd.Timestamp("2023-01-31 23:00:00")))
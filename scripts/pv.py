@@ -1,34 +1,37 @@
 import os
-from datetime import timedelta
 from io import StringIO
 from typing import List, Union
 
+import numpy as np
 import pandas as pd
-import requests
 
 from lib.config import Config, PhotovoltaicDirection
+from lib.http_session import get_http_session
 from scripts.file_management import DfManager
 
 
 class Pv:
     """
-    Class simulating energy production by a photovoltaic installation
+    Class simulating energy production by a photovoltaic installation. The production file is downloaded for an
+    installation of FILE_SIZE kW and the productions are scaled to the size of the simulated installation.
 
     Attributes:
         size (float): The size of photovoltaic installation expressed in kW.
         direction (PhotovoltaicDirection): The direction of the photovoltaic installation: east or south.
+        offline (bool): If set, a missing production file raises an exception instead of being downloaded.
     """
+    FILE_SIZE = 5
 
     def __init__(self,
                  date_column: str = "Date",
-                 size: int = 5,
-                 direction: PhotovoltaicDirection = PhotovoltaicDirection.SOUTH):
+                 size: float = FILE_SIZE,
+                 direction: PhotovoltaicDirection = PhotovoltaicDirection.SOUTH,
+                 offline: bool = False):
         self.date_column = date_column
         self.size = size
         self._direction = direction
+        self.offline = offline
         self.df_manager = DfManager(Config.DATA_ENERGY_PRODUCTION, date_column)
-        if not os.path.exists(Config.DATA_ENERGY_PRODUCTION):
-            self.update_pv_file()
 
     @property
     def direction(self):
@@ -52,8 +55,25 @@ class Pv:
             else:
                 return -180
 
+    def simulate_size(self, production: Union[float, List[float], np.ndarray]) -> Union[float, List[float], np.ndarray]:
+        if self.size == self.FILE_SIZE:
+            return production
+        scale = self.size / self.FILE_SIZE
+        if isinstance(production, list):
+            return [scale * i for i in production]
+        elif isinstance(production, (float, np.ndarray)):
+            return scale * production
+        else:
+            raise Exception("The production must be a floating-point number or a list of floating-point numbers")
+
+    def ensure_pv_file(self) -> None:
+        if not os.path.exists(self.df_manager.path):
+            if self.offline:
+                raise Exception(f"Production file {self.df_manager.path} is missing and downloads are disabled")
+            self.update_pv_file()
+
     def update_pv_file(self):
-        session = requests.Session()
+        session = get_http_session()
         url = Config.PV_API_LINK + "data/pv"
         args = {
             'lat': Config.LATITUDE,
@@ -61,7 +81,7 @@ class Pv:
             'date_from': '2019-01-01',
             'date_to': '2019-12-31',
             'dataset': 'merra2',
-            'capacity': self.size,
+            'capacity': self.FILE_SIZE,
             'system_loss': 0.1,
             'tracking': 0,
             'tilt': 35,
@@ -78,15 +98,19 @@ class Pv:
 
     def get_production_by_date(self, date_start: pd.Timestamp, date_end: Union[pd.Timestamp, None] = None) -> Union[List[float], float]:
         if date_end is None:
+            self.ensure_pv_file()
             if not self.df_manager.is_date_in_file(self.date_column, date_start):
                 raise Exception(f"Date: {date_start} is not valid")
-            return self.df_manager.get_cell_by_date(self.date_column, date_start, "PV gen (kW)")
-        else:
-            if not (self.df_manager.is_date_in_file(self.date_column, date_start) or
-                    self.df_manager.is_date_in_file(self.date_column, date_end)):
-                raise Exception(f"Date column {date_start} or {date_end} is not valid")
-            dates = pd.date_range(start=date_start, end=date_end, freq=timedelta(hours=1))
-            return [self.df_manager.get_cell_by_date(self.date_column, x, "PV gen (kW)") for x in dates]
+            return self.simulate_size(self.df_manager.get_cell_by_date(self.date_column, date_start, "PV gen (kW)"))
+        return self.get_production_array_by_date(date_start, date_end).tolist()
+
+    def get_production_array_by_date(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> np.ndarray:
+        self.ensure_pv_file()
+        if not (self.df_manager.is_date_in_file(self.date_column, date_start) or
+                self.df_manager.is_date_in_file(self.date_column, date_end)):
+            raise Exception(f"Date column {date_start} or {date_end} is not valid")
+        return self.simulate_size(self.df_manager.get_values_by_date_range(self.date_column, date_start, date_end,
+                                                                            "PV gen (kW)"))
 
 
 if __name__ == "__main__":
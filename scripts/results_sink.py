@@ -0,0 +1,77 @@
+import glob
+import os
+from typing import Union
+
+import pandas as pd
+
+
+class ResultsSink:
+    """
+    Class writing the recorded rows of a system to disk in chunks while the simulation runs. In parquet format every
+    chunk is a separate part file of a directory, in csv format chunks are appended to a single file. Chunks are
+    complete files or complete lines, so the results written so far can be read during a long run.
+
+    Attributes:
+        path (str): Directory of the parquet part files or the csv file.
+        chunk_rows (int): Number of rows written at once.
+        file_format (str): Format of the written chunks, "parquet" or "csv".
+        rows_written (int): Number of rows written to disk.
+        chunks_written (int): Number of chunks written to disk.
+    """
+    FORMATS = ["parquet", "csv"]
+
+    def __init__(self, path: str, chunk_rows: int = 1024, file_format: Union[str, None] = None):
+        if file_format is None:
+            file_format = "csv" if path.endswith(".csv") else "parquet"
+        if file_format not in self.FORMATS:
+            raise Exception(f"Format: {file_format} is not supported, choose one of {self.FORMATS}")
+        if chunk_rows < 1:
+            raise Exception(f"Chunk rows: {chunk_rows} must be positive")
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.file_format = file_format
+        self.rows_written = 0
+        self.chunks_written = 0
+
+    def get_part_paths(self) -> list:
+        return sorted(glob.glob(os.path.join(self.path, "part-*.parquet")))
+
+    def clear(self) -> None:
+        if self.file_format == "csv":
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        else:
+            for part_path in self.get_part_paths():
+                os.remove(part_path)
+        self.rows_written = 0
+        self.chunks_written = 0
+
+    def write_chunk(self, df: pd.DataFrame) -> None:
+        if self.chunks_written == 0:
+            self.clear()
+        if self.file_format == "csv":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            df.to_csv(self.path, mode="a", header=self.rows_written == 0, index=False)
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            part_path = os.path.join(self.path, f"part-{self.chunks_written:06d}.parquet")
+            df.to_parquet(f"{part_path}.tmp", index=False)
+            os.replace(f"{part_path}.tmp", part_path)
+        self.rows_written += len(df)
+        self.chunks_written += 1
+
+    def read(self) -> pd.DataFrame:
+        if self.file_format == "csv":
+            if not os.path.exists(self.path):
+                return pd.DataFrame()
+            return pd.read_csv(self.path, parse_dates=["Date"])
+        part_paths = self.get_part_paths()
+        if not part_paths:
+            return pd.DataFrame()
+        return pd.concat([pd.read_parquet(part_path) for part_path in part_paths], ignore_index=True)
+
+
+if __name__ == "__main__":
+    sink = ResultsSink("results/example", chunk_rows=24)
+    sink.write_chunk(pd.DataFrame({"Date": pd.date_range(start="2020-01-01", periods=24, freq="1h"), "y": range(24)}))
+    print(sink.read())
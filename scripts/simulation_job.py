@@ -0,0 +1,156 @@
+import logging
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import List, Union
+
+import pandas as pd
+
+from lib.logger import get_log_queue, setup_logging, setup_worker_logging
+from scripts.hourly_dataset import DatasetRegistry, HourlyDataset, RUN_LOOKAHEAD
+from scripts.prefetch import PrefetchPlanner
+from scripts.pv import Pv
+from scripts.simulation_runner import SimulationResult, SystemSpec
+
+COST_COLUMN = "Total price [zl]"
+
+_progress_queue = None
+_cancel_event = None
+
+
+class SimulationJob:
+    """
+    Class running the specified systems in background worker processes, so the caller is never blocked by a
+    simulation and jobs of different callers run side by side. Every system is simulated in steps, after each step
+    its worker reports the progress and the new part of the summed cost curve. A cancelled job stops its workers
+    after their current step. Workers are spawned, not forked, as jobs are started from a multithreaded server, the
+    dataset of the job and the log queue are sent to them.
+
+    Attributes:
+        specs (List[SystemSpec]): Specifications of the systems to simulate.
+        date_start (pd.Timestamp): First simulated hour.
+        date_end (pd.Timestamp): Last simulated hour.
+        step (pd.Timedelta): Range simulated by a worker between two reports.
+        max_workers (int): The maximum number of worker processes, the number of cpus by default.
+        progress (Dict[str, float]): Simulated fraction of the range for every system label.
+        _partial_costs (Dict[str, List[pd.DataFrame]]): Parts of the summed cost curves received so far.
+        _futures (List[Future]): Futures of the simulated systems, empty until the job is started.
+    """
+
+    def __init__(self, specs: List[SystemSpec], date_start: pd.Timestamp, date_end: pd.Timestamp,
+                 step: pd.Timedelta = pd.Timedelta(days=7), max_workers: Union[int, None] = None):
+        self.specs = specs
+        self.date_start = date_start
+        self.date_end = date_end
+        self.step = step
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self.progress = {spec.label: 0.0 for spec in specs}
+        self._partial_costs = {spec.label: [] for spec in specs}
+        self._futures = []
+        self._progress_queue = None
+        self._cancel_event = None
+
+    @staticmethod
+    def init_worker(progress_queue: multiprocessing.Queue, cancel_event: multiprocessing.Event, dataset: HourlyDataset,
+                    log_queue: Union[multiprocessing.Queue, None], log_level: int) -> None:
+        global _progress_queue, _cancel_event
+        _progress_queue, _cancel_event = progress_queue, cancel_event
+        setup_worker_logging(log_queue, log_level)
+        DatasetRegistry.register(dataset)
+
+    @staticmethod
+    def run_spec_steps(spec: SystemSpec, date_start: pd.Timestamp, date_end: pd.Timestamp,
+                       step: pd.Timedelta) -> Union[SimulationResult, None]:
+        dataset = DatasetRegistry.get_dataset(date_start, date_end + RUN_LOOKAHEAD, offline=True)
+        system = spec.build(dataset)
+        hours_num = (date_end - date_start) // pd.Timedelta(hours=1) + 1
+        row_start = 0
+        for step_end in system.run_steps(date_start, date_end, step):
+            costs_df = system.plotter.get_buffered_df(row_start)[["Date", COST_COLUMN]]
+            row_start = system.plotter.size
+            hours_done = (step_end - date_start) // pd.Timedelta(hours=1) + 1
+            _progress_queue.put((spec.label, hours_done / hours_num, costs_df))
+            if _cancel_event.is_set():
+                return None
+        bank_lvl = system.energy_bank.lvl if spec.system_name in spec.BANK_SYSTEMS else None
+        return SimulationResult(spec.label, system.summed_cost, bank_lvl, system.plotter)
+
+    def start(self, prefetch: bool = True) -> 'SimulationJob':
+        if self._futures:
+            raise Exception("Simulation job was already started")
+        if prefetch:
+            PrefetchPlanner(producer=Pv()).prefetch(self.date_start, self.date_end)
+        dataset = DatasetRegistry.get_dataset(self.date_start, self.date_end + RUN_LOOKAHEAD, offline=True)
+        context = multiprocessing.get_context("spawn")
+        self._progress_queue, self._cancel_event = context.Queue(), context.Event()
+        executor = ProcessPoolExecutor(max_workers=max(1, min(len(self.specs), self.max_workers)), mp_context=context,
+                                       initializer=self.init_worker,
+                                       initargs=(self._progress_queue, self._cancel_event, dataset, get_log_queue(),
+                                                 logging.getLogger().level))
+        self._futures = [executor.submit(self.run_spec_steps, spec, self.date_start, self.date_end, self.step)
+                         for spec in self.specs]
+        executor.shutdown(wait=False)
+        return self
+
+    @property
+    def is_running(self) -> bool:
+        return any(not future.done() for future in self._futures)
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event is not None and self._cancel_event.is_set()
+
+    @property
+    def is_failed(self) -> bool:
+        return any(future.done() and not future.cancelled() and future.exception() is not None
+                   for future in self._futures)
+
+    def cancel(self) -> None:
+        if self._cancel_event is None:
+            raise Exception("Simulation job was not started")
+        self._cancel_event.set()
+        for future in self._futures:
+            future.cancel()
+
+    def poll(self) -> bool:
+        while True:
+            try:
+                label, progress, costs_df = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.progress[label] = progress
+            self._partial_costs[label].append(costs_df)
+        for spec, future in zip(self.specs, self._futures):
+            if future.done() and not future.cancelled() and future.exception() is None and future.result() is not None:
+                self.progress[spec.label] = 1.0
+        return self.is_running
+
+    def wait(self, timeout: Union[float, None] = None) -> bool:
+        wait(self._futures, timeout=timeout)
+        return self.poll()
+
+    def get_partial_costs(self) -> pd.DataFrame:
+        curves = []
+        for label, parts in self._partial_costs.items():
+            if parts:
+                self._partial_costs[label] = [pd.concat(parts, ignore_index=True)] if len(parts) > 1 else parts
+                curves.append(self._partial_costs[label][0].set_index("Date")[COST_COLUMN].rename(label))
+        return pd.concat(curves, axis=1) if curves else pd.DataFrame()
+
+    def get_results(self) -> List[SimulationResult]:
+        if not self._futures or self.is_running or self.is_cancelled:
+            raise Exception("Simulation job has not finished")
+        return [future.result() for future in self._futures]
+
+
+if __name__ == "__main__":
+    setup_logging()
+    bank_params = {"capacity": 3.0, "min_lvl": 0.0, "lvl": 1.0, "purchase_cost": 10000.0, "cycles_num": 5000}
+    job = SimulationJob([SystemSpec(name, energy_bank_params=bank_params) for name in SystemSpec.SYSTEMS],
+                        pd.Timestamp("2020-08-01 00:00:00"), pd.Timestamp("2020-08-31 23:00:00"),
+                        step=pd.Timedelta(days=2)).start()
+    while job.wait(timeout=0.5):
+        print({label: f"{progress:.0%}" for label, progress in job.progress.items()})
+    for result in job.get_results():
+        print(result.label, result.summed_cost, result.bank_lvl)
@@ -0,0 +1,118 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Union
+
+import pandas as pd
+
+from lib.logger import setup_logging
+from scripts.energy_bank import EnergyBank
+from scripts.hourly_dataset import DatasetRegistry, HourlyDataset, RUN_LOOKAHEAD
+from scripts.plotter import Plotter
+from scripts.prefetch import PrefetchPlanner
+from scripts.pv import Pv
+from systems.bare_system import BareSystem
+from systems.pv_system import PvSystem
+from systems.raw_full_system import RawFullSystem
+from systems.smart_save_system import SmartSaveSystem
+from systems.smart_system import SmartSystem
+from systems.system_base import SystemBase
+
+
+class SystemSpec:
+    """
+    Class describing a system to simulate by its parameters only, so it can be sent to a worker process and the
+    system can be built there.
+
+    Attributes:
+        system_name (str): Name of the system class, e.g. "SmartSystem".
+        load_multiplier (int): Load multiplier passed to the system.
+        pv_size (float): The size of photovoltaic installation expressed in kW.
+        energy_bank_params (dict): Parameters of the energy bank, used by systems with an energy bank.
+        label (str): Name of the simulation in the results, the system name by default.
+    """
+    SYSTEMS = {system_class.__name__: system_class
+               for system_class in [BareSystem, PvSystem, RawFullSystem, SmartSystem, SmartSaveSystem]}
+    BANK_SYSTEMS = ["RawFullSystem", "SmartSystem", "SmartSaveSystem"]
+
+    def __init__(self, system_name: str, load_multiplier: Union[None, int] = None, pv_size: float = 5,
+                 energy_bank_params: Union[Dict[str, float], None] = None, label: Union[str, None] = None):
+        if system_name not in self.SYSTEMS:
+            raise Exception(f"System: {system_name} is not supported, choose one of {list(self.SYSTEMS)}")
+        self.system_name = system_name
+        self.load_multiplier = load_multiplier
+        self.pv_size = pv_size
+        self.energy_bank_params = {} if energy_bank_params is None else energy_bank_params
+        self.label = system_name if label is None else label
+
+    def build(self, dataset: Union[HourlyDataset, None] = None) -> SystemBase:
+        system_class = self.SYSTEMS[self.system_name]
+        if self.system_name in self.BANK_SYSTEMS:
+            return system_class(EnergyBank(**self.energy_bank_params), Pv(size=self.pv_size, offline=dataset is not None),
+                                load_multiplier=self.load_multiplier, dataset=dataset)
+        return system_class(pv_size=self.pv_size, load_multiplier=self.load_multiplier, dataset=dataset)
+
+
+class SimulationResult:
+    """
+    Class holding what is sent back from a worker process after a system was simulated.
+
+    Attributes:
+        label (str): Name of the simulation.
+        summed_cost (float): Summed cost of energy over the simulated range.
+        bank_lvl (float): Final energy bank level, None for systems without an energy bank.
+        plotter (Plotter): Plotter with the recorded series of the system.
+    """
+
+    def __init__(self, label: str, summed_cost: float, bank_lvl: Union[float, None], plotter: Plotter):
+        self.label = label
+        self.summed_cost = summed_cost
+        self.bank_lvl = bank_lvl
+        self.plotter = plotter
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self.plotter.df
+
+    def plot_charts(self) -> pd.DataFrame:
+        return self.plotter.plot_charts(f"System Data - {self.label}")
+
+
+class SimulationRunner:
+    """
+    Class running every specified system in its own worker process. Systems share no mutable state, so the wall
+    time of a run drops to roughly that of the slowest system.
+
+    Attributes:
+        specs (List[SystemSpec]): Specifications of the systems to simulate.
+        max_workers (int): The maximum number of worker processes, the number of cpus by default.
+    """
+
+    def __init__(self, specs: List[SystemSpec], max_workers: Union[int, None] = None):
+        self.specs = specs
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+
+    @staticmethod
+    def run_spec(spec: SystemSpec, date_start: pd.Timestamp, date_end: pd.Timestamp) -> SimulationResult:
+        dataset = DatasetRegistry.get_dataset(date_start, date_end + RUN_LOOKAHEAD, offline=True)
+        system = spec.build(dataset)
+        system.run(date_start, date_end)
+        bank_lvl = system.energy_bank.lvl if spec.system_name in spec.BANK_SYSTEMS else None
+        return SimulationResult(spec.label, system.summed_cost, bank_lvl, system.plotter)
+
+    def run(self, date_start: pd.Timestamp, date_end: pd.Timestamp, prefetch: bool = True) -> List[SimulationResult]:
+        if prefetch:
+            PrefetchPlanner(producer=Pv()).prefetch(date_start, date_end)
+        workers_num = min(len(self.specs), self.max_workers)
+        if workers_num <= 1:
+            return [self.run_spec(spec, date_start, date_end) for spec in self.specs]
+        with ProcessPoolExecutor(max_workers=workers_num) as executor:
+            return list(executor.map(self.run_spec, self.specs, repeat(date_start), repeat(date_end)))
+
+
+if __name__ == "__main__":
+    setup_logging()
+    bank_params = {"capacity": 3.0, "min_lvl": 0.0, "lvl": 1.0, "purchase_cost": 10000.0, "cycles_num": 5000}
+    runner = SimulationRunner([SystemSpec(name, energy_bank_params=bank_params) for name in SystemSpec.SYSTEMS])
+    for result in runner.run(pd.Timestamp("2020-08-19 06:00:00"), pd.Timestamp("2020-08-22 14:00:00")):
+        print(result.label, result.summed_cost, result.bank_lvl)
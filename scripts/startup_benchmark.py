@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Union
+
+BENCHMARK_PATH = "lib/startup_benchmark.json"
+HEADLESS_MODULES = ["systems.smart_system", "scripts.simulation_runner", "scripts.parameter_sweep", "main"]
+LAZY_DEPENDENCIES = ["matplotlib", "requests", "streamlit", "plotly", "colorlog"]
+
+
+class StartupBenchmark:
+    """
+    Class measuring how long importing the headless entry modules takes in a fresh interpreter and which lazily
+    loaded dependencies they pull in. Measurements are compared with the recorded ones to catch regressions.
+
+    Attributes:
+        modules (List[str]): Names of the measured modules.
+        repeats (int): Number of fresh interpreters started for every module, the median time is reported.
+    """
+
+    def __init__(self, modules: Union[List[str], None] = None, repeats: int = 5):
+        self.modules = HEADLESS_MODULES if modules is None else modules
+        self.repeats = repeats
+
+    @staticmethod
+    def get_import_time(module: str) -> float:
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True,
+                                text=True, check=True, cwd=os.getcwd())
+        import_lines = [line for line in result.stderr.splitlines() if line.startswith("import time:")]
+        own_line = next(line for line in reversed(import_lines) if line.split("|")[-1].strip() == module)
+        return int(own_line.split("|")[1]) / 10 ** 6
+
+    @staticmethod
+    def get_loaded_dependencies(module: str) -> List[str]:
+        code = f"import sys, {module}; print(','.join(m for m in {LAZY_DEPENDENCIES} if m in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=os.getcwd())
+        return [dependency for dependency in result.stdout.strip().split(",") if dependency]
+
+    def measure(self) -> Dict[str, float]:
+        return {module: statistics.median(self.get_import_time(module) for _ in range(self.repeats))
+                for module in self.modules}
+
+    @staticmethod
+    def get_regressions(measured: Dict[str, float], recorded: Dict[str, float], tolerance: float) -> List[str]:
+        return [module for module, import_time in measured.items()
+                if module in recorded and import_time > recorded[module] * tolerance]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time of the headless entry modules.")
+    parser.add_argument("--record", action="store_true", help="Save the measured times as the new reference")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed ratio of measured to recorded time")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    benchmark = StartupBenchmark(repeats=args.repeats)
+    measured_times = benchmark.measure()
+    for module_name, module_time in measured_times.items():
+        print(f"{module_name}: {module_time:.3f} s, lazy dependencies loaded: {benchmark.get_loaded_dependencies(module_name)}")
+    if args.record:
+        with open(BENCHMARK_PATH, "w") as benchmark_file:
+            json.dump({module: round(module_time, 3) for module, module_time in measured_times.items()}, benchmark_file, indent=4)
+    elif os.path.exists(BENCHMARK_PATH):
+        with open(BENCHMARK_PATH) as benchmark_file:
+            regressions = benchmark.get_regressions(measured_times, json.load(benchmark_file), args.tolerance)
+        if regressions:
+            sys.exit(f"Import time regressed for: {regressions}")
@@ -1,22 +1,33 @@
 from typing import Union
 
+import numpy as np
 import pandas as pd
 
+from scripts.hourly_dataset import HourlyDataset
+from scripts.results_sink import ResultsSink
 from systems.system_base import SystemBase
 
 
 class BareSystem(SystemBase):
-    def __init__(self, load_multiplier: Union[None, int] = None, **kwargs):
-        super().__init__(load_multiplier=load_multiplier)
+    def __init__(self, load_multiplier: Union[None, int] = None, dataset: Union[HourlyDataset, None] = None,
+                 results_sink: Union[ResultsSink, None] = None, **kwargs):
+        super().__init__(load_multiplier=load_multiplier, dataset=dataset, results_sink=results_sink)
 
     @staticmethod
     def calculate_cost(price: float, consumption: float) -> float:
         return consumption * price
 
     def feed_consumption(self, date_in: pd.Timestamp) -> None:
-        consumption = self.consumer.get_consumption_by_date(date_in)
-        rce_price = self.energy_pricer.get_rce_by_date(date_in)
+        rce_price, consumption, _ = self.get_hour_data(date_in)
         cost = self.calculate_cost(consumption, rce_price)
         self.log_data(cost)
         self.summed_cost += round(cost, 2)
         self.plotter.add_data_row([date_in, rce_price, consumption, 0, 0, self.summed_cost])
+
+    def run(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> float:
+        rce_prices, consumptions, _ = self.get_range_data(date_start, date_end)
+        costs = np.round(self.calculate_cost(consumptions, rce_prices), 2)
+        zeros = np.zeros(len(costs))
+        self.record_block(pd.date_range(start=date_start, end=date_end, freq="1h"), rce_prices, consumptions, zeros, zeros, costs)
+        self.plotter.flush()
+        return self.summed_cost
@@ -1,14 +1,18 @@
 from typing import Union
 
+import numpy as np
 import pandas as pd
 
+from scripts.hourly_dataset import HourlyDataset
 from scripts.pv import Pv
+from scripts.results_sink import ResultsSink
 from systems.system_base import SystemBase
 
 
 class PvSystem(SystemBase):
-    def __init__(self, pv_size: int = 5, load_multiplier: Union[None, int] = None, **kwargs):
-        super().__init__(load_multiplier=load_multiplier)
+    def __init__(self, pv_size: int = 5, load_multiplier: Union[None, int] = None, dataset: Union[HourlyDataset, None] = None,
+                 results_sink: Union[ResultsSink, None] = None, **kwargs):
+        super().__init__(load_multiplier=load_multiplier, dataset=dataset, results_sink=results_sink)
         self.producer = Pv(date_column="Date", size=pv_size)
 
     @staticmethod
@@ -16,11 +20,18 @@ class PvSystem(SystemBase):
         return consumption * price
 
     def feed_consumption(self, date_in: pd.Timestamp) -> None:
-        consumption = self.consumer.get_consumption_by_date(date_in)
-        rce_price = self.energy_pricer.get_rce_by_date(date_in)
-        production = self.producer.get_production_by_date(date_in)
+        rce_price, consumption, production = self.get_hour_data(date_in)
         reduced_consumption = round(consumption - production, 2)
         cost = self.calculate_cost(rce_price, reduced_consumption)
         self.log_data(cost)
         self.summed_cost += round(cost, 2)
         self.plotter.add_data_row([date_in, rce_price, consumption, production, 0, self.summed_cost])
+
+    def run(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> float:
+        rce_prices, consumptions, productions = self.get_range_data(date_start, date_end)
+        reduced_consumptions = np.round(consumptions - productions, 2)
+        costs = np.round(self.calculate_cost(rce_prices, reduced_consumptions), 2)
+        self.record_block(pd.date_range(start=date_start, end=date_end, freq="1h"), rce_prices, consumptions, productions,
+                          np.zeros(len(costs)), costs)
+        self.plotter.flush()
+        return self.summed_cost
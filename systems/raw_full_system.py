@@ -1,15 +1,21 @@
-from typing import Union
+from typing import Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+from scripts.battery_kernel import BatteryKernel
 from scripts.energy_bank import EnergyBank
+from scripts.hourly_dataset import HourlyDataset
 from scripts.pv import Pv
+from scripts.results_sink import ResultsSink
 from systems.system_base import SystemBase
 
 
 class RawFullSystem(SystemBase):
-    def __init__(self, energy_bank: EnergyBank, pv_producer: Pv, load_multiplier: Union[None, int] = None, **kwargs):
-        super().__init__(load_multiplier=load_multiplier)
+    def __init__(self, energy_bank: EnergyBank, pv_producer: Pv, load_multiplier: Union[None, int] = None,
+                 dataset: Union[HourlyDataset, None] = None,
+                 results_sink: Union[ResultsSink, None] = None, **kwargs):
+        super().__init__(load_multiplier=load_multiplier, dataset=dataset, results_sink=results_sink)
         self.producer = pv_producer
         self.energy_bank = energy_bank
 
@@ -23,11 +29,26 @@ class RawFullSystem(SystemBase):
         return cost
 
     def feed_consumption(self, date_in: pd.Timestamp) -> None:
-        consumption = self.consumer.get_consumption_by_date(date_in)
-        rce_price = self.energy_pricer.get_rce_by_date(date_in)
-        production = self.producer.get_production_by_date(date_in)
+        rce_price, consumption, production = self.get_hour_data(date_in)
         current_balance = round(production - consumption, 2)
         cost = self.calculate_cost(rce_price, current_balance)
         self.log_data(cost, current_balance, self.energy_bank.lvl)
         self.summed_cost += round(cost, 2)
         self.plotter.add_data_row([date_in, rce_price, consumption, production, self.energy_bank.lvl, self.summed_cost])
+
+    def run_batch(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rce_prices, consumptions, productions = self.get_range_data(date_start, date_end)
+        balances = np.round(productions - consumptions, 2)
+        kernel = BatteryKernel.from_energy_bank(self.energy_bank)
+        bank_lvls, costs = kernel.run_raw_full(rce_prices, balances, self.energy_bank.lvl)
+        costs = np.round(costs, 2)
+        summed_costs = self.record_block(pd.date_range(start=date_start, end=date_end, freq="1h"), rce_prices,
+                                         consumptions, productions, bank_lvls, costs)
+        if len(bank_lvls):
+            self.energy_bank.restore_lvl(bank_lvls[-1])
+        return bank_lvls, costs, summed_costs
+
+    def run(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> float:
+        self.run_batch(date_start, date_end)
+        self.plotter.flush()
+        return self.summed_cost
@@ -1,30 +1,80 @@
-from typing import Union
+from typing import Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from lib.sun_manager import SunManager
+from scripts.battery_kernel import BatteryKernel
+from scripts.decision_trace import DecisionTrace
 from scripts.energy_bank import EnergyBank
+from scripts.hourly_dataset import HourlyDataset
 from scripts.pv import Pv
+from scripts.results_sink import ResultsSink
 from systems.system_base import SystemBase
 
 
 class SmartSaveSystem(SystemBase):
-    def __init__(self, energy_bank: EnergyBank, pv_producer: Pv, load_multiplier: Union[None, int] = None, **kwargs):
-        super().__init__(load_multiplier=load_multiplier)
+    def __init__(self, energy_bank: EnergyBank, pv_producer: Pv, load_multiplier: Union[None, int] = None,
+                 dataset: Union[HourlyDataset, None] = None,
+                 results_sink: Union[ResultsSink, None] = None, trace_decisions: bool = False, **kwargs):
+        super().__init__(load_multiplier=load_multiplier, dataset=dataset, results_sink=results_sink)
         self.producer = pv_producer
         self.energy_bank = energy_bank
         self.sun_manager = SunManager()
+        if dataset is not None:
+            self.sun_manager.precompute(dataset.date_start, dataset.date_end)
         self.average_energy_cost = None
+        self.decision_trace = DecisionTrace() if trace_decisions else None
 
-    def calculate_average_energy_cost(self, date_in: pd.Timestamp, sunrise: int, sunset: int) -> None:
+    def get_average_energy_cost(self, date_in: pd.Timestamp, sunrise: int, sunset: int) -> float:
         if date_in.hour >= sunset:
-            end_date = date_in.replace(day=date_in.day + 1, hour=sunrise)
+            end_date = (date_in + pd.Timedelta(days=1)).replace(hour=sunrise)
         elif sunrise <= date_in.hour < sunset:
             end_date = date_in.replace(hour=sunset)
         else:
             end_date = date_in.replace(hour=sunrise)
-        rce_prices = self.energy_pricer.get_rce_by_date(date_in, end_date)
-        self.average_energy_cost = sum(rce_prices) / len(rce_prices)
+        rce_prices, _, _ = self.get_range_data(date_in, end_date)
+        rce_prices = rce_prices.tolist()
+        return sum(rce_prices) / len(rce_prices)
+
+    def calculate_average_energy_cost(self, date_in: pd.Timestamp, sunrise: int, sunset: int) -> None:
+        self.average_energy_cost = self.get_average_energy_cost(date_in, sunrise, sunset)
+
+    def get_average_energy_costs(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        if len(dates) == 0:
+            return np.empty(0)
+        average_costs = []
+        sunrise_hours, sunset_hours = self.sun_manager.get_sun_data_range(dates[0], dates[-1])
+        day_idxes = (dates.normalize() - dates[0].normalize()).days
+        for date_in, day_idx in zip(dates, day_idxes):
+            sunrise, sunset = int(sunrise_hours[day_idx]), int(sunset_hours[day_idx])
+            if date_in.hour == sunset or date_in.hour == sunrise or self.average_energy_cost is None:
+                self.calculate_average_energy_cost(date_in, sunrise, sunset)
+            average_costs.append(self.average_energy_cost)
+        return np.array(average_costs)
+
+    def get_decision(self, price: float, balance: float) -> str:
+        if price < 0.0:
+            return "bank" if balance >= 0.0 else "grid_charge"
+        is_expensive_hour = price >= self.average_energy_cost + self.energy_bank.operation_cost(balance)
+        return "grid" if (balance >= 0.0) == is_expensive_hour else "bank"
+
+    def get_decision_codes(self, prices: np.ndarray, balances: np.ndarray, average_costs: np.ndarray) -> np.ndarray:
+        operation_costs = self.energy_bank.operation_costs(balances)
+        is_grid_trade = (balances >= 0.0) == (prices >= average_costs + operation_costs)
+        codes = np.where(is_grid_trade, DecisionTrace.get_strategy_code("grid"), DecisionTrace.get_strategy_code("bank"))
+        is_grid_charge = (prices < 0.0) & (balances < 0.0)
+        codes = np.where(prices < 0.0, DecisionTrace.get_strategy_code("bank"), codes)
+        return np.where(is_grid_charge, DecisionTrace.get_strategy_code("grid_charge"), codes)
+
+    def trace_block(self, dates: pd.DatetimeIndex, prices: np.ndarray, balances: np.ndarray, average_costs: np.ndarray,
+                    bank_lvls: np.ndarray, start_lvl: float, costs: np.ndarray) -> None:
+        lvls_before = np.concatenate(([start_lvl], bank_lvls[:-1]))
+        stored_energies = bank_lvls - lvls_before
+        operation_costs = self.energy_bank.operation_costs(stored_energies)
+        self.decision_trace.add_block(dates, self.get_decision_codes(prices, balances, average_costs), prices, balances,
+                                      balances, lvls_before, bank_lvls, average_costs,
+                                      np.round(-(balances - stored_energies) * prices, 2), operation_costs, costs)
 
     def _calculate_cost_positive_price(self, price: float, balance: float) -> float:
         bank_operation_cost = self.energy_bank.operation_cost(balance)
@@ -62,11 +112,35 @@ class SmartSaveSystem(SystemBase):
         sunrise, sunset = self.sun_manager.get_sun_data(date_in)
         if date_in.hour == sunset or date_in.hour == sunrise or self.average_energy_cost is None:
             self.calculate_average_energy_cost(date_in, sunrise, sunset)
-        rce_price = self.energy_pricer.get_rce_by_date(date_in)
-        consumption = self.consumer.get_consumption_by_date(date_in)
-        production = self.producer.get_production_by_date(date_in)
+        rce_price, consumption, production = self.get_hour_data(date_in)
         current_balance = round(production - consumption, 2)
+        bank_lvl = self.energy_bank.lvl
+        if self.decision_trace is not None:
+            decision = self.get_decision(rce_price, current_balance)
         cost = self.calculate_cost(rce_price, current_balance)
+        if self.decision_trace is not None:
+            self.decision_trace.add_decision(self.energy_bank, date_in, decision, rce_price, current_balance,
+                                             current_balance, bank_lvl, self.average_energy_cost, cost)
         self.log_data(cost, current_balance, self.energy_bank.lvl)
         self.summed_cost += round(cost, 2)
         self.plotter.add_data_row([date_in, rce_price, consumption, production, self.energy_bank.lvl, self.summed_cost])
+
+    def run_batch(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        dates = pd.date_range(start=date_start, end=date_end, freq="1h")
+        average_costs = self.get_average_energy_costs(dates)
+        rce_prices, consumptions, productions = self.get_range_data(date_start, date_end)
+        balances = np.round(productions - consumptions, 2)
+        kernel = BatteryKernel.from_energy_bank(self.energy_bank)
+        bank_lvls, costs = kernel.run_smart_save(rce_prices, balances, average_costs, self.energy_bank.lvl)
+        costs = np.round(costs, 2)
+        if self.decision_trace is not None:
+            self.trace_block(dates, rce_prices, balances, average_costs, bank_lvls, self.energy_bank.lvl, costs)
+        summed_costs = self.record_block(dates, rce_prices, consumptions, productions, bank_lvls, costs)
+        if len(bank_lvls):
+            self.energy_bank.restore_lvl(bank_lvls[-1])
+        return bank_lvls, costs, summed_costs
+
+    def run(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> float:
+        self.run_batch(date_start, date_end)
+        self.plotter.flush()
+        return self.summed_cost
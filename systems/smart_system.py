@@ -1,25 +1,41 @@
 from datetime import timedelta
-from typing import Union
+from typing import List, Union
 
+import numpy as np
 import pandas as pd
 
-from lib.logger import logger
+from lib.logger import HOURLY, logger
 from lib.sun_manager import SunManager
+from scripts.decision_trace import DecisionTrace
 from scripts.energy_bank import EnergyBank
-from scripts.prediction_strategy import PredictionStrategy, DayPredictionStrategy, NightPredictionStrategy
+from scripts.hourly_dataset import HourlyDataset
+from scripts.prediction_strategy import PredictionStrategy, DayPredictionStrategy, NightPredictionStrategy, OptimalPredictionStrategy
 from scripts.pv import Pv
+from scripts.results_sink import ResultsSink
 from systems.system_base import SystemBase
 
 
 class SmartSystem(SystemBase):
-    def __init__(self, energy_bank: EnergyBank, pv_producer: Pv, load_multiplier: Union[None, int] = None, **kwargs):
-        super().__init__(load_multiplier=load_multiplier)
+    def __init__(self, energy_bank: EnergyBank, pv_producer: Pv, load_multiplier: Union[None, int] = None,
+                 dataset: Union[HourlyDataset, None] = None, incremental_planning: bool = True,
+                 optimal_planning: bool = False, results_sink: Union[ResultsSink, None] = None,
+                 trace_decisions: bool = False, **kwargs):
+        super().__init__(load_multiplier=load_multiplier, dataset=dataset, results_sink=results_sink)
         self.producer = pv_producer
         self.energy_bank = energy_bank
         self.sun_manager = SunManager()
+        if dataset is not None:
+            self.sun_manager.precompute(dataset.date_start, dataset.date_end)
         self._prediction_strategy = None
+        self.incremental_planning = incremental_planning
+        self.optimal_planning = optimal_planning
+        self.plan_start = None
+        self.plan_prices = None
+        self.plan_balances = None
         self.energy_plan = None
+        self.planned_lvls = None
         self.average_energy_cost = None
+        self.decision_trace = DecisionTrace() if trace_decisions else None
 
     @property
     def prediction_strategy(self) -> PredictionStrategy:
@@ -30,7 +46,8 @@ class SmartSystem(SystemBase):
         self._prediction_strategy = strategy
 
     def calculate_average_energy_cost(self, start: pd.Timestamp, end: pd.Timestamp) -> None:
-        prices = self.energy_pricer.get_rce_by_date(start, end)
+        prices, _, _ = self.get_range_data(start, end)
+        prices = prices.tolist()
         self.average_energy_cost = sum(prices) / len(prices)
 
     def calculate_cost(self, price: float, predicted_bal: float, real_bal: float) -> float:
@@ -115,38 +132,74 @@ class SmartSystem(SystemBase):
         sunrise, sunset = self.sun_manager.get_sun_data(date_in)
         if date_in.hour >= sunset:
             self.prediction_strategy = NightPredictionStrategy(self.energy_bank.min_lvl, self.energy_bank.capacity)
-            strategy_end_date = date_in.replace(day=date_in.day + 1, hour=sunrise)
+            strategy_end_date = (date_in + pd.Timedelta(days=1)).replace(hour=sunrise)
         elif sunrise <= date_in.hour < sunset:
             self.prediction_strategy = DayPredictionStrategy(self.energy_bank.min_lvl, self.energy_bank.capacity)
             strategy_end_date = date_in.replace(hour=sunset)
         else:
             self.prediction_strategy = NightPredictionStrategy(self.energy_bank.min_lvl, self.energy_bank.capacity)
             strategy_end_date = date_in.replace(hour=sunrise)
+        if self.optimal_planning:
+            self.prediction_strategy = OptimalPredictionStrategy(self.energy_bank.min_lvl, self.energy_bank.capacity,
+                                                                 self.energy_bank.single_cycle_cost, grid_charging=False)
         if self.average_energy_cost is None or date_in.hour == sunset or date_in.hour == sunrise:
             self.calculate_average_energy_cost(date_in, strategy_end_date)
         return strategy_end_date
 
+    def get_strategy_name(self) -> str:
+        if isinstance(self.prediction_strategy, OptimalPredictionStrategy):
+            return "optimal"
+        return "day" if isinstance(self.prediction_strategy, DayPredictionStrategy) else "night"
+
+    def simulate_planned_lvls(self, start_lvl: float, energy_plan: List[float]) -> List[float]:
+        energy_bank = EnergyBank(capacity=self.energy_bank.capacity, min_lvl=self.energy_bank.min_lvl, lvl=start_lvl)
+        planned_lvls = [start_lvl]
+        for planned_balance in energy_plan:
+            energy_bank.manage_energy(planned_balance)
+            planned_lvls.append(energy_bank.lvl)
+        return planned_lvls[:-1]
+
+    def plan_remaining_hours(self, offset: int) -> None:
+        rce_prices, balances = self.plan_prices[offset:], self.plan_balances[offset:]
+        energy_plan = self.prediction_strategy.get_plan(self.energy_bank.lvl, rce_prices, balances)
+        if self.log_hourly:
+            logger.log(HOURLY, "SmartSystem EP input rce_prices: %s, balances: %s, EP: %s", rce_prices, balances, energy_plan)
+        self.energy_plan[offset:] = energy_plan
+        self.planned_lvls[offset:] = self.simulate_planned_lvls(self.energy_bank.lvl, self.energy_plan[offset:])
+
     def create_energy_plan(self, start_date: pd.Timestamp) -> None:
         strategy_end_date = self._choose_prediction_strategy(start_date)
-        rce_prices = self.energy_pricer.get_rce_by_date(start_date, strategy_end_date)
-        consumptions = self.consumer.get_consumption_by_date(start_date, strategy_end_date)
-        productions = self.producer.get_production_by_date(start_date, strategy_end_date)
-        balances = [round(prod - cons, 2) for (prod, cons) in zip(productions, consumptions)]
-        dates = pd.date_range(start=start_date, end=strategy_end_date, freq=timedelta(hours=1))
-        energy_plan = self.prediction_strategy.get_plan(self.energy_bank.lvl, rce_prices, balances)
-        logger.info(f"SmartSystem EP input rce_prices: {rce_prices}")
-        logger.info(f"SmartSystem EP input balances: {balances}")
-        logger.info(f"SmartSystem EP: {energy_plan}")
-        self.energy_plan = {k: v for k, v in zip(dates, energy_plan)}
+        rce_prices, consumptions, productions = self.get_range_data(start_date, strategy_end_date)
+        self.plan_start = start_date
+        self.plan_prices = rce_prices.tolist()
+        self.plan_balances = np.round(productions - consumptions, 2).tolist()
+        self.energy_plan = [0.0] * len(self.plan_prices)
+        self.planned_lvls = [0.0] * len(self.plan_prices)
+        self.plan_remaining_hours(0)
 
-    def feed_consumption(self, date_in: pd.Timestamp) -> None:
+    def update_energy_plan(self, date_in: pd.Timestamp) -> int:
+        offset = None if self.plan_start is None else (date_in - self.plan_start) // timedelta(hours=1)
+        if self.incremental_planning and offset is not None and 0 <= offset < len(self.energy_plan):
+            sunrise, sunset = self.sun_manager.get_sun_data(date_in)
+            if date_in.hour != sunrise and date_in.hour != sunset:
+                if round(self.energy_bank.lvl, 2) != round(self.planned_lvls[offset], 2):
+                    logger.log(HOURLY, "SmartSystem energy bank lvl: %s differs from planned: %s, replanning from %s",
+                               self.energy_bank.lvl, self.planned_lvls[offset], date_in)
+                    self.plan_remaining_hours(offset)
+                return offset
         self.create_energy_plan(date_in)
-        rce_price = self.energy_pricer.get_rce_by_date(date_in)
-        consumption = self.consumer.get_consumption_by_date(date_in)
-        production = self.producer.get_production_by_date(date_in)
+        return 0
+
+    def feed_consumption(self, date_in: pd.Timestamp) -> None:
+        offset = self.update_energy_plan(date_in)
+        rce_price, consumption, production = self.get_hour_data(date_in)
         current_balance = round(production - consumption, 2)
-        predicted_balance = self.energy_plan[date_in]
+        predicted_balance = self.energy_plan[offset]
+        bank_lvl = self.energy_bank.lvl
         cost = self.calculate_cost(rce_price, predicted_balance, current_balance)
+        if self.decision_trace is not None:
+            self.decision_trace.add_decision(self.energy_bank, date_in, self.get_strategy_name(), rce_price,
+                                             predicted_balance, current_balance, bank_lvl, self.average_energy_cost, cost)
         self.log_data(cost, current_balance, self.energy_bank.lvl)
         self.summed_cost += round(cost, 2)
         self.plotter.add_data_row([date_in, rce_price, consumption, production, self.energy_bank.lvl, self.summed_cost])
@@ -1,31 +1,87 @@
 from abc import abstractmethod
-from typing import Union
+from typing import Iterator, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-from lib.logger import logger
+from lib.logger import HOURLY, logger
 from scripts.energy_pricing import EnergyWebScraper
+from scripts.hourly_dataset import HourlyDataset
 from scripts.load import Load
 from scripts.plotter import Plotter
+from scripts.results_sink import ResultsSink
 
 
 class SystemBase:
-    def __init__(self, load_multiplier: Union[None, int] = None):
+    def __init__(self, load_multiplier: Union[None, int] = None, dataset: Union[HourlyDataset, None] = None,
+                 results_sink: Union[ResultsSink, None] = None):
         self.summed_cost = 0
-        self.energy_pricer = EnergyWebScraper(date_column="Date")
-        self.plotter = Plotter(["price [zl/kWh]", "consumption [kWh]", "production [kWh]", "energy_bank [kWh]", "Total price [zl]"])
+        self.dataset = dataset
+        self.producer = None
+        self.energy_pricer = EnergyWebScraper(date_column="Date", offline=dataset is not None)
+        self.plotter = Plotter(["price [zl/kWh]", "consumption [kWh]", "production [kWh]", "energy_bank [kWh]", "Total price [zl]"],
+                               sink=results_sink)
         self.consumer = Load(date_column="Date", multiplier=load_multiplier)
+        self.log_hourly = logger.isEnabledFor(HOURLY)
 
     @abstractmethod
     def feed_consumption(self, date_in: pd.Timestamp) -> None:
         pass
 
+    def run(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> float:
+        for date_in in pd.date_range(start=date_start, end=date_end, freq="1h"):
+            self.feed_consumption(date_in)
+        self.plotter.flush()
+        return self.summed_cost
+
+    def run_steps(self, date_start: pd.Timestamp, date_end: pd.Timestamp,
+                  step: pd.Timedelta = pd.Timedelta(days=7)) -> Iterator[pd.Timestamp]:
+        step_start = date_start
+        while step_start <= date_end:
+            step_end = min(step_start + step - pd.Timedelta(hours=1), date_end)
+            self.run(step_start, step_end)
+            yield step_end
+            step_start = step_end + pd.Timedelta(hours=1)
+
+    def record_block(self, dates: pd.DatetimeIndex, rce_prices: np.ndarray, consumptions: np.ndarray,
+                     productions: np.ndarray, bank_lvls: np.ndarray, costs: np.ndarray) -> np.ndarray:
+        summed_costs = np.cumsum(np.concatenate(([self.summed_cost], costs)))[1:]
+        self.plotter.add_data_block(dates, [rce_prices, consumptions, productions, bank_lvls, summed_costs])
+        if len(summed_costs) == 0:
+            return summed_costs
+        self.summed_cost = summed_costs[-1]
+        logger.info("%s cost from %s to %s: %.3g", self.__class__.__name__, dates[0], dates[-1], self.summed_cost)
+        return summed_costs
+
+    def simulate_pv_size(self, production: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        return production if self.producer is None else self.producer.simulate_size(production)
+
+    def get_hour_data(self, date_in: pd.Timestamp) -> Tuple[float, float, float]:
+        if self.dataset is not None and self.dataset.covers(date_in):
+            rce_price, consumption, production = self.dataset.get_record(date_in)
+            return rce_price, self.consumer.simulate_load_multiplier(consumption), self.simulate_pv_size(production)
+        rce_price = self.energy_pricer.get_rce_by_date(date_in)
+        consumption = self.consumer.get_consumption_by_date(date_in)
+        production = 0.0 if self.producer is None else self.producer.get_production_by_date(date_in)
+        return rce_price, consumption, production
+
+    def get_range_data(self, date_start: pd.Timestamp, date_end: pd.Timestamp) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self.dataset is not None and self.dataset.covers(date_start, date_end):
+            rce_prices, consumptions, productions = self.dataset.get_range(date_start, date_end)
+            return rce_prices, self.consumer.simulate_load_multiplier(consumptions), self.simulate_pv_size(productions)
+        rce_prices = self.energy_pricer.get_rce_array_by_date(date_start, date_end)
+        consumptions = self.consumer.get_consumption_array_by_date(date_start, date_end)
+        if self.producer is None:
+            productions = np.zeros(len(rce_prices))
+        else:
+            productions = self.producer.get_production_array_by_date(date_start, date_end)
+        return rce_prices, consumptions, productions
+
     def plot_charts(self):
         return self.plotter.plot_charts(f"System Data - {self.__class__.__name__}")
 
     def log_data(self, cost: float, balance: Union[None, float] = None, bank_lvl: Union[None, float] = None) -> None:
-        logger.info(f"{self.__class__.__name__} current cost: {cost:.3}")
-        if balance is not None:
-            logger.info(f"{self.__class__.__name__} current balance: {balance:.3}")
-        if bank_lvl is not None:
-            logger.info(f"{self.__class__.__name__} current energy_bank_lvl: {bank_lvl:.3}")
+        if not self.log_hourly:
+            return
+        logger.log(HOURLY, "%s current cost: %.3g, balance: %s, energy_bank_lvl: %s", self.__class__.__name__, cost,
+                   balance, bank_lvl)
@@ -1,8 +1,12 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
 import pytest
 
 from lib.config import CustomEnum
 from scripts.energy_bank import EnergyBank
-from scripts.prediction_strategy import NightPredictionStrategy, DayPredictionStrategy
+from scripts.prediction_strategy import NightPredictionStrategy, DayPredictionStrategy, OptimalPredictionStrategy
 from scripts.pv import Pv
 
 
@@ -50,3 +54,48 @@ def night_strategy() -> NightPredictionStrategy:
 @pytest.fixture()
 def day_strategy() -> DayPredictionStrategy:
     return DayPredictionStrategy(min_energy=EbProps.MIN_LVL, max_energy=EbProps.CAPACITY)
+
+
+@pytest.fixture()
+def optimal_strategy() -> OptimalPredictionStrategy:
+    return OptimalPredictionStrategy(min_energy=EbProps.MIN_LVL, max_energy=EbProps.CAPACITY,
+                                     single_cycle_cost=EbProps.COST / EbProps.CYCLES)
+
+
+class PseStandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        parts = self.path.strip('/').split('/')
+        if parts[0] == "data":
+            days = pd.date_range(pd.Timestamp(parts[1]), pd.Timestamp(parts[1]), freq="D")
+        else:
+            days = pd.date_range(pd.Timestamp(parts[1]), pd.Timestamp(parts[3]), freq="D")
+        self.server.requested_paths.append(self.path)
+        self.server.client_ports.add(self.client_address[1])
+        rows = [f"{day.strftime('%Y%m%d')};{hour};{day.day * 100 + hour * 10},0" for day in days for hour in range(1, 25)]
+        body = "\n".join(["Data;Godzina;RCE"] + rows).encode("utf-8")
+        if parts[1] in self.server.failing_days:
+            body = b"<html>Service unavailable</html>"
+        elif self.server.malformed_responses > 0:
+            self.server.malformed_responses -= 1
+            body = b"<html>Service unavailable</html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def pse_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PseStandInHandler)
+    server.requested_paths, server.client_ports, server.malformed_responses = [], set(), 0
+    server.failing_days = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
@@ -0,0 +1,80 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.decision_trace import DecisionTrace
+from scripts.energy_bank import EnergyBank
+from scripts.hourly_dataset import HourlyDataset
+from scripts.pv import Pv
+from systems.smart_save_system import SmartSaveSystem
+from systems.smart_system import SmartSystem
+
+
+class TestDecisionTrace:
+    DATE_START = pd.Timestamp("2020-06-01 00:00:00")
+    HOURS = 24 * 5
+
+    @pytest.fixture(scope="function")
+    def dataset(self) -> HourlyDataset:
+        rng = np.random.default_rng(3)
+        dates = pd.date_range(start=self.DATE_START, periods=self.HOURS, freq="1h")
+        prices = np.round(rng.uniform(-0.3, 1.2, self.HOURS), 2)
+        consumptions = np.round(rng.uniform(0.1, 2.0, self.HOURS), 3)
+        productions = np.round(rng.uniform(0.0, 3.0, self.HOURS), 3)
+        return HourlyDataset(dates, prices, consumptions, productions)
+
+    def test_smart_save_batch_trace_matches_hourly(self, dataset: HourlyDataset, energy_bank: type(EnergyBank)) -> None:
+        hourly_system = SmartSaveSystem(energy_bank(), Pv(), dataset=dataset, trace_decisions=True)
+        batch_system = SmartSaveSystem(energy_bank(), Pv(), dataset=dataset, trace_decisions=True)
+        date_end = dataset.date_end - pd.Timedelta(days=1)
+        for date_in in pd.date_range(start=dataset.date_start, end=date_end, freq="1h"):
+            hourly_system.feed_consumption(date_in)
+        batch_system.run_batch(dataset.date_start, date_end)
+        pd.testing.assert_frame_equal(batch_system.decision_trace.to_df(), hourly_system.decision_trace.to_df())
+        assert batch_system.decision_trace.replay()[-1] == batch_system.summed_cost
+
+    def test_smart_system_trace(self, dataset: HourlyDataset, energy_bank: type(EnergyBank)) -> None:
+        system = SmartSystem(energy_bank(), Pv(), dataset=dataset, trace_decisions=True)
+        system.run(dataset.date_start, dataset.date_end - pd.Timedelta(days=1))
+        records = system.decision_trace.records
+        assert len(records) == len(system.plotter.df)
+        assert np.array_equal(records["lvl_after"], system.plotter.df["energy_bank [kWh]"].to_numpy())
+        assert np.array_equal(records["lvl_before"][1:], records["lvl_after"][:-1])
+        assert set(system.decision_trace.to_df()["strategy"]) <= {"day", "night"}
+        assert system.decision_trace.replay()[-1] == system.summed_cost
+
+    def test_save_and_load(self, tmp_path) -> None:
+        trace = DecisionTrace(initial_capacity=2)
+        for idx, date_in in enumerate(pd.date_range(start=self.DATE_START, periods=5, freq="1h")):
+            trace.add(date_in, "night", 0.5, 1.0, 0.5, 1.0, 1.5, 0.4, -0.25, 0.01, idx * 0.1)
+        trace.save(str(tmp_path / "trace.npy"))
+        loaded_trace = DecisionTrace.load(str(tmp_path / "trace.npy"))
+        assert np.array_equal(loaded_trace.records, trace.records)
+        np.save(str(tmp_path / "other.npy"), np.zeros(3))
+        with pytest.raises(Exception):
+            DecisionTrace.load(str(tmp_path / "other.npy"))
+
+    def test_save_and_load_without_extension(self, tmp_path) -> None:
+        trace = DecisionTrace()
+        trace.add(self.DATE_START, "day", 0.5, 1.0, 0.5, 1.0, 1.5, 0.4, -0.25, 0.01, 0.1)
+        trace.save(str(tmp_path / "trace"))
+        assert os.listdir(tmp_path) == ["trace"]
+        assert np.array_equal(DecisionTrace.load(str(tmp_path / "trace")).records, trace.records)
+
+    def test_year_aggregated_quickly(self, tmp_path) -> None:
+        hours = 24 * 366
+        rng = np.random.default_rng(0)
+        trace = DecisionTrace()
+        trace.add_block(pd.date_range(start="2020-01-01", periods=hours, freq="1h"), rng.integers(0, 2, hours),
+                        *[rng.uniform(-1.0, 1.0, hours) for _ in range(9)])
+        trace.save(str(tmp_path / "year.npy"))
+        time_start = time.perf_counter()
+        loaded_trace = DecisionTrace.load(str(tmp_path / "year.npy"))
+        monthly_df = loaded_trace.aggregate("MS")
+        summed_costs = loaded_trace.replay()
+        assert time.perf_counter() - time_start < 1.0
+        assert len(monthly_df) == 24
+        assert monthly_df["cost"].sum() == pytest.approx(summed_costs[-1])
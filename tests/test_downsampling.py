@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.downsampling import ChartDownsampler
+
+
+class TestChartDownsampler:
+    HOURS = 24 * 366
+
+    @pytest.fixture(scope="function")
+    def series_df(self) -> pd.DataFrame:
+        rng = np.random.default_rng(7)
+        dates = pd.date_range(start="2020-01-01", periods=self.HOURS, freq="1h")
+        prices = np.sin(np.arange(self.HOURS) / 24) + rng.uniform(0.0, 0.1, self.HOURS)
+        prices[1234], prices[5678] = 5.0, -5.0
+        costs = np.cumsum(rng.uniform(-1.0, 1.0, self.HOURS))
+        return pd.DataFrame({"Date": dates, "price": prices, "Total price [zl]": costs})
+
+    def test_lttb_idxes(self) -> None:
+        y = np.zeros(1000)
+        y[500] = 10.0
+        idxes = ChartDownsampler.get_lttb_idxes(np.arange(1000.0), y, 50)
+        assert len(idxes) == 50
+        assert idxes[0] == 0 and idxes[-1] == 999
+        assert 500 in idxes
+        assert (np.diff(idxes) > 0).all()
+        np.testing.assert_array_equal(ChartDownsampler.get_lttb_idxes(np.arange(10.0), np.arange(10.0), 20), np.arange(10))
+
+    def test_min_max_idxes(self) -> None:
+        y = np.random.default_rng(1).normal(size=1000)
+        idxes = ChartDownsampler.get_min_max_idxes(y, 100)
+        assert len(idxes) <= 100
+        assert np.argmin(y) in idxes and np.argmax(y) in idxes
+        assert idxes[0] == 0 and idxes[-1] == 999
+
+    @pytest.mark.parametrize("method", ChartDownsampler.METHODS)
+    def test_downsample_keeps_budget_and_extremes(self, series_df: pd.DataFrame, method: str) -> None:
+        downsampled_df = ChartDownsampler(max_points=500, method=method).downsample(series_df)
+        assert len(downsampled_df) <= 500
+        assert list(downsampled_df.columns) == list(series_df.columns)
+        assert downsampled_df["Date"].is_monotonic_increasing
+        assert downsampled_df["price"].max() == 5.0 and downsampled_df["price"].min() == -5.0
+        assert downsampled_df["Date"].iloc[-1] == series_df["Date"].iloc[-1]
+
+    def test_zoomed_range_in_full_resolution(self, series_df: pd.DataFrame) -> None:
+        date_start, date_end = pd.Timestamp("2020-03-01"), pd.Timestamp("2020-03-10 23:00")
+        downsampled_df = ChartDownsampler(max_points=500).downsample(series_df, date_start=date_start, date_end=date_end)
+        expected_df = series_df[(series_df["Date"] >= date_start) & (series_df["Date"] <= date_end)]
+        pd.testing.assert_frame_equal(downsampled_df, expected_df)
+
+    def test_aggregate(self, series_df: pd.DataFrame) -> None:
+        downsampler = ChartDownsampler(method="day", aggregations={"Total price [zl]": "last"})
+        aggregated_df = downsampler.downsample(series_df)
+        assert len(aggregated_df) == 366
+        np.testing.assert_allclose(aggregated_df["price"].iloc[0], series_df["price"].iloc[:24].mean())
+        assert aggregated_df["Total price [zl]"].iloc[-1] == series_df["Total price [zl]"].iloc[-1]
+        assert len(ChartDownsampler(method="month").downsample(series_df)) == 12
+
+    def test_nan_values(self, series_df: pd.DataFrame) -> None:
+        series_df.loc[series_df.index[4000:], "Total price [zl]"] = np.nan
+        downsampled_df = ChartDownsampler(max_points=500).downsample(series_df)
+        assert downsampled_df["Total price [zl]"].notna().sum() > 100
+        assert downsampled_df["price"].max() == 5.0
+
+    def test_unsupported_parameters(self) -> None:
+        with pytest.raises(Exception):
+            ChartDownsampler(method="hour")
+        with pytest.raises(Exception):
+            ChartDownsampler(max_points=2)
@@ -61,3 +61,18 @@ class TestEnergyBank:
         for _ in range(10):
             energy_bank.operation_cost(balance_in)
         assert operation_cost == energy_bank.operation_cost(balance_in)
+
+    def test_trajectory_does_not_change_bank(self, energy_bank: type(EnergyBank)):
+        energy_bank = energy_bank()
+        energy_bank.simulate_trajectory([1.5, -4.0, 2.0], start_lvl=EbProps.MIN_LVL)
+        assert energy_bank.lvl == EbProps.LVL
+
+    @pytest.mark.parametrize("balances", [[1.0, -0.5, 0.25], [EbProps.CAPACITY+1.0, -0.3, -(EbProps.CAPACITY+2.0)],
+                                          [-0.1, 0.7, -1.33, 2.9, 0.0, -0.05]])
+    def test_trajectory_same_as_managing_energy(self, balances: list, energy_bank: type(EnergyBank)):
+        lvls, rest_energies = energy_bank().simulate_trajectory(balances)
+        energy_bank = energy_bank()
+        assert lvls[0] == energy_bank.lvl
+        for idx, balance in enumerate(balances):
+            assert rest_energies[idx] == energy_bank.manage_energy(balance)
+            assert lvls[idx+1] == energy_bank.lvl
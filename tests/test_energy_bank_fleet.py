@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from scripts.energy_bank import EnergyBank
+from scripts.energy_bank_fleet import EnergyBankFleet
+from tests.conftest import EbProps
+
+
+class TestEnergyBankFleet:
+    HOURS = 24 * 7
+
+    @pytest.fixture(scope="function")
+    def energy_banks(self, energy_bank: type(EnergyBank)) -> list:
+        return [energy_bank(), energy_bank(capacity=3.0, min_lvl=0.0, lvl=1.0),
+                energy_bank(capacity=10.0, lvl=9.5, purchase_cost=5000.0, cycles_num=3000)]
+
+    @pytest.fixture(scope="function")
+    def hourly_data(self) -> tuple:
+        rng = np.random.default_rng(7)
+        return np.round(rng.uniform(-0.3, 1.2, self.HOURS), 2), np.round(rng.uniform(-3.0, 4.0, self.HOURS), 2)
+
+    def test_manage_energy_same_as_energy_bank(self, energy_banks: list, hourly_data: tuple) -> None:
+        fleet = EnergyBankFleet.from_energy_banks(energy_banks)
+        for balance in hourly_data[1]:
+            rest_energies = fleet.manage_energy(balance)
+            assert rest_energies.tolist() == [eb.manage_energy(balance) for eb in energy_banks]
+            assert fleet.lvl.tolist() == [eb.lvl for eb in energy_banks]
+
+    def test_raw_full_costs_same_as_energy_bank(self, energy_banks: list, hourly_data: tuple) -> None:
+        fleet = EnergyBankFleet.from_energy_banks(energy_banks)
+        summed_costs = fleet.run_raw_full(*hourly_data)
+        for unit, eb in enumerate(energy_banks):
+            summed_cost = 0.0
+            for price, balance in zip(*hourly_data):
+                bank_lvl = eb.lvl
+                balance_after_bank = eb.manage_energy(balance)
+                if balance >= 0.0:
+                    cost = -balance_after_bank * price + eb.operation_cost(balance - balance_after_bank)
+                else:
+                    cost = -balance_after_bank * price + eb.operation_cost(min(bank_lvl, abs(balance)))
+                summed_cost += round(cost, 2)
+            assert summed_costs[unit] == summed_cost
+            assert fleet.lvl[unit] == eb.lvl
+
+    def test_balances_per_unit(self, hourly_data: tuple) -> None:
+        prices, balances = hourly_data
+        fleet = EnergyBankFleet(capacity=EbProps.CAPACITY, min_lvl=EbProps.MIN_LVL, lvl=EbProps.LVL, units_num=2)
+        summed_costs = fleet.run_raw_full(prices, np.column_stack([balances, -balances]))
+        assert summed_costs[0] == EnergyBankFleet(EbProps.CAPACITY, EbProps.MIN_LVL, EbProps.LVL).run_raw_full(prices, balances)[0]
+        assert summed_costs[0] != summed_costs[1]
+
+    def test_memory_per_unit(self) -> None:
+        fleet = EnergyBankFleet(units_num=10000)
+        assert fleet.nbytes / len(fleet) == 40
+
+    @pytest.mark.parametrize("invalid_new_lvl", [EbProps.MIN_LVL - 0.1, EbProps.CAPACITY + 0.1])
+    def test_invalid_lvl(self, invalid_new_lvl: float) -> None:
+        fleet = EnergyBankFleet(capacity=EbProps.CAPACITY, min_lvl=EbProps.MIN_LVL, lvl=EbProps.LVL, units_num=3)
+        with pytest.raises(Exception):
+            fleet.lvl = np.array([EbProps.LVL, invalid_new_lvl, EbProps.LVL])
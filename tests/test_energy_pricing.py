@@ -24,8 +24,9 @@ class TestEnergyWebScaper:
     def web_scraper(self) -> EnergyWebScraper:
         time.sleep(3)
         yield EnergyWebScraper(prices_path=self.TEST_PATH, date_column="Date")
-        if os.path.exists(self.TEST_PATH):
-            os.remove(self.TEST_PATH)
+        for path in [self.TEST_PATH, self.TEST_PATH.replace(".csv", ".feather")]:
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_download_single_day_prices(self, web_scraper: EnergyWebScraper) -> None:
         date_start = create_random_date()
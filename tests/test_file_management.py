@@ -1,4 +1,4 @@
-from scripts.file_management import DfManager
+from scripts.file_management import CSVManager, DfManager
 import pytest
 import os
 import pandas as pd
@@ -6,6 +6,7 @@ import pandas as pd
 
 class TestDfManager:
     TEST_PATH = "test_df_manager.csv"
+    TEST_BINARY_PATH = "test_df_manager.feather"
     DF_TEST = pd.DataFrame({'D': [pd.to_datetime(f"01.0{i}.2015 06:00:00", format="%d.%m.%Y %H:%M:%S") for i in range(1, 8)],
                             'A': [x for x in range(1, 8)],
                             'B': [x * 100 for x in range(1, 8)]})
@@ -13,8 +14,9 @@ class TestDfManager:
     @pytest.fixture(scope="function")
     def df_manager(self) -> DfManager:
         yield DfManager(path=self.TEST_PATH, date_col="D")
-        if os.path.exists(self.TEST_PATH):
-            os.remove(self.TEST_PATH)
+        for path in [self.TEST_PATH, self.TEST_BINARY_PATH]:
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_save_to_file(self, df_manager: DfManager) -> None:
         df_manager.save_to_file(self.DF_TEST)
@@ -39,3 +41,76 @@ class TestDfManager:
     def test_is_date_in_file(self, date_in: pd.Timestamp, state: bool, df_manager: DfManager) -> None:
         df_manager.save_to_file(self.DF_TEST)
         assert df_manager.is_date_in_file(df_manager.date_col, date_in) == state
+
+    def test_get_cell_by_date(self, df_manager: DfManager) -> None:
+        df_manager.save_to_file(self.DF_TEST)
+        date_in = pd.to_datetime("01.03.2015 06:00:00", format="%d.%m.%Y %H:%M:%S")
+        assert df_manager.get_cell_by_date(df_manager.date_col, date_in, 'B') == 300
+
+    def test_get_subset_by_date(self, df_manager: DfManager) -> None:
+        df_manager.save_to_file(self.DF_TEST)
+        date_start = pd.to_datetime("01.02.2015 06:00:00", format="%d.%m.%Y %H:%M:%S")
+        date_end = pd.to_datetime("01.04.2015 06:00:00", format="%d.%m.%Y %H:%M:%S")
+        df = df_manager.get_subset_by_date(df_manager.date_col, date_start, date_end)
+        assert df['A'].tolist() == [2, 3, 4]
+
+    def test_file_read_once(self, df_manager: DfManager, monkeypatch: pytest.MonkeyPatch) -> None:
+        df_manager.save_to_file(self.DF_TEST)
+        reads = []
+        read_content = df_manager._read_content
+        monkeypatch.setattr(df_manager, "_read_content", lambda: reads.append(df_manager.path) or read_content())
+        date_in = pd.to_datetime("01.01.2015 06:00:00", format="%d.%m.%Y %H:%M:%S")
+        for _ in range(10):
+            df_manager.is_date_in_file(df_manager.date_col, date_in)
+            df_manager.get_cell_by_date(df_manager.date_col, date_in, 'A')
+        assert len(reads) == 1
+
+    def test_cache_invalidated_on_save(self, df_manager: DfManager) -> None:
+        df_manager.save_to_file(self.DF_TEST)
+        date_in = pd.to_datetime("01.01.2015 06:00:00", format="%d.%m.%Y %H:%M:%S")
+        assert df_manager.get_cell_by_date(df_manager.date_col, date_in, 'A') == 1
+        df_manager.update_cell_by_date(df_manager.date_col, date_in, 'A', 999)
+        assert df_manager.get_cell_by_date(df_manager.date_col, date_in, 'A') == 999
+
+    def test_cache_invalidated_on_file_change(self, df_manager: DfManager) -> None:
+        df_manager.save_to_file(self.DF_TEST)
+        date_in = pd.to_datetime("01.01.2015 06:00:00", format="%d.%m.%Y %H:%M:%S")
+        assert df_manager.get_cell_by_date(df_manager.date_col, date_in, 'A') == 1
+        DfManager(path=self.TEST_PATH, date_col="D").update_cell_by_date("D", date_in, 'A', 999)
+        os.utime(self.TEST_PATH, ns=(0, 0))
+        assert df_manager.get_cell_by_date(df_manager.date_col, date_in, 'A') == 999
+
+    def test_get_values_by_date_range(self, df_manager: DfManager) -> None:
+        hourly_df = pd.DataFrame({'D': pd.date_range("01.01.2015 00:00:00", periods=48, freq="1h"),
+                                  'A': [float(x) for x in range(48)]})
+        df_manager.save_to_file(hourly_df)
+        date_start = pd.to_datetime("01.01.2015 05:00:00", format="%d.%m.%Y %H:%M:%S")
+        date_end = pd.to_datetime("02.01.2015 04:00:00", format="%d.%m.%Y %H:%M:%S")
+        values = df_manager.get_values_by_date_range(df_manager.date_col, date_start, date_end, 'A')
+        assert values.tolist() == [float(x) for x in range(5, 29)]
+        assert df_manager.get_values_by_date_range(df_manager.date_col, date_end, date_start, 'A').size == 0
+        with pytest.raises(Exception):
+            df_manager.get_values_by_date_range(df_manager.date_col, date_start, date_end + pd.Timedelta(days=2), 'A')
+
+    def test_csv_converted_to_binary(self, df_manager: DfManager, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.DF_TEST.to_csv(self.TEST_PATH, index=False, date_format=df_manager.date_format)
+        df_manager.get_from_file()
+        assert os.path.exists(self.TEST_BINARY_PATH)
+        monkeypatch.setattr(CSVManager, "get_content", lambda path: pytest.fail("The .csv file was parsed again"))
+        df = DfManager(path=self.TEST_PATH, date_col="D").get_from_file()
+        assert df['D'].tolist() == self.DF_TEST['D'].tolist()
+        assert df['B'].tolist() == self.DF_TEST['B'].tolist()
+
+    def test_binary_rebuilt_after_csv_change(self, df_manager: DfManager) -> None:
+        df_manager.save_to_file(self.DF_TEST)
+        changed_df = self.DF_TEST.copy()
+        changed_df['A'] = 0
+        changed_df.to_csv(self.TEST_PATH, index=False, date_format=df_manager.date_format)
+        os.utime(self.TEST_BINARY_PATH, ns=(0, 0))
+        assert DfManager(path=self.TEST_PATH, date_col="D").get_from_file()['A'].tolist() == [0] * 7
+
+    def test_binary_file_path(self, df_manager: DfManager) -> None:
+        binary_manager = DfManager(path=self.TEST_BINARY_PATH, date_col="D")
+        binary_manager.save_to_file(self.DF_TEST)
+        binary_manager.export_to_csv(self.TEST_PATH)
+        assert df_manager.get_from_file()['A'].tolist() == binary_manager.get_from_file()['A'].tolist()
@@ -0,0 +1,106 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.hourly_dataset import DatasetRegistry, HourlyDataset
+from systems.bare_system import BareSystem
+
+
+class TestHourlyDataset:
+    DATE_START = pd.to_datetime("01.01.2020 00:00:00", format="%d.%m.%Y %H:%M:%S")
+    HOURS = 48
+
+    @pytest.fixture(scope="function")
+    def dataset(self) -> HourlyDataset:
+        dates = pd.date_range(start=self.DATE_START, periods=self.HOURS, freq="1h")
+        prices = np.round(np.linspace(-0.5, 1.5, self.HOURS), 2)
+        consumptions = np.full(self.HOURS, 0.5)
+        productions = np.round(np.linspace(0.0, 2.0, self.HOURS), 2)
+        return HourlyDataset(dates, prices, consumptions, productions)
+
+    def test_get_record(self, dataset: HourlyDataset) -> None:
+        date_in = self.DATE_START + pd.Timedelta(hours=5)
+        assert dataset.get_record(date_in) == (dataset.prices[5], dataset.consumptions[5], dataset.productions[5])
+
+    def test_get_range_is_read_only_view(self, dataset: HourlyDataset) -> None:
+        prices, consumptions, productions = dataset.get_range(self.DATE_START + pd.Timedelta(hours=2),
+                                                              self.DATE_START + pd.Timedelta(hours=25))
+        assert len(prices) == len(consumptions) == len(productions) == 24
+        assert np.shares_memory(prices, dataset.prices)
+        with pytest.raises(ValueError):
+            prices[0] = 1.0
+
+    def test_pickled_dataset_is_read_only(self, dataset: HourlyDataset) -> None:
+        unpickled_dataset = pickle.loads(pickle.dumps(dataset))
+        pd.testing.assert_index_equal(unpickled_dataset.dates, dataset.dates)
+        np.testing.assert_array_equal(unpickled_dataset.productions, dataset.productions)
+        assert np.shares_memory(unpickled_dataset.prices, unpickled_dataset._data)
+        with pytest.raises(ValueError):
+            unpickled_dataset.prices[0] = 1.0
+
+    def test_dates_out_of_range(self, dataset: HourlyDataset) -> None:
+        assert not dataset.covers(self.DATE_START - pd.Timedelta(hours=1))
+        with pytest.raises(Exception):
+            dataset.get_record(self.DATE_START + pd.Timedelta(hours=self.HOURS))
+
+    @pytest.mark.parametrize("dates", [pd.date_range("01.01.2020 00:00:00", periods=3, freq="2h"),
+                                       pd.date_range("01.01.2020 00:00:00", periods=4, freq="1h")])
+    def test_invalid_time_axis(self, dates: pd.DatetimeIndex) -> None:
+        with pytest.raises(Exception):
+            HourlyDataset(dates, np.zeros(3), np.zeros(3), np.zeros(3))
+
+    def test_system_fed_from_dataset(self, dataset: HourlyDataset) -> None:
+        bare_system = BareSystem(load_multiplier=2, dataset=dataset)
+        for date_in in dataset.dates[:3]:
+            bare_system.feed_consumption(date_in)
+        expected_costs = [round(2 * consumption * price, 2) for price, consumption in zip(dataset.prices[:3], dataset.consumptions[:3])]
+        assert bare_system.summed_cost == sum(expected_costs)
+
+
+class TestDatasetRegistry:
+    @staticmethod
+    def get_dataset(date_start: str, hours: int = 48) -> HourlyDataset:
+        dates = pd.date_range(start=pd.Timestamp(date_start), periods=hours, freq="1h")
+        return HourlyDataset(dates, np.zeros(hours), np.zeros(hours), np.zeros(hours))
+
+    @pytest.fixture(autouse=True)
+    def clear_registry(self) -> None:
+        DatasetRegistry.clear()
+        yield
+        DatasetRegistry.clear()
+
+    def test_covering_dataset_reused_without_widening(self) -> None:
+        january_dataset, august_dataset = self.get_dataset("2020-01-05"), self.get_dataset("2020-08-19")
+        DatasetRegistry.register(january_dataset)
+        DatasetRegistry.register(august_dataset)
+        january_span = pd.Timestamp("2020-01-05 06:00"), pd.Timestamp("2020-01-06 12:00")
+        august_span = pd.Timestamp("2020-08-19 06:00"), pd.Timestamp("2020-08-20 12:00")
+        assert DatasetRegistry.get_dataset(*january_span) is january_dataset
+        assert DatasetRegistry.get_dataset(*august_span) is august_dataset
+        assert january_dataset.date_start == pd.Timestamp("2020-01-05") and len(january_dataset.dates) == 48
+
+    def test_least_recently_used_dataset_evicted(self) -> None:
+        datasets = [self.get_dataset(f"2020-0{month}-01") for month in range(1, DatasetRegistry.MAX_DATASETS + 1)]
+        for dataset in datasets:
+            DatasetRegistry.register(dataset)
+        DatasetRegistry.get_dataset(datasets[0].date_start, datasets[0].date_end)
+        DatasetRegistry.register(self.get_dataset("2020-09-01"))
+        kept_datasets = list(DatasetRegistry._datasets.values())
+        assert len(kept_datasets) == DatasetRegistry.MAX_DATASETS
+        assert datasets[0] in kept_datasets and datasets[1] not in kept_datasets
+
+    def test_shared_by_threads(self) -> None:
+        datasets = [self.get_dataset(f"2020-0{month}-01") for month in range(1, DatasetRegistry.MAX_DATASETS + 1)] * 2
+
+        def use_registry(dataset: HourlyDataset) -> HourlyDataset:
+            for _ in range(200):
+                DatasetRegistry.register(dataset)
+                found_dataset = DatasetRegistry.get_dataset(dataset.date_start, dataset.date_end)
+            return found_dataset
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert list(executor.map(use_registry, datasets)) == datasets
+        assert set(DatasetRegistry._datasets.values()) == set(datasets)
@@ -0,0 +1,74 @@
+import gzip
+import logging
+import multiprocessing
+import os
+
+import pytest
+
+from lib import logger as logger_module
+from lib.logger import HOURLY, logger, setup_logging, stop_logging
+from systems.bare_system import BareSystem
+
+
+def log_from_worker(handlers_queue: multiprocessing.Queue) -> None:
+    handlers_queue.put(([type(handler).__name__ for handler in logging.getLogger().handlers],
+                        logger_module._listener is None))
+    logger.info("message from worker %d", os.getpid())
+
+
+class TestLogger:
+    @pytest.fixture(scope="function")
+    def log_path(self, tmp_path) -> str:
+        yield str(tmp_path / "simulation.log")
+        stop_logging()
+        logging.getLogger().handlers.clear()
+        logging.getLogger().setLevel(logging.WARNING)
+
+    def test_hourly_messages_disabled_by_default(self, log_path: str) -> None:
+        setup_logging(log_path=log_path)
+        assert not logger.isEnabledFor(HOURLY)
+        assert not BareSystem().log_hourly
+
+    def test_hourly_level_written_by_listener(self, log_path: str) -> None:
+        setup_logging(level=HOURLY, log_path=log_path)
+        system = BareSystem()
+        assert system.log_hourly
+        system.log_data(1.25, 0.5, 2.0)
+        stop_logging()
+        with open(log_path, encoding="utf-8") as log_file:
+            assert "HOURLY" in log_file.read()
+
+    def test_log_path_unique_per_run(self, log_path: str) -> None:
+        run_log_path = setup_logging(log_path=log_path.replace("simulation.log", "simulation_{run_id}.log"))
+        logger.info("message of the run")
+        stop_logging()
+        assert run_log_path.endswith(f"_{os.getpid()}.log")
+        with open(run_log_path, encoding="utf-8") as log_file:
+            assert "message of the run" in log_file.read()
+        assert setup_logging(log_path=log_path) == log_path
+
+    def test_rotated_logs_compressed(self, log_path: str) -> None:
+        setup_logging(log_path=log_path, async_logging=False, max_bytes=1024, backup_count=2)
+        for idx in range(100):
+            logger.info("message number %d", idx)
+        logging.getLogger().handlers[-1].flush()
+        with gzip.open(f"{log_path}.1.gz", "rt", encoding="utf-8") as rotated_file:
+            assert "message number" in rotated_file.read()
+        with pytest.raises(FileNotFoundError):
+            open(f"{log_path}.3.gz")
+
+    @pytest.mark.parametrize("async_logging, expected_handlers", [(True, ["QueueHandler"]), (False, ["StreamHandler"])])
+    def test_forked_worker_does_not_open_log_file(self, log_path: str, async_logging: bool,
+                                                  expected_handlers: list) -> None:
+        setup_logging(log_path=log_path, async_logging=async_logging)
+        context = multiprocessing.get_context("fork")
+        handlers_queue = context.Queue()
+        worker = context.Process(target=log_from_worker, args=(handlers_queue,))
+        worker.start()
+        worker_handlers, is_listener_missing = handlers_queue.get(timeout=10)
+        worker.join(timeout=10)
+        stop_logging()
+        assert worker_handlers == expected_handlers
+        assert is_listener_missing
+        with open(log_path, encoding="utf-8") as log_file:
+            assert (f"message from worker {worker.pid}" in log_file.read()) == async_logging
@@ -0,0 +1,58 @@
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.logger import stop_logging
+from main import main
+from scripts.hourly_dataset import DatasetRegistry, HourlyDataset
+from scripts.simulation_runner import SystemSpec
+
+
+class TestMain:
+    DATE_START = pd.Timestamp("2020-03-02 00:00:00")
+    HOURS = 24 * 5
+
+    @pytest.fixture(scope="function")
+    def dataset(self) -> HourlyDataset:
+        rng = np.random.default_rng(5)
+        dates = pd.date_range(start=self.DATE_START, periods=self.HOURS, freq="1h")
+        dataset = HourlyDataset(dates, np.round(rng.uniform(0.05, 1.2, self.HOURS), 2),
+                                np.round(rng.uniform(0.1, 3.0, self.HOURS), 3), np.round(rng.uniform(0.0, 4.0, self.HOURS), 3))
+        DatasetRegistry.register(dataset)
+        yield dataset
+        DatasetRegistry.clear()
+        stop_logging()
+        logging.getLogger().handlers.clear()
+
+    def get_argv(self, tmp_path, *args: str) -> list:
+        return ["--start", "2020-03-02T06:00", "--end", "2020-03-04T14:00", "--capacity", "5", "--lvl", "2",
+                "--jobs", "1", "--no-prefetch", "--log-file", str(tmp_path / "simulation.log"), *args]
+
+    @pytest.mark.parametrize("series_name", ["series.parquet", "series.csv"])
+    def test_outputs(self, dataset: HourlyDataset, tmp_path, series_name: str) -> None:
+        summary_path, series_path = tmp_path / "out" / "summary.json", tmp_path / "out" / series_name
+        summary = main(self.get_argv(tmp_path, "--summary", str(summary_path), "--series", str(series_path)))
+        with open(summary_path) as summary_file:
+            assert json.load(summary_file) == summary
+        assert list(summary["systems"]) == list(SystemSpec.SYSTEMS)
+        series_df = pd.read_csv(series_path) if series_name.endswith(".csv") else pd.read_parquet(series_path)
+        assert len(series_df) == len(SystemSpec.SYSTEMS) * 57
+        for system_name, system_summary in summary["systems"].items():
+            system_df = series_df[series_df["System"] == system_name]
+            assert system_df["Total price [zl]"].iloc[-1] == pytest.approx(system_summary["summed_cost"])
+
+    def test_selected_systems_printed(self, dataset: HourlyDataset, tmp_path, capsys) -> None:
+        summary = main(self.get_argv(tmp_path, "--systems", "PvSystem", "SmartSystem", "--pv-size", "3"))
+        assert json.loads(capsys.readouterr().out) == summary
+        assert list(summary["systems"]) == ["PvSystem", "SmartSystem"]
+        assert summary["systems"]["PvSystem"]["bank_lvl"] is None
+
+    def test_pv_size_changes_costs(self, dataset: HourlyDataset, tmp_path) -> None:
+        summaries = [main(self.get_argv(tmp_path, "--systems", "PvSystem", "RawFullSystem", "--pv-size", pv_size))
+                     for pv_size in ["1", "10"]]
+        for system_name in ["PvSystem", "RawFullSystem"]:
+            small_summary, large_summary = (summary["systems"][system_name] for summary in summaries)
+            assert small_summary["summed_cost"] != large_summary["summed_cost"]
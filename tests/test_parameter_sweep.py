@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.hourly_dataset import DatasetRegistry, HourlyDataset
+from scripts.parameter_sweep import ParameterSweep, parse_args
+from scripts.simulation_runner import SystemSpec
+
+
+class TestParameterSweep:
+    DATE_START = pd.to_datetime("06.01.2020 00:00:00", format="%d.%m.%Y %H:%M:%S")
+    HOURS = 24 * 5
+    GRID = {"capacity": [3.0, 5.0], "min_lvl": [0.5], "lvl": [1.0], "purchase_cost": [1000.0], "cycles_num": [1000],
+            "load_multiplier": [None, 2]}
+    SYSTEM_NAMES = ["BareSystem", "RawFullSystem", "SmartSaveSystem"]
+
+    @pytest.fixture(scope="function")
+    def dataset(self) -> HourlyDataset:
+        rng = np.random.default_rng(5)
+        dates = pd.date_range(start=self.DATE_START, periods=self.HOURS, freq="1h")
+        prices = np.round(rng.uniform(-0.2, 1.2, self.HOURS), 2)
+        consumptions = np.round(rng.uniform(0.1, 3.0, self.HOURS), 3)
+        productions = np.round(rng.uniform(0.0, 4.0, self.HOURS), 3)
+        dataset = HourlyDataset(dates, prices, consumptions, productions)
+        DatasetRegistry.register(dataset)
+        yield dataset
+        DatasetRegistry.clear()
+
+    def test_get_scenarios(self) -> None:
+        scenarios = ParameterSweep(self.GRID).get_scenarios()
+        assert len(scenarios) == 4
+        assert scenarios[1] == {"capacity": 3.0, "min_lvl": 0.5, "lvl": 1.0, "purchase_cost": 1000.0, "cycles_num": 1000,
+                                "pv_size": 5, "load_multiplier": 2}
+
+    def test_unknown_parameter(self) -> None:
+        with pytest.raises(Exception):
+            ParameterSweep({"bank_size": [1.0]})
+
+    def test_parse_args(self) -> None:
+        args = parse_args(["--start", "2020-01-06", "--end", "2020-01-08", "--load-multiplier", "0.5", "1.5",
+                           "--systems", "BareSystem", "SmartSystem"])
+        assert args.load_multiplier == [0.5, 1.5]
+        assert args.systems == ["BareSystem", "SmartSystem"]
+        with pytest.raises(SystemExit):
+            parse_args(["--start", "2020-01-06", "--end", "2020-01-08", "--systems", "SmartSytem"])
+
+    def test_pv_size_changes_costs(self, dataset: HourlyDataset) -> None:
+        date_start, date_end = dataset.date_start + pd.Timedelta(hours=6), dataset.date_end - pd.Timedelta(days=2)
+        grid = {**self.GRID, "capacity": [5.0], "load_multiplier": [None], "pv_size": [1, 5, 10]}
+        results_df = ParameterSweep(grid, ["PvSystem", "RawFullSystem"], max_workers=1).run(date_start, date_end,
+                                                                                              prefetch=False)
+        for system_name in ["PvSystem", "RawFullSystem"]:
+            summed_costs = results_df[results_df["system"] == system_name]["summed_cost"]
+            assert summed_costs.nunique() == 3
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_results_table(self, dataset: HourlyDataset, max_workers: int) -> None:
+        date_start, date_end = dataset.date_start + pd.Timedelta(hours=6), dataset.date_end - pd.Timedelta(days=2)
+        results_df = ParameterSweep(self.GRID, self.SYSTEM_NAMES, max_workers=max_workers).run(date_start, date_end, prefetch=False)
+        assert len(results_df) == 4 * len(self.SYSTEM_NAMES)
+        assert list(results_df["system"].unique()) == self.SYSTEM_NAMES
+        assert results_df[results_df["system"] == "BareSystem"]["final_lvl"].isna().all()
+
+        row = results_df[(results_df["system"] == "RawFullSystem") & (results_df["capacity"] == 5.0) &
+                         (results_df["load_multiplier"] == 2)].iloc[0]
+        bank_params = {"capacity": 5.0, "min_lvl": 0.5, "lvl": 1.0, "purchase_cost": 1000.0, "cycles_num": 1000}
+        system = SystemSpec("RawFullSystem", load_multiplier=2, energy_bank_params=bank_params).build(dataset)
+        bank_lvls, _, _ = system.run_batch(date_start, date_end)
+        assert row["summed_cost"] == system.summed_cost
+        assert row["final_lvl"] == system.energy_bank.lvl
+        assert row["cycles"] == pytest.approx(np.abs(np.diff(np.concatenate(([1.0], bank_lvls)))).sum() / 10.0)
+        assert row["cycles"] > 0.0
@@ -0,0 +1,50 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from scripts.plotter import Plotter
+
+
+class TestPlotter:
+    COLUMNS = ["y1", "y2"]
+    DATE_START = pd.Timestamp("2020-01-01 00:00:00")
+
+    def test_rows_grow_buffers(self) -> None:
+        plotter = Plotter(self.COLUMNS, initial_capacity=4)
+        dates = pd.date_range(start=self.DATE_START, periods=10, freq="1h")
+        for idx, date_in in enumerate(dates):
+            plotter.add_data_row([date_in, idx * 1.0, idx * 2])
+        assert len(plotter) == 10 and plotter.capacity == 16
+        expected_df = pd.DataFrame({"Date": dates, "y1": np.arange(10.0), "y2": np.arange(10.0) * 2})
+        pd.testing.assert_frame_equal(plotter.df, expected_df)
+
+    def test_rows_and_blocks_mixed(self) -> None:
+        plotter = Plotter(self.COLUMNS, initial_capacity=2)
+        dates = pd.date_range(start=self.DATE_START, periods=7, freq="1h")
+        plotter.add_data_row([dates[0], 0.0, 0.0])
+        plotter.add_data_block(dates[1:6], [np.arange(1.0, 6.0), np.arange(1.0, 6.0) * 2])
+        plotter.add_data_row([dates[6], 6.0, 12.0])
+        assert plotter.df["Date"].tolist() == dates.tolist()
+        assert plotter.df["y2"].tolist() == (np.arange(7.0) * 2).tolist()
+
+    def test_df_built_lazily(self) -> None:
+        plotter = Plotter(self.COLUMNS)
+        plotter.add_data_row([self.DATE_START, 1.0, 2.0])
+        df = plotter.df
+        assert plotter.df is df
+        plotter.add_data_row([self.DATE_START + pd.Timedelta(hours=1), 3.0, 4.0])
+        assert len(plotter.df) == 2 and len(df) == 1
+
+    def test_pickle_keeps_recorded_rows_only(self) -> None:
+        plotter = Plotter(self.COLUMNS, initial_capacity=1000)
+        plotter.add_data_block(pd.date_range(start=self.DATE_START, periods=3, freq="1h"), [np.ones(3), np.zeros(3)])
+        restored_plotter = pickle.loads(pickle.dumps(plotter))
+        assert restored_plotter.capacity == 3
+        pd.testing.assert_frame_equal(restored_plotter.df, plotter.df)
+
+    def test_year_memory(self) -> None:
+        plotter = Plotter(["price", "consumption", "production", "energy_bank", "total"])
+        for date_in in pd.date_range(start=self.DATE_START, periods=24 * 365, freq="1h"):
+            plotter.add_data_row([date_in, 1.0, 2.0, 3.0, 4.0, 5.0])
+        assert plotter.nbytes < 1024 ** 2
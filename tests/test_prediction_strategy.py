@@ -1,9 +1,11 @@
+import itertools
 from typing import Union, List
 
+import numpy as np
 import pytest
 
 from scripts.energy_bank import EnergyBank
-from scripts.prediction_strategy import DayPredictionStrategy, NightPredictionStrategy, simulate_eb_operation
+from scripts.prediction_strategy import DayPredictionStrategy, NightPredictionStrategy, OptimalPredictionStrategy, simulate_eb_operation
 from tests.conftest import EbProps
 
 
@@ -95,3 +97,51 @@ class TestNightAlgorithm:
                       night_strategy: NightPredictionStrategy) -> None:
         output_balances = night_strategy.get_plan(start_en, prices, balances)
         assert output_balances == expected_balances
+
+
+class TestOptimalAlgorithm:
+    @pytest.mark.parametrize("width", [1, 3, 7, 40])
+    def test_sliding_window_min(self, width: int) -> None:
+        values = np.random.default_rng(width).normal(size=25)
+        expected_values = [values[idx:idx + width].min() for idx in range(len(values))]
+        assert np.array_equal(OptimalPredictionStrategy.sliding_window_min(values, width), expected_values)
+
+    def test_store_surplus_for_expensive_hour(self, optimal_strategy: OptimalPredictionStrategy) -> None:
+        prices = [0.1, 0.9, 0.2]
+        balances = [1.0, -1.0, 0.0]
+        assert optimal_strategy.get_plan(EbProps.MIN_LVL, prices, balances) == [1.0, -1.0, 0.0]
+
+    def test_grid_charging_at_negative_price(self, optimal_strategy: OptimalPredictionStrategy) -> None:
+        prices = [0.5, -0.3, 0.9]
+        balances = [0.0, 0.0, -2.0]
+        assert optimal_strategy.get_plan(EbProps.MIN_LVL, prices, balances) == [0.0, 4.5, -2.0]
+        optimal_strategy.grid_charging = False
+        assert optimal_strategy.get_plan(EbProps.MIN_LVL, prices, balances) == [0.0, 0.0, 0.0]
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_plan_is_optimal(self, seed: int) -> None:
+        rng = np.random.default_rng(seed)
+        optimal_strategy = OptimalPredictionStrategy(min_energy=0.0, max_energy=0.05, single_cycle_cost=rng.uniform(0.0, 2.0))
+        prices, balances = rng.uniform(-0.5, 1.0, 4).round(2).tolist(), rng.uniform(-0.04, 0.04, 4).round(2).tolist()
+        start_energy = 0.02
+        plan_cost = optimal_strategy.get_plan_cost(start_energy, prices, balances, optimal_strategy.get_plan(start_energy, prices, balances))
+        costs = []
+        for lvls in itertools.product([0.0, 0.01, 0.02, 0.03, 0.04, 0.05], repeat=4):
+            plan = np.round(np.diff([start_energy, *lvls]), 2).tolist()
+            try:
+                costs.append(optimal_strategy.get_plan_cost(start_energy, prices, balances, plan))
+            except Exception:
+                pass
+        assert plan_cost == pytest.approx(min(costs))
+
+    def test_empty_window(self, optimal_strategy: OptimalPredictionStrategy) -> None:
+        assert optimal_strategy.get_terminal_price([]) == 0.0
+        assert optimal_strategy.get_plan(EbProps.LVL, [], []) == []
+        assert optimal_strategy.get_plan_cost(EbProps.LVL, [], [], []) == 0.0
+
+    def test_long_window(self, optimal_strategy: OptimalPredictionStrategy) -> None:
+        rng = np.random.default_rng(0)
+        prices, balances = rng.uniform(-0.2, 1.0, 72).round(2).tolist(), rng.uniform(-2.0, 3.0, 72).round(2).tolist()
+        plan = optimal_strategy.get_plan(EbProps.LVL, prices, balances)
+        assert len(plan) == 72
+        optimal_strategy.get_plan_cost(EbProps.LVL, prices, balances, plan)
@@ -0,0 +1,48 @@
+import os
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from scripts.energy_pricing import EnergyWebScraper
+from scripts.prefetch import PrefetchPlanner
+
+
+class TestPrefetchPlanner:
+    TEST_PATH = "test_prefetch_prices.csv"
+
+    @pytest.fixture(scope="function")
+    def web_scraper(self, pse_server: ThreadingHTTPServer) -> EnergyWebScraper:
+        pse_server.requested_paths.clear()
+        pse_server.client_ports.clear()
+        yield EnergyWebScraper(prices_path=self.TEST_PATH, date_column="Date",
+                               download_link=f"http://127.0.0.1:{pse_server.server_address[1]}/")
+        for path in [self.TEST_PATH, self.TEST_PATH.replace(".csv", ".feather"), f"{self.TEST_PATH}.lock"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_plan_splits_long_ranges(self, web_scraper: EnergyWebScraper) -> None:
+        planner = PrefetchPlanner(web_scraper, max_days_per_request=7)
+        requests_ranges = planner.plan(pd.Timestamp("2023-01-01 06:00:00"), pd.Timestamp("2023-01-15 14:00:00"))
+        assert requests_ranges == [(pd.Timestamp("2023-01-01"), pd.Timestamp("2023-01-07")),
+                                   (pd.Timestamp("2023-01-08"), pd.Timestamp("2023-01-14")),
+                                   (pd.Timestamp("2023-01-15"), pd.Timestamp("2023-01-16"))]
+
+    def test_prefetch_then_offline_run(self, web_scraper: EnergyWebScraper, pse_server: ThreadingHTTPServer) -> None:
+        planner = PrefetchPlanner(web_scraper, max_days_per_request=7)
+        date_start, date_end = pd.Timestamp("2023-01-01 06:00:00"), pd.Timestamp("2023-01-15 14:00:00")
+        assert planner.prefetch(date_start, date_end) == 3
+        assert len(pse_server.requested_paths) == 3
+        assert len(pse_server.client_ports) == 1
+        assert web_scraper.get_rce_by_date(pd.Timestamp("2023-01-02 03:00:00")) == 0.24
+        for date_in in pd.date_range(date_start, date_end, freq="1h"):
+            web_scraper.get_rce_by_date(date_in)
+        assert len(pse_server.requested_paths) == 3
+        with pytest.raises(Exception):
+            web_scraper.get_rce_by_date(pd.Timestamp("2023-02-01 00:00:00"))
+
+    def test_prefetch_skips_stored_days(self, web_scraper: EnergyWebScraper, pse_server: ThreadingHTTPServer) -> None:
+        web_scraper.get_rce_by_date(pd.Timestamp("2023-01-03 00:00:00"))
+        assert pse_server.requested_paths == ["/data/20230103"]
+        assert PrefetchPlanner(web_scraper).prefetch(pd.Timestamp("2023-01-01"), pd.Timestamp("2023-01-04")) == 2
+        assert pse_server.requested_paths[1:] == ["/data_od/20230101/data_do/20230102", "/data_od/20230104/data_do/20230105"]
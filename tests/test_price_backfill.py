@@ -0,0 +1,62 @@
+import os
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from scripts.energy_pricing import EnergyWebScraper
+from scripts.price_backfill import PriceBackfill
+
+
+class TestPriceBackfill:
+    TEST_PATH = "test_backfill_prices.csv"
+
+    @pytest.fixture(scope="function")
+    def web_scraper(self, pse_server: ThreadingHTTPServer) -> EnergyWebScraper:
+        pse_server.requested_paths.clear()
+        pse_server.malformed_responses = 0
+        pse_server.failing_days.clear()
+        yield EnergyWebScraper(prices_path=self.TEST_PATH, date_column="Date",
+                               download_link=f"http://127.0.0.1:{pse_server.server_address[1]}/")
+        for path in [self.TEST_PATH, self.TEST_PATH.replace(".csv", ".feather"), f"{self.TEST_PATH}.lock"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_get_chunks(self, web_scraper: EnergyWebScraper) -> None:
+        chunks = PriceBackfill(web_scraper, chunk_days=7).get_chunks(pd.Timestamp("2023-01-01"), pd.Timestamp("2023-03-31"))
+        assert len(chunks) == 13
+        assert chunks[0] == (pd.Timestamp("2023-01-01"), pd.Timestamp("2023-01-07"))
+        assert chunks[-1] == (pd.Timestamp("2023-03-26"), pd.Timestamp("2023-03-31"))
+
+    def test_backfill_covers_span(self, web_scraper: EnergyWebScraper, pse_server: ThreadingHTTPServer) -> None:
+        date_start, date_end = pd.Timestamp("2023-01-01"), pd.Timestamp("2023-03-31")
+        assert PriceBackfill(web_scraper, chunk_days=7, max_concurrency=4).run(date_start, date_end) == 13
+        assert len(pse_server.requested_paths) == 13
+        assert web_scraper.price_store.is_covered(date_start, date_end)
+        assert web_scraper.get_rce_by_date(pd.Timestamp("2023-02-10 03:00:00")) == 1.04
+        assert len(web_scraper.df_manager.get_from_file()) == 90 * 24
+        assert PriceBackfill(web_scraper, chunk_days=7).run(date_start, date_end) == 0
+        assert len(pse_server.requested_paths) == 13
+
+    def test_backfill_retries_malformed_response(self, web_scraper: EnergyWebScraper, pse_server: ThreadingHTTPServer) -> None:
+        pse_server.malformed_responses = 1
+        date_start, date_end = pd.Timestamp("2023-01-01"), pd.Timestamp("2023-01-14")
+        assert PriceBackfill(web_scraper, chunk_days=7, backoff=0.01).run(date_start, date_end) == 2
+        assert len(pse_server.requested_paths) == 3
+        assert web_scraper.price_store.is_covered(date_start, date_end)
+
+    def test_backfill_gives_up_after_retries(self, web_scraper: EnergyWebScraper, pse_server: ThreadingHTTPServer) -> None:
+        pse_server.malformed_responses = 3
+        with pytest.raises(Exception):
+            PriceBackfill(web_scraper, retries=2, backoff=0.01).run(pd.Timestamp("2023-01-01"), pd.Timestamp("2023-01-03"))
+        assert not os.path.exists(self.TEST_PATH)
+
+    def test_backfill_keeps_downloaded_chunks(self, web_scraper: EnergyWebScraper, pse_server: ThreadingHTTPServer) -> None:
+        pse_server.failing_days.add("20230108")
+        date_start, date_end = pd.Timestamp("2023-01-01"), pd.Timestamp("2023-01-21")
+        with pytest.raises(Exception, match="2023-01-08 - 2023-01-14"):
+            PriceBackfill(web_scraper, chunk_days=7, retries=1, backoff=0.01).run(date_start, date_end)
+        assert web_scraper.price_store.is_covered(date_start, pd.Timestamp("2023-01-07"))
+        assert web_scraper.price_store.is_covered(pd.Timestamp("2023-01-15"), date_end)
+        assert web_scraper.price_store.get_missing_ranges(date_start, date_end) == [(pd.Timestamp("2023-01-08"),
+                                                                                     pd.Timestamp("2023-01-14"))]
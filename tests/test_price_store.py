@@ -0,0 +1,91 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List
+
+import pandas as pd
+import pytest
+
+from scripts.energy_pricing import EnergyWebScraper
+from scripts.price_store import PriceStore
+
+
+def create_pse_prices(date_start: pd.Timestamp, date_end: pd.Timestamp) -> pd.DataFrame:
+    days = pd.date_range(date_start.normalize(), date_end.normalize(), freq="D")
+    return pd.DataFrame({"Data": [int(day.strftime("%Y%m%d")) for day in days for _ in range(24)],
+                         "Godzina": [hour for _ in days for hour in range(1, 25)],
+                         "RCE": [round(day.day + hour / 100, 2) for day in days for hour in range(1, 25)]})
+
+
+class TestPriceStore:
+    TEST_PATH = "test_price_store.csv"
+
+    @pytest.fixture(scope="function")
+    def web_scraper(self, monkeypatch: pytest.MonkeyPatch) -> EnergyWebScraper:
+        web_scraper = EnergyWebScraper(prices_path=self.TEST_PATH, date_column="Date")
+        web_scraper.downloaded_ranges = []
+
+        def _download_prices_by_date(date_start: pd.Timestamp, date_end: pd.Timestamp = None) -> pd.DataFrame:
+            web_scraper.downloaded_ranges.append((date_start, date_end))
+            return create_pse_prices(date_start, date_start if date_end is None else date_end)
+
+        monkeypatch.setattr(web_scraper, "download_prices_by_date", _download_prices_by_date)
+        yield web_scraper
+        for path in [self.TEST_PATH, self.TEST_PATH.replace(".csv", ".feather"), f"{self.TEST_PATH}.lock"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_merge_keeps_earlier_days(self, web_scraper: EnergyWebScraper) -> None:
+        web_scraper.get_prices_file_by_date(pd.Timestamp("2023-01-10"), pd.Timestamp("2023-01-11"))
+        web_scraper.get_prices_file_by_date(pd.Timestamp("2023-01-20"))
+        days = web_scraper.price_store.get_days()
+        assert days == {pd.Timestamp("2023-01-10"), pd.Timestamp("2023-01-11"), pd.Timestamp("2023-01-20")}
+        assert web_scraper.df_manager.get_from_file().shape[0] == 3 * 24
+
+    def test_merge_replaces_stored_days(self, web_scraper: EnergyWebScraper) -> None:
+        web_scraper.get_prices_file_by_date(pd.Timestamp("2023-01-10"), pd.Timestamp("2023-01-12"))
+        web_scraper.get_prices_file_by_date(pd.Timestamp("2023-01-11"), pd.Timestamp("2023-01-13"))
+        df = web_scraper.df_manager.get_from_file()
+        assert df.shape[0] == 4 * 24
+        assert df["Date"].is_monotonic_increasing
+
+    @pytest.mark.parametrize("stored_days, date_start, date_end, expected_ranges", [
+        (["2023-01-10"], "2023-01-09 05:00:00", "2023-01-12 05:00:00", [("2023-01-09", "2023-01-09"), ("2023-01-11", "2023-01-12")]),
+        (["2023-01-10", "2023-01-12"], "2023-01-10 00:00:00", "2023-01-12 23:00:00", [("2023-01-11", "2023-01-11")]),
+        (["2023-01-10", "2023-01-11"], "2023-01-10 03:00:00", "2023-01-11 23:00:00", [])])
+    def test_missing_ranges(self, stored_days: List[str], date_start: str, date_end: str, expected_ranges: List[tuple],
+                            web_scraper: EnergyWebScraper) -> None:
+        for day in stored_days:
+            web_scraper.get_prices_file_by_date(pd.Timestamp(day))
+        missing_ranges = web_scraper.price_store.get_missing_ranges(pd.Timestamp(date_start), pd.Timestamp(date_end))
+        assert missing_ranges == [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in expected_ranges]
+
+    def test_stored_days_not_downloaded(self, web_scraper: EnergyWebScraper) -> None:
+        web_scraper.get_rce_by_date(pd.Timestamp("2023-01-10 00:00:00"), pd.Timestamp("2023-01-12 23:00:00"))
+        web_scraper.get_rce_by_date(pd.Timestamp("2023-01-20 05:00:00"))
+        assert len(web_scraper.downloaded_ranges) == 2
+        rce_prices = web_scraper.get_rce_by_date(pd.Timestamp("2023-01-11 22:00:00"), pd.Timestamp("2023-01-12 01:00:00"))
+        assert rce_prices == [11.23, 11.24, 12.01, 12.02]
+        assert web_scraper.get_rce_by_date(pd.Timestamp("2023-01-20 05:00:00")) == 20.06
+        assert len(web_scraper.downloaded_ranges) == 2
+
+    def test_datetime_dates(self, web_scraper: EnergyWebScraper) -> None:
+        assert web_scraper.get_rce_by_date(datetime(2023, 1, 20, 5)) == 20.06
+        assert web_scraper.price_store.get_missing_days(datetime(2023, 1, 20, 5), datetime(2023, 1, 21, 5)) == \
+            [pd.Timestamp("2023-01-21")]
+
+    def test_store_shared_between_instances(self, web_scraper: EnergyWebScraper) -> None:
+        web_scraper.get_prices_file_by_date(pd.Timestamp("2023-01-10"))
+        assert PriceStore(self.TEST_PATH).is_covered(pd.Timestamp("2023-01-10 00:00:00"), pd.Timestamp("2023-01-10 23:00:00"))
+
+    def test_concurrent_writers_keep_all_days(self, web_scraper: EnergyWebScraper) -> None:
+        days = pd.date_range("2023-01-01", periods=16, freq="D")
+
+        def add_day(day: pd.Timestamp) -> None:
+            dates = pd.date_range(day, periods=24, freq="1h")
+            PriceStore(self.TEST_PATH).add_prices(pd.DataFrame({"Date": dates, "RCE": [float(day.day)] * 24}))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(add_day, days))
+        assert PriceStore(self.TEST_PATH).get_days() == set(days)
+        assert not [name for name in os.listdir(".") if name.startswith(self.TEST_PATH) and name.endswith(".tmp")]
@@ -0,0 +1,117 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.logger import setup_logging, stop_logging
+from scripts.hourly_dataset import DatasetRegistry, HourlyDataset
+from scripts.simulation_job import COST_COLUMN, SimulationJob
+from scripts.simulation_runner import SimulationRunner, SystemSpec
+
+
+class TestSimulationJob:
+    DATE_START = pd.to_datetime("06.01.2020 00:00:00", format="%d.%m.%Y %H:%M:%S")
+    HOURS = 24 * 8
+    BANK_PARAMS = {"capacity": 5.0, "min_lvl": 0.5, "lvl": 2.0, "purchase_cost": 1000.0, "cycles_num": 1000}
+
+    @pytest.fixture(scope="function")
+    def dataset(self) -> HourlyDataset:
+        rng = np.random.default_rng(5)
+        dates = pd.date_range(start=self.DATE_START, periods=self.HOURS, freq="1h")
+        prices = np.round(rng.uniform(0.05, 1.2, self.HOURS), 2) * rng.choice([1, -1], self.HOURS, p=[0.9, 0.1])
+        consumptions = np.round(rng.uniform(0.1, 3.0, self.HOURS), 3)
+        productions = np.round(rng.uniform(0.0, 4.0, self.HOURS), 3)
+        dataset = HourlyDataset(dates, prices, consumptions, productions)
+        DatasetRegistry.register(dataset)
+        yield dataset
+        DatasetRegistry.clear()
+
+    @pytest.fixture(scope="function")
+    def specs(self) -> list:
+        return [SystemSpec(system_name, load_multiplier=2, energy_bank_params=self.BANK_PARAMS)
+                for system_name in SystemSpec.SYSTEMS]
+
+    def test_steps_match_single_run(self, dataset: HourlyDataset, specs: list) -> None:
+        date_start, date_end = dataset.date_start + pd.Timedelta(hours=6), dataset.date_end - pd.Timedelta(days=2)
+        for spec in specs:
+            system, stepped_system = spec.build(dataset), spec.build(dataset)
+            system.run(date_start, date_end)
+            step_ends = list(stepped_system.run_steps(date_start, date_end, pd.Timedelta(hours=29)))
+            assert step_ends[-1] == date_end
+            assert len(step_ends) == 5
+            assert stepped_system.summed_cost == system.summed_cost
+            pd.testing.assert_frame_equal(stepped_system.plotter.df, system.plotter.df)
+
+    def test_results_match_runner(self, dataset: HourlyDataset, specs: list) -> None:
+        date_start, date_end = dataset.date_start + pd.Timedelta(hours=6), dataset.date_end - pd.Timedelta(days=2)
+        job = SimulationJob(specs, date_start, date_end, step=pd.Timedelta(days=1), max_workers=2).start(prefetch=False)
+        while job.wait(timeout=5):
+            pass
+        results = job.get_results()
+        expected_results = SimulationRunner(specs, max_workers=1).run(date_start, date_end, prefetch=False)
+        assert job.progress == {spec.label: 1.0 for spec in specs}
+        assert not job.is_failed
+        for result, expected_result in zip(results, expected_results):
+            assert result.label == expected_result.label
+            assert result.summed_cost == expected_result.summed_cost
+            assert result.bank_lvl == expected_result.bank_lvl
+            pd.testing.assert_frame_equal(result.df, expected_result.df)
+
+    def test_partial_costs(self, dataset: HourlyDataset, specs: list) -> None:
+        date_start, date_end = dataset.date_start, dataset.date_end - pd.Timedelta(days=1)
+        job = SimulationJob(specs[:2], date_start, date_end, step=pd.Timedelta(days=2), max_workers=1).start(prefetch=False)
+        job.wait()
+        for _ in range(100):
+            partial_costs_df = job.get_partial_costs()
+            if len(partial_costs_df) == len(pd.date_range(start=date_start, end=date_end, freq="1h")):
+                break
+            job.wait(timeout=0.05)
+        assert list(partial_costs_df.columns) == [spec.label for spec in specs[:2]]
+        for result in job.get_results():
+            np.testing.assert_array_equal(partial_costs_df[result.label].to_numpy(), result.df[COST_COLUMN].to_numpy())
+
+    def test_cancel(self, dataset: HourlyDataset, specs: list) -> None:
+        date_start, date_end = dataset.date_start, dataset.date_end - pd.Timedelta(days=1)
+        job = SimulationJob(specs, date_start, date_end, step=pd.Timedelta(hours=6), max_workers=1).start(prefetch=False)
+        job.cancel()
+        job.wait()
+        assert job.is_cancelled
+        assert not job.is_running
+        assert any(progress < 1.0 for progress in job.progress.values())
+        with pytest.raises(Exception):
+            job.get_results()
+
+    def test_failed_worker(self, dataset: HourlyDataset, specs: list) -> None:
+        date_start, date_end = dataset.date_start, dataset.date_end - pd.Timedelta(days=1)
+        failing_spec = SystemSpec("SmartSaveSystem", energy_bank_params={**self.BANK_PARAMS, "purchase_cost": -1.0})
+        job = SimulationJob([specs[0], failing_spec], date_start, date_end, max_workers=1).start(prefetch=False)
+        job.wait()
+        assert job.is_failed
+        assert not job.is_running
+        assert not job.is_cancelled
+        with pytest.raises(Exception):
+            job.get_results()
+
+    def test_worker_logs_written_by_listener(self, dataset: HourlyDataset, specs: list, tmp_path) -> None:
+        log_path = str(tmp_path / "simulation.log")
+        setup_logging(log_path=log_path)
+        try:
+            job = SimulationJob(specs[:1], dataset.date_start, dataset.date_end - pd.Timedelta(days=1),
+                                max_workers=1).start(prefetch=False)
+            job.wait()
+        finally:
+            stop_logging()
+            logging.getLogger().handlers.clear()
+            logging.getLogger().setLevel(logging.WARNING)
+        assert job.get_results()
+        with open(log_path, encoding="utf-8") as log_file:
+            assert f"{specs[0].system_name} cost from" in log_file.read()
+
+    def test_results_before_start(self, specs: list) -> None:
+        job = SimulationJob(specs, self.DATE_START, self.DATE_START + pd.Timedelta(days=1))
+        assert not job.is_running
+        with pytest.raises(Exception):
+            job.get_results()
+        with pytest.raises(Exception):
+            job.cancel()
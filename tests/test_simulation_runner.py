@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.hourly_dataset import DatasetRegistry, HourlyDataset
+from scripts.simulation_runner import SimulationRunner, SystemSpec
+
+
+class TestSimulationRunner:
+    DATE_START = pd.to_datetime("06.01.2020 00:00:00", format="%d.%m.%Y %H:%M:%S")
+    HOURS = 24 * 6
+    BANK_PARAMS = {"capacity": 5.0, "min_lvl": 0.5, "lvl": 2.0, "purchase_cost": 1000.0, "cycles_num": 1000}
+
+    @pytest.fixture(scope="function")
+    def dataset(self) -> HourlyDataset:
+        rng = np.random.default_rng(3)
+        dates = pd.date_range(start=self.DATE_START, periods=self.HOURS, freq="1h")
+        prices = np.round(rng.uniform(0.05, 1.2, self.HOURS), 2) * rng.choice([1, -1], self.HOURS, p=[0.9, 0.1])
+        consumptions = np.round(rng.uniform(0.1, 3.0, self.HOURS), 3)
+        productions = np.round(rng.uniform(0.0, 4.0, self.HOURS), 3)
+        dataset = HourlyDataset(dates, prices, consumptions, productions)
+        DatasetRegistry.register(dataset)
+        yield dataset
+        DatasetRegistry.clear()
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_results_match_serial_run(self, dataset: HourlyDataset, max_workers: int) -> None:
+        specs = [SystemSpec(system_name, load_multiplier=2, energy_bank_params=self.BANK_PARAMS)
+                 for system_name in SystemSpec.SYSTEMS]
+        date_start, date_end = dataset.date_start + pd.Timedelta(hours=6), dataset.date_end - pd.Timedelta(days=2)
+        results = SimulationRunner(specs, max_workers=max_workers).run(date_start, date_end, prefetch=False)
+        assert [result.label for result in results] == list(SystemSpec.SYSTEMS)
+        for spec, result in zip(specs, results):
+            system = spec.build(dataset)
+            for date_in in pd.date_range(start=date_start, end=date_end, freq="1h"):
+                system.feed_consumption(date_in)
+            assert result.summed_cost == system.summed_cost
+            assert len(result.df) == len(system.plotter.df)
+            if spec.system_name in SystemSpec.BANK_SYSTEMS:
+                assert result.bank_lvl == system.energy_bank.lvl
+            else:
+                assert result.bank_lvl is None
+
+    def test_unknown_system(self) -> None:
+        with pytest.raises(Exception):
+            SystemSpec("UnknownSystem")
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.energy_bank import EnergyBank
+from scripts.hourly_dataset import HourlyDataset
+from scripts.prediction_strategy import OptimalPredictionStrategy
+from scripts.pv import Pv
+from systems.smart_save_system import SmartSaveSystem
+from systems.smart_system import SmartSystem
+
+
+class TestSmartSystemPlanning:
+    DATE_START = pd.to_datetime("06.01.2020 00:00:00", format="%d.%m.%Y %H:%M:%S")
+    HOURS = 24 * 5
+
+    @pytest.fixture(scope="function")
+    def dataset(self) -> HourlyDataset:
+        rng = np.random.default_rng(11)
+        dates = pd.date_range(start=self.DATE_START, periods=self.HOURS, freq="1h")
+        daylight = np.clip(np.sin((dates.hour.to_numpy() - 6) / 12 * np.pi), 0.0, None)
+        prices = np.round(rng.uniform(0.2, 0.9, self.HOURS), 2)
+        consumptions = np.round(rng.uniform(0.2, 1.5, self.HOURS), 3)
+        productions = np.round(3.0 * daylight * rng.uniform(0.5, 1.0, self.HOURS), 3)
+        return HourlyDataset(dates, prices, consumptions, productions)
+
+    @pytest.fixture(scope="function")
+    def smart_system(self, dataset: HourlyDataset, energy_bank: type(EnergyBank)) -> SmartSystem:
+        smart_system = SmartSystem(energy_bank(), Pv(), dataset=dataset)
+        smart_system.planned_offsets = []
+        plan_remaining_hours = smart_system.plan_remaining_hours
+
+        def _plan_remaining_hours(offset: int) -> None:
+            smart_system.planned_offsets.append(offset)
+            plan_remaining_hours(offset)
+
+        smart_system.plan_remaining_hours = _plan_remaining_hours
+        return smart_system
+
+    def test_plan_reused_within_period(self, smart_system: SmartSystem, dataset: HourlyDataset) -> None:
+        date_end = dataset.date_end - pd.Timedelta(days=2)
+        smart_system.run(dataset.date_start, date_end)
+        hours_num = len(pd.date_range(start=dataset.date_start, end=date_end, freq="1h"))
+        assert len(smart_system.planned_offsets) < hours_num / 2
+        assert len(smart_system.plotter.df) == hours_num
+
+    def test_deviation_replans_suffix(self, smart_system: SmartSystem, dataset: HourlyDataset) -> None:
+        date_start = dataset.date_start + pd.Timedelta(hours=8)
+        for date_in in pd.date_range(start=date_start, periods=2, freq="1h"):
+            smart_system.feed_consumption(date_in)
+        assert smart_system.planned_offsets == [0]
+        smart_system.energy_bank.lvl = smart_system.energy_bank.lvl + 0.5
+        deviated_lvl = smart_system.energy_bank.lvl
+        smart_system.feed_consumption(date_start + pd.Timedelta(hours=2))
+        assert smart_system.planned_offsets == [0, 2]
+        assert smart_system.planned_lvls[2] == deviated_lvl
+
+    def test_same_cost_as_full_replanning(self, dataset: HourlyDataset, energy_bank: type(EnergyBank)) -> None:
+        incremental_system = SmartSystem(energy_bank(), Pv(), dataset=dataset)
+        full_system = SmartSystem(energy_bank(), Pv(), dataset=dataset, incremental_planning=False)
+        date_end = dataset.date_end - pd.Timedelta(days=2)
+        incremental_system.run(dataset.date_start, date_end)
+        full_system.run(dataset.date_start, date_end)
+        assert incremental_system.summed_cost == full_system.summed_cost
+
+    def test_optimal_planning(self, dataset: HourlyDataset, energy_bank: type(EnergyBank)) -> None:
+        optimal_system = SmartSystem(energy_bank(), Pv(), dataset=dataset, optimal_planning=True)
+        heuristic_system = SmartSystem(energy_bank(), Pv(), dataset=dataset)
+        date_end = dataset.date_end - pd.Timedelta(days=2)
+        optimal_system.run(dataset.date_start, date_end)
+        heuristic_system.run(dataset.date_start, date_end)
+        assert isinstance(optimal_system.prediction_strategy, OptimalPredictionStrategy)
+        assert optimal_system.summed_cost <= heuristic_system.summed_cost
+
+    @pytest.mark.parametrize("system_class", [SmartSystem, SmartSaveSystem])
+    def test_night_crossing_month_end(self, dataset: HourlyDataset, energy_bank: type(EnergyBank),
+                                      system_class: type) -> None:
+        dates = pd.date_range(start=pd.Timestamp("2020-01-29 00:00:00"), periods=self.HOURS, freq="1h")
+        month_end_dataset = HourlyDataset(dates, dataset.prices, dataset.consumptions, dataset.productions)
+        system = system_class(energy_bank(), Pv(), dataset=month_end_dataset)
+        date_start, date_end = pd.Timestamp("2020-01-31 12:00:00"), pd.Timestamp("2020-02-01 12:00:00")
+        system.run(date_start, date_end)
+        assert len(system.plotter.df) == len(pd.date_range(start=date_start, end=date_end, freq="1h"))
+        sunrise, sunset = system.sun_manager.get_sun_data(date_start)
+        night_start, night_end = date_start.replace(hour=sunset), pd.Timestamp("2020-02-01").replace(hour=sunrise)
+        if system_class is SmartSystem:
+            assert system._choose_prediction_strategy(night_start) == night_end
+        else:
+            night_prices, _, _ = month_end_dataset.get_range(night_start, night_end)
+            assert system.get_average_energy_cost(night_start, sunrise, sunset) == pytest.approx(night_prices.mean())
@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+from scripts.startup_benchmark import HEADLESS_MODULES, StartupBenchmark
+
+
+class TestStartup:
+    @pytest.mark.parametrize("module", HEADLESS_MODULES)
+    def test_lazy_dependencies_not_loaded(self, module: str) -> None:
+        assert StartupBenchmark.get_loaded_dependencies(module) == []
+
+    def test_import_creates_no_log_files(self) -> None:
+        logs_before = set(os.listdir("logs"))
+        StartupBenchmark.get_import_time("systems.smart_system")
+        assert set(os.listdir("logs")) == logs_before
+
+    def test_regressions(self) -> None:
+        recorded = {"main": 0.4, "systems.smart_system": 0.5}
+        measured = {"main": 0.9, "systems.smart_system": 0.55, "scripts.parameter_sweep": 2.0}
+        assert StartupBenchmark.get_regressions(measured, recorded, tolerance=1.5) == ["main"]
@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+from suntime import Sun
+
+from lib.config import Config
+from lib.sun_manager import SunManager
+
+
+class TestSunManager:
+    DATE_START = pd.Timestamp("2020-01-01")
+    DATE_END = pd.Timestamp("2021-12-31")
+
+    @staticmethod
+    def get_suntime_data(sun: Sun, date_in: pd.Timestamp, timezone: str) -> (int, int):
+        sunrise = sun.get_sunrise_time(date_in.date(), ZoneInfo(timezone))
+        sunset = sun.get_sunset_time(date_in.date(), ZoneInfo(timezone))
+        return int(sunrise.strftime('%H')), int(sunset.strftime('%H'))
+
+    @pytest.mark.parametrize("latitude, longitude, timezone", [(Config.LATITUDE, Config.LONGITUDE, Config.TIMEZONE),
+                                                               (40.7, -74.0, "America/New_York"),
+                                                               (-33.9, 151.2, "Australia/Sydney")])
+    def test_table_same_as_suntime(self, latitude: float, longitude: float, timezone: str) -> None:
+        sun, sun_manager = Sun(lat=latitude, lon=longitude), SunManager(latitude, longitude, timezone=timezone)
+        sunrise_hours, sunset_hours = sun_manager.get_sun_data_range(self.DATE_START, self.DATE_END)
+        days = pd.date_range(start=self.DATE_START, end=self.DATE_END, freq="1D")
+        assert len(sunrise_hours) == len(days)
+        for day, sunrise, sunset in zip(days, sunrise_hours, sunset_hours):
+            assert (sunrise, sunset) == self.get_suntime_data(sun, day, timezone)
+
+    def test_hours_independent_of_machine_time_zone(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        expected_hours = SunManager().compute_sun_hours(pd.date_range(self.DATE_START, self.DATE_END, freq="1D"), True)
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+        try:
+            hours = SunManager().compute_sun_hours(pd.date_range(self.DATE_START, self.DATE_END, freq="1D"), True)
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+        np.testing.assert_array_equal(hours, expected_hours)
+        assert SunManager().get_sun_data(pd.Timestamp("2020-06-21"))[0] == 4
+        assert SunManager().get_sun_data(pd.Timestamp("2020-12-21"))[0] == 7
+
+    def test_lookup_same_as_ad_hoc_computation(self) -> None:
+        precomputed_manager, ad_hoc_manager = SunManager(), SunManager()
+        precomputed_manager.precompute(self.DATE_START, self.DATE_END)
+        for date_in in pd.date_range(start=self.DATE_START, end=self.DATE_END, freq="37h"):
+            assert precomputed_manager.get_sun_data(date_in) == ad_hoc_manager.get_sun_data(date_in)
+        assert len(precomputed_manager._cache) == 0
+
+    def test_lru_cache_size(self) -> None:
+        sun_manager = SunManager(cache_size=3)
+        for date_in in pd.date_range(start=self.DATE_START, periods=5, freq="1D"):
+            sun_manager.get_sun_data(date_in)
+        assert list(sun_manager._cache) == list(pd.date_range(start=self.DATE_START + pd.Timedelta(days=2), periods=3, freq="1D"))
+
+    def test_range_extends_table(self) -> None:
+        sun_manager = SunManager()
+        sun_manager.precompute(self.DATE_START, self.DATE_START + pd.Timedelta(days=10))
+        sunrise_hours, _ = sun_manager.get_sun_data_range(self.DATE_START - pd.Timedelta(days=5), self.DATE_END)
+        assert sun_manager.table_start == self.DATE_START - pd.Timedelta(days=5)
+        assert len(sunrise_hours) == (self.DATE_END - self.DATE_START).days + 6
+
+    def test_table_shared_by_managers(self) -> None:
+        first_manager, second_manager = SunManager(), SunManager()
+        first_manager.precompute(self.DATE_START, self.DATE_END)
+        second_manager.precompute(self.DATE_START + pd.Timedelta(days=30), self.DATE_START + pd.Timedelta(days=60))
+        shared_table = SunManager.SHARED_TABLES[(Config.LATITUDE, Config.LONGITUDE, Config.TIMEZONE)]
+        assert second_manager.sunrise_hours is shared_table[1]
+        assert second_manager.get_sun_data(self.DATE_END) == first_manager.get_sun_data(self.DATE_END)
+
+    def test_table_extended_by_threads(self) -> None:
+        SunManager.SHARED_TABLES.clear()
+        days = pd.date_range(start=self.DATE_START, end=self.DATE_END, freq="10D")
+
+        def precompute(day: pd.Timestamp) -> None:
+            SunManager().precompute(day, day + pd.Timedelta(days=9))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(precompute, days))
+        table_start, sunrise_hours, _ = SunManager.SHARED_TABLES[(Config.LATITUDE, Config.LONGITUDE, Config.TIMEZONE)]
+        assert table_start == self.DATE_START
+        assert len(sunrise_hours) == (days[-1] - self.DATE_START).days + 10
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.battery_kernel import BatteryKernel
+from scripts.energy_bank import EnergyBank
+from scripts.hourly_dataset import HourlyDataset
+from scripts.pv import Pv
+from scripts.results_sink import ResultsSink
+from systems.bare_system import BareSystem
+from systems.pv_system import PvSystem
+from systems.raw_full_system import RawFullSystem
+from systems.smart_save_system import SmartSaveSystem
+
+
+class TestVectorizedRun:
+    DATE_START = pd.to_datetime("01.01.2020 00:00:00", format="%d.%m.%Y %H:%M:%S")
+    HOURS = 24 * 14
+
+    @pytest.fixture(scope="function")
+    def dataset(self) -> HourlyDataset:
+        rng = np.random.default_rng(42)
+        dates = pd.date_range(start=self.DATE_START, periods=self.HOURS, freq="1h")
+        prices = np.round(rng.uniform(-0.3, 1.2, self.HOURS), 2)
+        consumptions = np.round(rng.uniform(0.1, 3.0, self.HOURS), 3)
+        productions = np.round(rng.uniform(0.0, 4.0, self.HOURS), 3)
+        return HourlyDataset(dates, prices, consumptions, productions)
+
+    @pytest.mark.parametrize("system_class", [BareSystem, PvSystem])
+    @pytest.mark.parametrize("load_multiplier", [None, 3])
+    def test_run_matches_hourly_feed(self, dataset: HourlyDataset, system_class: type, load_multiplier: int) -> None:
+        hourly_system = system_class(load_multiplier=load_multiplier, dataset=dataset)
+        vectorized_system = system_class(load_multiplier=load_multiplier, dataset=dataset)
+        date_start, date_end = dataset.date_start + pd.Timedelta(hours=5), dataset.date_end
+        for date_in in pd.date_range(start=date_start, end=date_end, freq="1h"):
+            hourly_system.feed_consumption(date_in)
+        assert vectorized_system.run(date_start, date_end) == hourly_system.summed_cost
+        pd.testing.assert_frame_equal(vectorized_system.plotter.df, hourly_system.plotter.df, check_dtype=False)
+
+    def test_run_continues_summed_cost(self, dataset: HourlyDataset) -> None:
+        split_system, full_system = PvSystem(dataset=dataset), PvSystem(dataset=dataset)
+        split_date = dataset.date_start + pd.Timedelta(hours=100)
+        split_system.run(dataset.date_start, split_date)
+        split_system.run(split_date + pd.Timedelta(hours=1), dataset.date_end)
+        assert split_system.summed_cost == full_system.run(dataset.date_start, dataset.date_end)
+        assert len(split_system.plotter.df) == self.HOURS
+
+    @pytest.mark.parametrize("system_class", [RawFullSystem, SmartSaveSystem])
+    @pytest.mark.parametrize("load_multiplier", [None, 2])
+    def test_batch_matches_hourly_feed(self, dataset: HourlyDataset, energy_bank: type(EnergyBank), system_class: type,
+                                       load_multiplier: int) -> None:
+        hourly_system = system_class(energy_bank(), Pv(), load_multiplier=load_multiplier, dataset=dataset)
+        batch_system = system_class(energy_bank(), Pv(), load_multiplier=load_multiplier, dataset=dataset)
+        date_start, date_end = dataset.date_start + pd.Timedelta(hours=5), dataset.date_end - pd.Timedelta(days=2)
+        for date_in in pd.date_range(start=date_start, end=date_end, freq="1h"):
+            hourly_system.feed_consumption(date_in)
+        bank_lvls, costs, summed_costs = batch_system.run_batch(date_start, date_end)
+        assert batch_system.summed_cost == hourly_system.summed_cost == summed_costs[-1]
+        assert batch_system.energy_bank.lvl == hourly_system.energy_bank.lvl == bank_lvls[-1]
+        assert np.array_equal(np.round(np.diff(summed_costs), 2), np.round(costs[1:], 2))
+        pd.testing.assert_frame_equal(batch_system.plotter.df, hourly_system.plotter.df, check_dtype=False)
+
+    def test_round_cents_matches_numpy(self) -> None:
+        values = np.random.default_rng(7).uniform(-100.0, 100.0, 10000).round(3)
+        assert [BatteryKernel.round_cents(value) for value in values.tolist()] == np.round(values, 2).tolist()
+
+    @pytest.mark.parametrize("file_name", ["series", "series.csv"])
+    def test_results_sink_matches_memory(self, dataset: HourlyDataset, energy_bank: type(EnergyBank), tmp_path,
+                                         file_name: str) -> None:
+        sink = ResultsSink(str(tmp_path / file_name), chunk_rows=50)
+        memory_system = RawFullSystem(energy_bank(), Pv(), dataset=dataset)
+        sink_system = RawFullSystem(energy_bank(), Pv(), dataset=dataset, results_sink=sink)
+        memory_system.run(dataset.date_start, dataset.date_end)
+        sink_system.run(dataset.date_start, dataset.date_end)
+        assert sink_system.plotter.capacity <= 1024 and sink_system.plotter.size == 0
+        assert sink.rows_written == self.HOURS and sink.chunks_written == -(-self.HOURS // 50)
+        pd.testing.assert_frame_equal(sink.read(), memory_system.plotter.df)
+        pd.testing.assert_frame_equal(sink_system.plotter.df, memory_system.plotter.df)
+
+    def test_results_sink_readable_during_run(self, dataset: HourlyDataset, tmp_path) -> None:
+        sink = ResultsSink(str(tmp_path / "series"), chunk_rows=24)
+        system = PvSystem(dataset=dataset, results_sink=sink)
+        for date_in in pd.date_range(start=dataset.date_start, periods=60, freq="1h"):
+            system.feed_consumption(date_in)
+        assert len(sink.read()) == 48 and len(system.plotter) == 60